@@ -35,9 +35,18 @@ module TreeUtils {
     funcdef save_trees(SaveTreesParams params)
                returns (list<Workspace.object_info> result) authentication required;
 
+    /*
+        input_ref - (required) reference to the tree
+        destination_dir - (required) directory to write the file to
+        compression - (optional) "gzip" or "zstd" to compress the file while writing it
+        relabel - (optional) "default_node_labels", "ws_refs" or "kb_refs" to write each node
+                  with its label or first reference from that map instead of its node id
+    */
     typedef structure {
         Tree_id input_ref;
         string destination_dir;
+        string compression;
+        string relabel;
     } TreeToNewickFileParams;
 
     typedef structure {
@@ -47,8 +56,16 @@ module TreeUtils {
     funcdef tree_to_newick_file(TreeToNewickFileParams params)
         returns (TreeToNewickFileOutput result) authentication required;
 
+    /*
+        input_ref - (required) reference to the tree
+        compression - (optional) "gzip" or "zstd" to compress the file while writing it
+        relabel - (optional) "default_node_labels", "ws_refs" or "kb_refs" to write each node
+                  with its label or first reference from that map instead of its node id
+    */
     typedef structure {
        Tree_id input_ref;
+       string compression;
+       string relabel;
     } ExportTreeParams;
 
     typedef structure {
@@ -58,4 +75,255 @@ module TreeUtils {
     funcdef export_tree_newick(ExportTreeParams params)
        returns (ExportTreeOutput result) authentication required;
 
+    /*
+        input_refs - (required) list of tree references
+        destination_dir - (required) directory to write the files to
+    */
+    typedef structure {
+        list<Tree_id> input_refs;
+        string destination_dir;
+    } TreesToNewickFilesParams;
+
+    /*
+        file_paths - mapping from each written tree reference to its newick file
+        errors - mapping from each tree reference that could not be written to the error message
+    */
+    typedef structure {
+        mapping<string, string> file_paths;
+        mapping<string, string> errors;
+    } TreesToNewickFilesOutput;
+
+    funcdef trees_to_newick_files(TreesToNewickFilesParams params)
+        returns (TreesToNewickFilesOutput result) authentication required;
+
+    /*
+        input_refs - (required) list of tree references
+        archive - (optional) "zip" (default) to package the files with workspace metadata
+                  or "targz" for a single .tar.gz
+    */
+    typedef structure {
+        list<Tree_id> input_refs;
+        string archive;
+    } ExportTreesParams;
+
+    /*
+        shock_id - the SHOCK node holding the archive
+        errors - mapping from each tree reference that could not be exported to the error message
+    */
+    typedef structure {
+        string shock_id;
+        mapping<string, string> errors;
+    } ExportTreesOutput;
+
+    funcdef export_trees_newick(ExportTreesParams params)
+        returns (ExportTreesOutput result) authentication required;
+
+    /*
+        tree_ref - (required) reference to the tree
+        leaf_pairs - (required) pairs of leaf ids, as listed in the leaf_list of the tree
+    */
+    typedef structure {
+        Tree_id tree_ref;
+        list<tuple<string, string>> leaf_pairs;
+    } LCAParams;
+
+    /*
+        node - index of the node in a preorder walk of the tree's newick, stable for a tree version
+        label - the label of the node in the newick, null if it has none
+        leaf_count - the number of leaves below the node
+    */
+    typedef structure {
+        int node;
+        string label;
+        int leaf_count;
+    } TreeNode;
+
+    /*
+        ancestors - the lowest common ancestor of each pair, in the order of leaf_pairs
+    */
+    typedef structure {
+        list<TreeNode> ancestors;
+    } LCAOutput;
+
+    /*
+        Finds the lowest common ancestor of many pairs of leaves in one call. An index
+        of the tree is built once and kept in memory for versioned references.
+    */
+    funcdef lowest_common_ancestors(LCAParams params)
+        returns (LCAOutput result) authentication required;
+
+    /*
+        tree_ref - (required) reference to the tree
+        leaf_ids - (optional) leaves to include, in the order of the matrix rows; all leaves by default
+        to_file - (optional) if 1, write the matrix to a .npy file in scratch instead of returning it
+    */
+    typedef structure {
+        Tree_id tree_ref;
+        list<string> leaf_ids;
+        int to_file;
+    } PatristicDistancesParams;
+
+    /*
+        leaf_ids - the leaves in the order of the matrix rows and columns
+        distances - the summed branch lengths between each pair of leaves, unless to_file was set
+        file_path - the .npy file holding the matrix, if to_file was set
+    */
+    typedef structure {
+        list<string> leaf_ids;
+        list<list<float>> distances;
+        string file_path;
+    } PatristicDistancesOutput;
+
+    /*
+        Computes the patristic distance between every pair of leaves, from the distance
+        of each leaf to the root and the lowest common ancestor of the pair.
+    */
+    funcdef patristic_distances(PatristicDistancesParams params)
+        returns (PatristicDistancesOutput result) authentication required;
+
+    /*
+        tree_ref - (required) reference to the tree
+        leaf_ids - (required) the leaves to keep, at least two
+        ws_id - (optional) workspace to save the pruned tree to
+        output_name - (optional) object name for the saved tree, required with ws_id
+    */
+    typedef structure {
+        Tree_id tree_ref;
+        list<string> leaf_ids;
+        Workspace.ws_id ws_id;
+        string output_name;
+    } PruneTreeParams;
+
+    /*
+        tree - the pruned tree in Newick format, if it was not saved
+        info - the object_info of the saved tree, if ws_id was given
+    */
+    typedef structure {
+        string tree;
+        Workspace.object_info info;
+    } PruneTreeOutput;
+
+    /*
+        Prunes a tree down to a subset of its leaves. Internal nodes left with one child
+        are removed and their branch lengths added to the child's. A saved tree keeps the
+        default_node_labels, ws_refs and kb_refs entries of the nodes that remain.
+    */
+    funcdef prune_tree(PruneTreeParams params)
+        returns (PruneTreeOutput result) authentication required;
+
+    /*
+        tree_refs - (required) references to the trees to compare
+        reference_ref - (optional) compare each tree with this tree instead of every pair of trees
+    */
+    typedef structure {
+        list<Tree_id> tree_refs;
+        Tree_id reference_ref;
+    } CompareTreesParams;
+
+    /*
+        tree_ref_1, tree_ref_2 - the trees compared
+        common_leaves - the number of leaves in both trees, the only ones the comparison considers
+        shared_splits - the number of bipartitions found in both trees
+        rf_distance - the Robinson-Foulds distance, the number of bipartitions found in only one tree
+        normalized_rf - rf_distance divided by the number of bipartitions of both trees
+    */
+    typedef structure {
+        Tree_id tree_ref_1;
+        Tree_id tree_ref_2;
+        int common_leaves;
+        int shared_splits;
+        int rf_distance;
+        float normalized_rf;
+    } TreeComparison;
+
+    typedef structure {
+        list<TreeComparison> comparisons;
+    } CompareTreesOutput;
+
+    /*
+        Compares trees as unrooted trees by their bipartitions, returning the
+        Robinson-Foulds distance and shared bipartitions of each pair.
+    */
+    funcdef compare_trees(CompareTreesParams params)
+        returns (CompareTreesOutput result) authentication required;
+
+    /*
+        tree_refs - (required) references to the trees, which must all have the same leaves
+        method - (optional) "majority" for a majority rule consensus (the default) or "strict"
+        ws_id - (required) workspace to save the consensus tree to
+        output_name - (required) object name for the consensus tree
+    */
+    typedef structure {
+        list<Tree_id> tree_refs;
+        string method;
+        Workspace.ws_id ws_id;
+        string output_name;
+    } ConsensusTreeParams;
+
+    /*
+        info - the object_info of the saved consensus tree
+    */
+    typedef structure {
+        Workspace.object_info info;
+    } ConsensusTreeOutput;
+
+    /*
+        Builds the consensus of a set of trees, such as bootstrap replicates, labeling each
+        internal node with the fraction of the trees that have its bipartition.
+    */
+    funcdef consensus_tree(ConsensusTreeParams params)
+        returns (ConsensusTreeOutput result) authentication required;
+
+    /*
+        input_ref - (required) reference to the tree
+        destination_dir - (required) directory to write the file to
+        format - (required) "newick", "nexus", "phyloxml", "nexml" or "json"
+        compression - (optional) "gzip" or "zstd" to compress the file while writing it
+    */
+    typedef structure {
+        Tree_id input_ref;
+        string destination_dir;
+        string format;
+        string compression;
+    } TreeToFileParams;
+
+    typedef structure {
+        string file_path;
+    } TreeToFileOutput;
+
+    /*
+        Writes a tree to a file in one of several formats. Nodes are annotated with their
+        default_node_labels, ws_refs and kb_refs entries where the format has a place for them.
+    */
+    funcdef tree_to_file(TreeToFileParams params)
+        returns (TreeToFileOutput result) authentication required;
+
+    /*
+        file_paths - (required) Newick or Nexus files, directories of them or tar archives of
+            them in the scratch directory. Files may be gzip compressed.
+        ws_id - (required) workspace to save the trees to
+    */
+    typedef structure {
+        list<string> file_paths;
+        Workspace.ws_id ws_id;
+    } NewickFilesToTreesParams;
+
+    /*
+        infos - the object_info of each saved tree
+        errors - files, or trees of a file holding several, that could not be imported,
+            mapped to the reason
+    */
+    typedef structure {
+        list<Workspace.object_info> infos;
+        mapping<string, string> errors;
+    } NewickFilesToTreesOutput;
+
+    /*
+        Imports the trees of Newick and Nexus files as Tree objects, deriving their leaf_list
+        and default_node_labels. Each tree is named after its file, and after its name or
+        position in the file when a file holds several trees.
+    */
+    funcdef newick_files_to_trees(NewickFilesToTreesParams params)
+        returns (NewickFilesToTreesOutput result) authentication required;
+
 };
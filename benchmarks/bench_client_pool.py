@@ -0,0 +1,85 @@
+"""Compares the latency of sequential JSON-RPC calls with and without connection reuse.
+
+usage: python benchmarks/bench_client_pool.py [--calls 1000]
+
+A local stub server answers every call with a small JSON-RPC result over
+HTTP/1.1 keep-alive. The old path posts each call with requests.post, which
+opens a new connection every time, as the generated BaseClient does. The new
+path is BaseClient._call of a client given pooled connections by
+pool_connections, as Utils does.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from TreeUtils.TreeUtilsClient import TreeUtils  # noqa: E402
+from TreeUtils.core.ClientSession import pool_connections  # noqa: E402
+
+RESPONSE = json.dumps({'version': '1.1', 'result': [{'ok': 1}]}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, which stalls on delayed ACKs with Nagle on
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def post_each(url, calls):
+    for _ in range(calls):
+        body = json.dumps({'method': 'Stub.ping', 'params': [{}], 'version': '1.1',
+                           'id': str(random.random())[2:]})
+        requests.post(url, data=body, timeout=60).json()
+
+
+def pooled(url, calls):
+    client = pool_connections(TreeUtils(url, ignore_authrc=True))._client
+    for _ in range(calls):
+        client._call(url, 'Stub.ping', [{}])
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    try:
+        before = timed(post_each, url, args.calls)
+        after = timed(pooled, url, args.calls)
+    finally:
+        server.shutdown()
+    print("{:>8} {:>14} {:>14}".format("calls", "before ms/call", "after ms/call"))
+    print("{:>8} {:>14.3f} {:>14.3f}".format(
+        args.calls, before * 1000 / args.calls, after * 1000 / args.calls))
+
+
+if __name__ == '__main__':
+    main()
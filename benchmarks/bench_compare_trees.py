@@ -0,0 +1,50 @@
+"""Times all-pairs Robinson-Foulds comparison of random trees with one and several processes.
+
+usage: python benchmarks/bench_compare_trees.py [--trees 100] [--leaves 2000] [--workers 4]
+
+Every tree has the same leaves, as bootstrap replicates do, and the splits of
+all trees are computed once before the pairs are compared.
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core.ArrayTree import ArrayTree  # noqa: E402
+from TreeUtils.core.Splits import all_pairs, compare_trees, tree_splits  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--leaves', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    leaf_index = {}
+    splits = [tree_splits(ArrayTree.from_newick(random_newick(args.leaves, seed)), leaf_index)
+              for seed in range(args.trees)]
+    parsed = time.perf_counter() - start
+    pairs = all_pairs(len(splits))
+    print("{} trees of {} leaves parsed and split in {:.2f} s, {} pairs".format(
+        args.trees, args.leaves, parsed, len(pairs)))
+    print("{:>8} {:>10}".format("workers", "compare s"))
+    for workers in sorted({1, args.workers}):
+        pool = get_context('forkserver').Pool(workers) if workers > 1 else None
+        if pool:
+            # the server's shared pool is warm after its first call
+            compare_trees(splits, pairs[:workers * 4], workers, pool)
+        start = time.perf_counter()
+        compare_trees(splits, pairs, workers, pool)
+        print("{:>8} {:>10.2f}".format(workers, time.perf_counter() - start))
+        if pool:
+            pool.terminate()
+
+
+if __name__ == '__main__':
+    main()
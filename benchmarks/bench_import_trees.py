@@ -0,0 +1,54 @@
+"""Times parsing a directory of gene tree files for import with one and several processes.
+
+usage: python benchmarks/bench_import_trees.py [--files 10000] [--leaves 50] [--workers 4]
+
+Each file holds one random tree. Only reading, validating and building the tree
+data is timed, as newick_files_to_trees does before handing trees to
+save_objects_stream, since saving depends on the workspace rather than this module.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core.TreeReaders import read_tree_files  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=10000)
+    parser.add_argument('--leaves', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        file_paths = []
+        for seed in range(args.files):
+            file_paths.append(os.path.join(directory, "gene_{}.nwk".format(seed)))
+            with open(file_paths[-1], 'w') as f:
+                f.write(random_newick(args.leaves, seed))
+        print("{} files of {} leaves".format(args.files, args.leaves))
+        print("{:>8} {:>10} {:>8}".format("workers", "parse s", "trees"))
+        for workers in sorted({1, args.workers}):
+            pool = get_context('forkserver').Pool(workers) if workers > 1 else None
+            if pool:
+                # the server's shared pool is warm after its first call
+                list(read_tree_files(file_paths[:workers * 4], workers, pool))
+            start = time.perf_counter()
+            trees = sum(len(results) for results in read_tree_files(file_paths, workers, pool))
+            print("{:>8} {:>10.2f} {:>8}".format(workers, time.perf_counter() - start, trees))
+            if pool:
+                pool.terminate()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
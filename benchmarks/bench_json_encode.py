@@ -0,0 +1,61 @@
+"""Compares encoding a large get_trees response with the json module and encode_json.
+
+usage: python benchmarks/bench_json_encode.py [--sizes 10000 100000 1000000]
+
+The before path is the server's previous json.dumps with a custom encoder class
+followed by a UTF-8 encode of the string. The after path is encode_json, which
+uses orjson or ujson when installed and produces bytes directly.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core import JsonEncoding  # noqa: E402
+from TreeUtils.core.JsonEncoding import encode_json  # noqa: E402
+
+
+class JSONObjectEncoder(json.JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        return json.JSONEncoder.default(self, obj)
+
+
+def get_trees_response(size):
+    tree = {'tree': random_newick(size), 'type': 'GeneTree',
+            'default_node_labels': {'kb|g.{}'.format(i): 'genome {}'.format(i)
+                                    for i in range(size)},
+            'ws_refs': {'kb|g.{}'.format(i): {'g': ['1/{}/1'.format(i)]} for i in range(size)}}
+    return {'version': '1.1', 'id': '1', 'result': [[{'data': tree, 'info': []}]]}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    encoder = ('orjson' if JsonEncoding.orjson else 'ujson' if JsonEncoding.ujson else 'json')
+    print("encoder: " + encoder)
+    print("{:>10} {:>10} {:>12} {:>12}".format("leaves", "MiB", "before s", "after s"))
+    for size in args.sizes:
+        response = get_trees_response(size)
+        before = timed(lambda r: json.dumps(r, cls=JSONObjectEncoder).encode('utf8'), response)
+        after = timed(encode_json, response)
+        print("{:>10} {:>10.1f} {:>12.3f} {:>12.3f}".format(
+            size, len(encode_json(response)) / 2 ** 20, before, after))
+
+
+if __name__ == '__main__':
+    main()
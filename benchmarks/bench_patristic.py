@@ -0,0 +1,90 @@
+"""Compares a patristic distance matrix from per-pair walks against the vectorized LCA path.
+
+usage: python benchmarks/bench_patristic.py [--sizes 200 1000 3000]
+
+The old path walks from each leaf of a pair to the root, as an ete3 get_distance
+call does, so it is only timed for up to --walk-limit leaves. The new path computes
+blocks of rows with LCAIndex.distances, the way Utils.patristic_distances does.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core.ArrayTree import ArrayTree  # noqa: E402
+from TreeUtils.core.LCAIndex import LCAIndex  # noqa: E402
+
+BLOCK_SIZE = 2 ** 22
+
+
+def per_pair(tree, leaves):
+    parent = tree.parent.tolist()
+    length = np.nan_to_num(tree.length).tolist()
+
+    def path(node):
+        distances = {}
+        total = 0.0
+        while node != -1:
+            distances[node] = total
+            total += length[node]
+            node = parent[node]
+        return distances
+
+    n = len(leaves)
+    matrix = np.zeros((n, n))
+    for i, u in enumerate(leaves):
+        up = path(u)
+        for j in range(i + 1, n):
+            node, total = leaves[j], 0.0
+            while node not in up:
+                total += length[node]
+                node = parent[node]
+            matrix[i, j] = matrix[j, i] = total + up[node]
+    return matrix
+
+
+def vectorized(tree, leaves):
+    index = LCAIndex(tree)
+    leaves = np.asarray(leaves)
+    n = len(leaves)
+    matrix = np.empty((n, n))
+    rows = max(1, BLOCK_SIZE // n)
+    for start in range(0, n, rows):
+        block = leaves[start:start + rows]
+        matrix[start:start + len(block)] = index.distances(
+            np.repeat(block, n), np.tile(leaves, len(block))).reshape(len(block), n)
+    return matrix
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1000, 3000])
+    parser.add_argument('--walk-limit', type=int, default=1000)
+    args = parser.parse_args()
+
+    print("{:>8} {:>12} {:>12}".format("leaves", "before s", "after s"))
+    for size in args.sizes:
+        tree = ArrayTree.from_newick(random_newick(size))
+        leaves = tree.leaves().tolist()
+        after, matrix = timed(vectorized, tree, leaves)
+        before = "-"
+        if size <= args.walk_limit:
+            elapsed, expected = timed(per_pair, tree, leaves)
+            np.testing.assert_allclose(matrix, expected, atol=1e-9)
+            before = "{:.3f}".format(elapsed)
+        print("{:>8} {:>12} {:>12.3f}".format(size, before, after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Compares peak memory of parsing and saving a large save_trees request whole and streamed.
+
+usage: python benchmarks/bench_stream_save.py [--trees 50] [--leaves 20000]
+
+The request body is written to a file to stand in for the WSGI input stream and
+DataFileUtil is replaced by a stub that serializes each batch, as the JSON-RPC
+client does. The old path reads the body, parses it with json.loads and saves
+the list with Utils.save_objects. The new path spools the body and parses it
+with RequestStream, saving the trees with Utils.save_objects_stream as they
+are parsed. Requires ijson.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+os.environ.setdefault('SDK_CALLBACK_URL', 'http://localhost:5000')
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core import RequestStream  # noqa: E402
+from TreeUtils.core.Utils import Utils  # noqa: E402
+
+
+class StubDataFileUtil:
+    def save_objects(self, params):
+        json.dumps(params)
+        return [[i, o.get('name'), o['type']] for i, o in enumerate(params['objects'])]
+
+
+def write_body(path, n_trees, n_leaves):
+    with open(path, 'w') as out:
+        out.write('{"method": "TreeUtils.save_trees", "params": [{"ws_id": 1, "trees": [')
+        for i in range(n_trees):
+            tree = {'name': 'tree_{}'.format(i),
+                    'data': {'tree': random_newick(n_leaves, seed=i), 'type': 'GeneTree',
+                             'default_node_labels': {'kb|g.{}'.format(j): 'genome {}'.format(j)
+                                                     for j in range(n_leaves)}}}
+            out.write((', ' if i else '') + json.dumps(tree))
+        out.write(']}], "version": "1.1", "id": "1"}')
+
+
+def whole(utils, path):
+    with open(path, 'rb') as body:
+        req = json.loads(body.read())
+    trees = req['params'][0]['trees']
+    trees = [utils.check_tree_object(i, t) for i, t in enumerate(trees)]
+    utils.validate_trees([t['data']['tree'] for t in trees])
+    return len(utils.save_objects(1, trees))
+
+
+def streamed(utils, path):
+    with open(path, 'rb') as body:
+        spool = RequestStream.spool_body(body, os.path.getsize(path))
+    with spool:
+        req = RequestStream.load_request(spool)
+        trees = req['params'][0]['trees']
+        trees = (utils.check_tree_object(i, t) for i, t in enumerate(trees))
+        return len(utils.save_objects_stream(1, trees))
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    saved = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return saved, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trees', type=int, default=50)
+    parser.add_argument('--leaves', type=int, default=20000)
+    args = parser.parse_args()
+    if not RequestStream.STREAMING:
+        sys.exit("ijson is not installed")
+
+    scratch = tempfile.mkdtemp()
+    path = os.path.join(scratch, 'body.json')
+    write_body(path, args.trees, args.leaves)
+    utils = Utils({'scratch': scratch, 'workspace-url': 'http://localhost:5000',
+                   'save-batch-max-bytes': 8 * 2 ** 20})
+    utils.dfu = StubDataFileUtil()
+    print("body {:.1f} MiB, {} trees".format(os.path.getsize(path) / 2 ** 20, args.trees))
+    print("{:>10} {:>8} {:>10} {:>10}".format("path", "saved", "seconds", "peak MiB"))
+    for name, func in (("whole", whole), ("streamed", streamed)):
+        saved, elapsed, peak = measure(func, utils, path)
+        print("{:>10} {:>8} {:>10.2f} {:>10.1f}".format(name, saved, elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
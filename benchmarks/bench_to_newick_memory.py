@@ -0,0 +1,76 @@
+"""Compares peak memory of writing a tree to a newick file before and after streaming.
+
+usage: python benchmarks/bench_to_newick_memory.py [--sizes 10000 100000 1000000]
+
+The workspace is replaced by a stub that decodes a serialized response, as the
+JSON-RPC client does, so the cost of decoding the object is part of the peak.
+The old path fetches the whole object and writes the tree with a single call.
+The new path is Utils.to_newick, which requests only the tree and streams it.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+os.environ.setdefault('SDK_CALLBACK_URL', 'http://localhost:5000')
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core.Utils import Utils  # noqa: E402
+
+INFO = [1, 'bench_tree', 'KBaseTrees.Tree-1.0', '', 1, 'user', 1, 'ws', '', 0, {}]
+
+
+class StubWorkspace:
+    def __init__(self, tree_obj):
+        self.tree_obj = tree_obj
+
+    def _response(self, included):
+        data = self.tree_obj
+        if included:
+            data = {k: v for k, v in data.items() if k in included}
+        return json.dumps({'data': [{'data': data, 'info': INFO}]})
+
+    def get_objects2(self, params):
+        return json.loads(self._response(params['objects'][0].get('included')))
+
+
+def write_whole(workspace, destination_dir):
+    res = workspace.get_objects2({'objects': [{'ref': '1/1/1'}]})['data'][0]
+    with open(os.path.join(destination_dir, res['info'][1] + ".newick"), 'w') as out_file:
+        out_file.write(res['data']['tree'])
+
+
+def peak(func, *args):
+    tracemalloc.start()
+    func(*args)
+    result = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    utils = Utils({'scratch': scratch, 'workspace-url': 'http://localhost:5000'})
+    print("{:>10} {:>12} {:>14} {:>14}".format("leaves", "tree MiB", "before MiB", "after MiB"))
+    for size in args.sizes:
+        newick = random_newick(size)
+        tree_obj = {'tree': newick, 'type': 'GeneTree',
+                    'default_node_labels': {'kb|g.{}'.format(i): 'genome {}'.format(i)
+                                            for i in range(size)}}
+        workspace = StubWorkspace(tree_obj)
+        utils.ws = workspace
+        before = peak(write_whole, workspace, scratch)
+        after = peak(utils.to_newick, {'input_ref': '1/1', 'destination_dir': scratch})
+        print("{:>10} {:>12.1f} {:>14.1f} {:>14.1f}".format(
+            size, len(newick) / 2 ** 20, before / 2 ** 20, after / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Compares token cache throughput under many threads before and after the LRU rewrite.
+
+usage: python benchmarks/bench_token_cache.py [--threads 1 8 32] [--ops 20000] [--tokens 100000]
+       [--maxsize 2000]
+
+Each thread looks up tokens drawn with a heavy tailed distribution from a pool
+larger than the cache and adds the ones that miss, as KBaseAuth.get_user does,
+so the cache overflows continually. Every miss is a call to the auth service.
+The old cache is the previous TokenCache, which sorted all entries under a class
+wide lock on overflow and then dropped the older half of them.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from TreeUtils.authclient import TokenCache  # noqa: E402
+
+
+class OldTokenCache(object):
+
+    _MAX_TIME_SEC = 5 * 60
+
+    _lock = threading.RLock()
+
+    def __init__(self, maxsize=2000):
+        self._cache = {}
+        self._maxsize = maxsize
+        self._halfmax = maxsize / 2
+
+    def get_user(self, token):
+        token = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        with self._lock:
+            usertime = self._cache.get(token)
+        if not usertime:
+            return None
+        user, intime = usertime
+        if time.time() - intime > self._MAX_TIME_SEC:
+            return None
+        return user
+
+    def add_valid_token(self, token, user):
+        token = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._cache[token] = [user, time.time()]
+            if len(self._cache) > self._maxsize:
+                sorted_items = sorted(list(self._cache.items()), key=(lambda v: v[1][1]))
+                for i, (t, _) in enumerate(sorted_items):
+                    if i <= self._halfmax:
+                        del self._cache[t]
+                    else:
+                        break
+
+
+def worker(cache, tokens, ops, seed, misses):
+    rand = random.Random(seed)
+    missed = 0
+    for _ in range(ops):
+        # a few users make most of the requests
+        token = tokens[min(int(rand.paretovariate(0.5)) - 1, len(tokens) - 1)]
+        if cache.get_user(token) is None:
+            missed += 1
+            cache.add_valid_token(token, 'user_' + token)
+    misses.append(missed)
+
+
+def run(cache, threads, ops, tokens):
+    """Returns the throughput in operations per second and the fraction of lookups that hit"""
+    misses = []
+    pool = [threading.Thread(target=worker, args=(cache, tokens, ops, i, misses))
+            for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * ops / elapsed, 1 - sum(misses) / (threads * ops)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--tokens', type=int, default=100000)
+    parser.add_argument('--maxsize', type=int, default=2000)
+    args = parser.parse_args()
+
+    tokens = ['token_{}'.format(i) for i in range(args.tokens)]
+    print("{:>8} {:>14} {:>14} {:>12} {:>12}".format(
+        "threads", "before ops/s", "after ops/s", "before hits", "after hits"))
+    for threads in args.threads:
+        before, before_hits = run(OldTokenCache(args.maxsize), threads, args.ops, tokens)
+        after, after_hits = run(TokenCache(args.maxsize), threads, args.ops, tokens)
+        print("{:>8} {:>14,.0f} {:>14,.0f} {:>12.1%} {:>12.1%}".format(
+            threads, before, after, before_hits, after_hits))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Measures the speed and extra memory of the streaming tree writers for each export format.
+
+usage: python benchmarks/bench_tree_writers.py [--leaves 1000000] [--memory]
+
+The tree is parsed before measuring, so peak memory only counts what a writer
+allocates on top of the parsed tree. Output is consumed piece by piece without
+being kept, as Utils.write_text does. Peak memory is measured with tracemalloc,
+which slows the writers down, so it is only collected when --memory is given.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core.ArrayTree import ArrayTree  # noqa: E402
+from TreeUtils.core.TreeWriters import WRITERS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leaves', type=int, default=1000000)
+    parser.add_argument('--memory', action='store_true')
+    args = parser.parse_args()
+
+    tree = ArrayTree.from_newick(random_newick(args.leaves))
+    node_maps = {'default_node_labels': {"kb|g.{}".format(i): "Genome {}".format(i)
+                                         for i in range(0, args.leaves, 10)}}
+    print("tree of {} leaves, {:.1f} MB parsed".format(args.leaves, tree.nbytes / 2 ** 20))
+    print("{:>10} {:>10} {:>12} {:>14}".format("format", "seconds", "output MB", "peak extra MB"))
+    for name, (writer, _) in WRITERS.items():
+        if args.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        size = sum(len(piece) for piece in writer(tree, node_maps, 'bench'))
+        elapsed = time.perf_counter() - start
+        peak = '-'
+        if args.memory:
+            peak = "{:.1f}".format(tracemalloc.get_traced_memory()[1] / 2 ** 20)
+            tracemalloc.stop()
+        print("{:>10} {:>10.2f} {:>12.1f} {:>14}".format(name, elapsed, size / 2 ** 20, peak))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Compares Newick validation with the single pass tokenizer against building an ete3 tree.
+
+usage: python benchmarks/bench_validate_newick.py [--sizes 1000 100000 1000000] [--memory]
+
+Peak memory is measured with tracemalloc, which slows both paths down noticeably, so it is
+only collected when --memory is given.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+from synthetic_trees import random_newick  # noqa: E402
+from TreeUtils.core.Newick import check_newick  # noqa: E402
+
+
+def validate_ete3(newick):
+    import ete3
+    ete3.Tree(newick, format=1)
+
+
+def measure(func, newick, memory):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func(newick)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--memory', action='store_true', help="also report peak memory")
+    parser.add_argument('--skip-ete3', action='store_true')
+    args = parser.parse_args()
+
+    candidates = [('tokenizer', check_newick)]
+    if not args.skip_ete3:
+        candidates.append(('ete3', validate_ete3))
+
+    print("{:>10} {:>12} {:>10} {:>12}".format("leaves", "method", "seconds", "peak MiB"))
+    for size in args.sizes:
+        newick = random_newick(size)
+        for name, func in candidates:
+            elapsed, peak = measure(func, newick, args.memory)
+            peak = "{:.1f}".format(peak / 2 ** 20) if peak is not None else "-"
+            print("{:>10} {:>12} {:>10.3f} {:>12}".format(size, name, elapsed, peak))
+
+
+if __name__ == '__main__':
+    main()
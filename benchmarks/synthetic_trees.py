@@ -0,0 +1,26 @@
+"""Helpers for building synthetic trees for the benchmarks in this directory"""
+import random
+
+
+def random_newick(n_leaves, seed=0):
+    """Returns a random binary Newick tree with n_leaves uniquely named leaves"""
+    rng = random.Random(seed)
+    parts = []
+    # each stack entry is a leaf range still to write, or a closing string
+    stack = [(0, n_leaves)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        lo, hi = item
+        if hi - lo == 1:
+            parts.append("kb|g.{}:{:.5f}".format(lo, rng.random()))
+            continue
+        mid = rng.randint(lo + 1, hi - 1)
+        parts.append("(")
+        stack.append("){:.3f}:{:.5f}".format(rng.random(), rng.random()))
+        stack.append((mid, hi))
+        stack.append(",")
+        stack.append((lo, mid))
+    return "".join(parts).rsplit(':', 1)[0] + ";"
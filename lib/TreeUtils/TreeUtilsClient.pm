@@ -510,6 +510,8 @@ $result is a TreeUtils.TreeToNewickFileOutput
 TreeToNewickFileParams is a reference to a hash where the following keys are defined:
 	input_ref has a value which is a TreeUtils.Tree_id
 	destination_dir has a value which is a string
+	compression has a value which is a string
+	relabel has a value which is a string
 Tree_id is a string
 TreeToNewickFileOutput is a reference to a hash where the following keys are defined:
 	file_path has a value which is a string
@@ -525,6 +527,8 @@ $result is a TreeUtils.TreeToNewickFileOutput
 TreeToNewickFileParams is a reference to a hash where the following keys are defined:
 	input_ref has a value which is a TreeUtils.Tree_id
 	destination_dir has a value which is a string
+	compression has a value which is a string
+	relabel has a value which is a string
 Tree_id is a string
 TreeToNewickFileOutput is a reference to a hash where the following keys are defined:
 	file_path has a value which is a string
@@ -603,6 +607,8 @@ $params is a TreeUtils.ExportTreeParams
 $result is a TreeUtils.ExportTreeOutput
 ExportTreeParams is a reference to a hash where the following keys are defined:
 	input_ref has a value which is a TreeUtils.Tree_id
+	compression has a value which is a string
+	relabel has a value which is a string
 Tree_id is a string
 ExportTreeOutput is a reference to a hash where the following keys are defined:
 	shock_id has a value which is a string
@@ -617,6 +623,8 @@ $params is a TreeUtils.ExportTreeParams
 $result is a TreeUtils.ExportTreeOutput
 ExportTreeParams is a reference to a hash where the following keys are defined:
 	input_ref has a value which is a TreeUtils.Tree_id
+	compression has a value which is a string
+	relabel has a value which is a string
 Tree_id is a string
 ExportTreeOutput is a reference to a hash where the following keys are defined:
 	shock_id has a value which is a string
@@ -678,96 +686,1731 @@ ExportTreeOutput is a reference to a hash where the following keys are defined:
     }
 }
  
-  
-sub status
+
+
+=head2 trees_to_newick_files
+
+  $result = $obj->trees_to_newick_files($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.TreesToNewickFilesParams
+$result is a TreeUtils.TreesToNewickFilesOutput
+TreesToNewickFilesParams is a reference to a hash where the following keys are defined:
+	input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	destination_dir has a value which is a string
+Tree_id is a string
+TreesToNewickFilesOutput is a reference to a hash where the following keys are defined:
+	file_paths has a value which is a reference to a hash where the key is a string and the value is a string
+	errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.TreesToNewickFilesParams
+$result is a TreeUtils.TreesToNewickFilesOutput
+TreesToNewickFilesParams is a reference to a hash where the following keys are defined:
+	input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	destination_dir has a value which is a string
+Tree_id is a string
+TreesToNewickFilesOutput is a reference to a hash where the following keys are defined:
+	file_paths has a value which is a reference to a hash where the key is a string and the value is a string
+	errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+
+
+=item Description
+
+
+
+=back
+
+=cut
+
+ sub trees_to_newick_files
 {
     my($self, @args) = @_;
-    if ((my $n = @args) != 0) {
-        Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
-                                   "Invalid argument count for function status (received $n, expecting 0)");
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function trees_to_newick_files (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to trees_to_newick_files:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'trees_to_newick_files');
+	}
     }
+
     my $url = $self->{url};
     my $result = $self->{client}->call($url, $self->{headers}, {
-        method => "TreeUtils.status",
-        params => \@args,
+	    method => "TreeUtils.trees_to_newick_files",
+	    params => \@args,
     });
     if ($result) {
-        if ($result->is_error) {
-            Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
-                           code => $result->content->{error}->{code},
-                           method_name => 'status',
-                           data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
-                          );
-        } else {
-            return wantarray ? @{$result->result} : $result->result->[0];
-        }
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'trees_to_newick_files',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
     } else {
-        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method status",
-                        status_line => $self->{client}->status_line,
-                        method_name => 'status',
-                       );
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method trees_to_newick_files",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'trees_to_newick_files',
+				       );
     }
 }
-   
+ 
+
+
+=head2 export_trees_newick
+
+  $result = $obj->export_trees_newick($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.ExportTreesParams
+$result is a TreeUtils.ExportTreesOutput
+ExportTreesParams is a reference to a hash where the following keys are defined:
+	input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	archive has a value which is a string
+Tree_id is a string
+ExportTreesOutput is a reference to a hash where the following keys are defined:
+	shock_id has a value which is a string
+	errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.ExportTreesParams
+$result is a TreeUtils.ExportTreesOutput
+ExportTreesParams is a reference to a hash where the following keys are defined:
+	input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	archive has a value which is a string
+Tree_id is a string
+ExportTreesOutput is a reference to a hash where the following keys are defined:
+	shock_id has a value which is a string
+	errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+
+
+=item Description
+
+
+
+=back
+
+=cut
+
+ sub export_trees_newick
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function export_trees_newick (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to export_trees_newick:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'export_trees_newick');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.export_trees_newick",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'export_trees_newick',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method export_trees_newick",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'export_trees_newick',
+				       );
+    }
+}
+ 
+
+
+=head2 lowest_common_ancestors
+
+  $result = $obj->lowest_common_ancestors($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.LCAParams
+$result is a TreeUtils.LCAOutput
+LCAParams is a reference to a hash where the following keys are defined:
+	tree_ref has a value which is a TreeUtils.Tree_id
+	leaf_pairs has a value which is a reference to a list where each element is a reference to a list containing 2 items:
+		0: a string
+		1: a string
+Tree_id is a string
+LCAOutput is a reference to a hash where the following keys are defined:
+	ancestors has a value which is a reference to a list where each element is a TreeUtils.TreeNode
+TreeNode is a reference to a hash where the following keys are defined:
+	node has a value which is an int
+	label has a value which is a string
+	leaf_count has a value which is an int
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.LCAParams
+$result is a TreeUtils.LCAOutput
+LCAParams is a reference to a hash where the following keys are defined:
+	tree_ref has a value which is a TreeUtils.Tree_id
+	leaf_pairs has a value which is a reference to a list where each element is a reference to a list containing 2 items:
+		0: a string
+		1: a string
+Tree_id is a string
+LCAOutput is a reference to a hash where the following keys are defined:
+	ancestors has a value which is a reference to a list where each element is a TreeUtils.TreeNode
+TreeNode is a reference to a hash where the following keys are defined:
+	node has a value which is an int
+	label has a value which is a string
+	leaf_count has a value which is an int
+
+
+=end text
+
+
+
+=item Description
+
+Finds the lowest common ancestor of many pairs of leaves in one call. An index
+of the tree is built once and kept in memory for versioned references.
+
+=back
+
+=cut
+
+ sub lowest_common_ancestors
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function lowest_common_ancestors (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to lowest_common_ancestors:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'lowest_common_ancestors');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.lowest_common_ancestors",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'lowest_common_ancestors',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method lowest_common_ancestors",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'lowest_common_ancestors',
+				       );
+    }
+}
+ 
+
+
+=head2 patristic_distances
+
+  $result = $obj->patristic_distances($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.PatristicDistancesParams
+$result is a TreeUtils.PatristicDistancesOutput
+PatristicDistancesParams is a reference to a hash where the following keys are defined:
+	tree_ref has a value which is a TreeUtils.Tree_id
+	leaf_ids has a value which is a reference to a list where each element is a string
+	to_file has a value which is an int
+Tree_id is a string
+PatristicDistancesOutput is a reference to a hash where the following keys are defined:
+	leaf_ids has a value which is a reference to a list where each element is a string
+	distances has a value which is a reference to a list where each element is a reference to a list where each element is a float
+	file_path has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.PatristicDistancesParams
+$result is a TreeUtils.PatristicDistancesOutput
+PatristicDistancesParams is a reference to a hash where the following keys are defined:
+	tree_ref has a value which is a TreeUtils.Tree_id
+	leaf_ids has a value which is a reference to a list where each element is a string
+	to_file has a value which is an int
+Tree_id is a string
+PatristicDistancesOutput is a reference to a hash where the following keys are defined:
+	leaf_ids has a value which is a reference to a list where each element is a string
+	distances has a value which is a reference to a list where each element is a reference to a list where each element is a float
+	file_path has a value which is a string
+
+
+=end text
+
+
+
+=item Description
+
+Computes the patristic distance between every pair of leaves, from the distance
+of each leaf to the root and the lowest common ancestor of the pair.
+
+=back
+
+=cut
+
+ sub patristic_distances
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function patristic_distances (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to patristic_distances:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'patristic_distances');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.patristic_distances",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'patristic_distances',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method patristic_distances",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'patristic_distances',
+				       );
+    }
+}
+ 
+
+
+=head2 prune_tree
+
+  $result = $obj->prune_tree($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.PruneTreeParams
+$result is a TreeUtils.PruneTreeOutput
+PruneTreeParams is a reference to a hash where the following keys are defined:
+	tree_ref has a value which is a TreeUtils.Tree_id
+	leaf_ids has a value which is a reference to a list where each element is a string
+	ws_id has a value which is a Workspace.ws_id
+	output_name has a value which is a string
+Tree_id is a string
+ws_id is an int
+PruneTreeOutput is a reference to a hash where the following keys are defined:
+	tree has a value which is a string
+	info has a value which is a Workspace.object_info
+object_info is a reference to a list containing 11 items:
+	0: (objid) a Workspace.obj_id
+	1: (name) a Workspace.obj_name
+	2: (type) a Workspace.type_string
+	3: (save_date) a Workspace.timestamp
+	4: (version) an int
+	5: (saved_by) a Workspace.username
+	6: (wsid) a Workspace.ws_id
+	7: (workspace) a Workspace.ws_name
+	8: (chsum) a string
+	9: (size) an int
+	10: (meta) a Workspace.usermeta
+obj_id is an int
+obj_name is a string
+type_string is a string
+timestamp is a string
+username is a string
+ws_name is a string
+usermeta is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.PruneTreeParams
+$result is a TreeUtils.PruneTreeOutput
+PruneTreeParams is a reference to a hash where the following keys are defined:
+	tree_ref has a value which is a TreeUtils.Tree_id
+	leaf_ids has a value which is a reference to a list where each element is a string
+	ws_id has a value which is a Workspace.ws_id
+	output_name has a value which is a string
+Tree_id is a string
+ws_id is an int
+PruneTreeOutput is a reference to a hash where the following keys are defined:
+	tree has a value which is a string
+	info has a value which is a Workspace.object_info
+object_info is a reference to a list containing 11 items:
+	0: (objid) a Workspace.obj_id
+	1: (name) a Workspace.obj_name
+	2: (type) a Workspace.type_string
+	3: (save_date) a Workspace.timestamp
+	4: (version) an int
+	5: (saved_by) a Workspace.username
+	6: (wsid) a Workspace.ws_id
+	7: (workspace) a Workspace.ws_name
+	8: (chsum) a string
+	9: (size) an int
+	10: (meta) a Workspace.usermeta
+obj_id is an int
+obj_name is a string
+type_string is a string
+timestamp is a string
+username is a string
+ws_name is a string
+usermeta is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+
+
+=item Description
+
+Prunes a tree down to a subset of its leaves. Internal nodes left with one child
+are removed and their branch lengths added to the child's. A saved tree keeps the
+default_node_labels, ws_refs and kb_refs entries of the nodes that remain.
+
+=back
+
+=cut
+
+ sub prune_tree
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function prune_tree (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to prune_tree:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'prune_tree');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.prune_tree",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'prune_tree',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method prune_tree",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'prune_tree',
+				       );
+    }
+}
+ 
+
+
+=head2 compare_trees
+
+  $result = $obj->compare_trees($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.CompareTreesParams
+$result is a TreeUtils.CompareTreesOutput
+CompareTreesParams is a reference to a hash where the following keys are defined:
+	tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	reference_ref has a value which is a TreeUtils.Tree_id
+Tree_id is a string
+CompareTreesOutput is a reference to a hash where the following keys are defined:
+	comparisons has a value which is a reference to a list where each element is a TreeUtils.TreeComparison
+TreeComparison is a reference to a hash where the following keys are defined:
+	tree_ref_1 has a value which is a TreeUtils.Tree_id
+	tree_ref_2 has a value which is a TreeUtils.Tree_id
+	common_leaves has a value which is an int
+	shared_splits has a value which is an int
+	rf_distance has a value which is an int
+	normalized_rf has a value which is a float
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.CompareTreesParams
+$result is a TreeUtils.CompareTreesOutput
+CompareTreesParams is a reference to a hash where the following keys are defined:
+	tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	reference_ref has a value which is a TreeUtils.Tree_id
+Tree_id is a string
+CompareTreesOutput is a reference to a hash where the following keys are defined:
+	comparisons has a value which is a reference to a list where each element is a TreeUtils.TreeComparison
+TreeComparison is a reference to a hash where the following keys are defined:
+	tree_ref_1 has a value which is a TreeUtils.Tree_id
+	tree_ref_2 has a value which is a TreeUtils.Tree_id
+	common_leaves has a value which is an int
+	shared_splits has a value which is an int
+	rf_distance has a value which is an int
+	normalized_rf has a value which is a float
+
+
+=end text
+
+
+
+=item Description
+
+Compares trees as unrooted trees by their bipartitions, returning the
+Robinson-Foulds distance and shared bipartitions of each pair.
+
+=back
+
+=cut
+
+ sub compare_trees
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function compare_trees (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to compare_trees:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'compare_trees');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.compare_trees",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'compare_trees',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method compare_trees",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'compare_trees',
+				       );
+    }
+}
+ 
+
+
+=head2 consensus_tree
+
+  $result = $obj->consensus_tree($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.ConsensusTreeParams
+$result is a TreeUtils.ConsensusTreeOutput
+ConsensusTreeParams is a reference to a hash where the following keys are defined:
+	tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	method has a value which is a string
+	ws_id has a value which is a Workspace.ws_id
+	output_name has a value which is a string
+Tree_id is a string
+ws_id is an int
+ConsensusTreeOutput is a reference to a hash where the following keys are defined:
+	info has a value which is a Workspace.object_info
+object_info is a reference to a list containing 11 items:
+	0: (objid) a Workspace.obj_id
+	1: (name) a Workspace.obj_name
+	2: (type) a Workspace.type_string
+	3: (save_date) a Workspace.timestamp
+	4: (version) an int
+	5: (saved_by) a Workspace.username
+	6: (wsid) a Workspace.ws_id
+	7: (workspace) a Workspace.ws_name
+	8: (chsum) a string
+	9: (size) an int
+	10: (meta) a Workspace.usermeta
+obj_id is an int
+obj_name is a string
+type_string is a string
+timestamp is a string
+username is a string
+ws_name is a string
+usermeta is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.ConsensusTreeParams
+$result is a TreeUtils.ConsensusTreeOutput
+ConsensusTreeParams is a reference to a hash where the following keys are defined:
+	tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+	method has a value which is a string
+	ws_id has a value which is a Workspace.ws_id
+	output_name has a value which is a string
+Tree_id is a string
+ws_id is an int
+ConsensusTreeOutput is a reference to a hash where the following keys are defined:
+	info has a value which is a Workspace.object_info
+object_info is a reference to a list containing 11 items:
+	0: (objid) a Workspace.obj_id
+	1: (name) a Workspace.obj_name
+	2: (type) a Workspace.type_string
+	3: (save_date) a Workspace.timestamp
+	4: (version) an int
+	5: (saved_by) a Workspace.username
+	6: (wsid) a Workspace.ws_id
+	7: (workspace) a Workspace.ws_name
+	8: (chsum) a string
+	9: (size) an int
+	10: (meta) a Workspace.usermeta
+obj_id is an int
+obj_name is a string
+type_string is a string
+timestamp is a string
+username is a string
+ws_name is a string
+usermeta is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+
+
+=item Description
+
+Builds the consensus of a set of trees, such as bootstrap replicates, labeling each
+internal node with the fraction of the trees that have its bipartition.
+
+=back
+
+=cut
+
+ sub consensus_tree
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function consensus_tree (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to consensus_tree:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'consensus_tree');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.consensus_tree",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'consensus_tree',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method consensus_tree",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'consensus_tree',
+				       );
+    }
+}
+ 
+
+
+=head2 tree_to_file
+
+  $result = $obj->tree_to_file($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.TreeToFileParams
+$result is a TreeUtils.TreeToFileOutput
+TreeToFileParams is a reference to a hash where the following keys are defined:
+	input_ref has a value which is a TreeUtils.Tree_id
+	destination_dir has a value which is a string
+	format has a value which is a string
+	compression has a value which is a string
+Tree_id is a string
+TreeToFileOutput is a reference to a hash where the following keys are defined:
+	file_path has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.TreeToFileParams
+$result is a TreeUtils.TreeToFileOutput
+TreeToFileParams is a reference to a hash where the following keys are defined:
+	input_ref has a value which is a TreeUtils.Tree_id
+	destination_dir has a value which is a string
+	format has a value which is a string
+	compression has a value which is a string
+Tree_id is a string
+TreeToFileOutput is a reference to a hash where the following keys are defined:
+	file_path has a value which is a string
+
+
+=end text
+
+
+
+=item Description
+
+Writes a tree to a file in one of several formats. Nodes are annotated with their
+default_node_labels, ws_refs and kb_refs entries where the format has a place for them.
+
+=back
+
+=cut
+
+ sub tree_to_file
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function tree_to_file (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to tree_to_file:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'tree_to_file');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.tree_to_file",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'tree_to_file',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method tree_to_file",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'tree_to_file',
+				       );
+    }
+}
+ 
+
+
+=head2 newick_files_to_trees
+
+  $result = $obj->newick_files_to_trees($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a TreeUtils.NewickFilesToTreesParams
+$result is a TreeUtils.NewickFilesToTreesOutput
+NewickFilesToTreesParams is a reference to a hash where the following keys are defined:
+	file_paths has a value which is a reference to a list where each element is a string
+	ws_id has a value which is a Workspace.ws_id
+ws_id is an int
+NewickFilesToTreesOutput is a reference to a hash where the following keys are defined:
+	infos has a value which is a reference to a list where each element is a Workspace.object_info
+	errors has a value which is a reference to a hash where the key is a string and the value is a string
+object_info is a reference to a list containing 11 items:
+	0: (objid) a Workspace.obj_id
+	1: (name) a Workspace.obj_name
+	2: (type) a Workspace.type_string
+	3: (save_date) a Workspace.timestamp
+	4: (version) an int
+	5: (saved_by) a Workspace.username
+	6: (wsid) a Workspace.ws_id
+	7: (workspace) a Workspace.ws_name
+	8: (chsum) a string
+	9: (size) an int
+	10: (meta) a Workspace.usermeta
+obj_id is an int
+obj_name is a string
+type_string is a string
+timestamp is a string
+username is a string
+ws_name is a string
+usermeta is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a TreeUtils.NewickFilesToTreesParams
+$result is a TreeUtils.NewickFilesToTreesOutput
+NewickFilesToTreesParams is a reference to a hash where the following keys are defined:
+	file_paths has a value which is a reference to a list where each element is a string
+	ws_id has a value which is a Workspace.ws_id
+ws_id is an int
+NewickFilesToTreesOutput is a reference to a hash where the following keys are defined:
+	infos has a value which is a reference to a list where each element is a Workspace.object_info
+	errors has a value which is a reference to a hash where the key is a string and the value is a string
+object_info is a reference to a list containing 11 items:
+	0: (objid) a Workspace.obj_id
+	1: (name) a Workspace.obj_name
+	2: (type) a Workspace.type_string
+	3: (save_date) a Workspace.timestamp
+	4: (version) an int
+	5: (saved_by) a Workspace.username
+	6: (wsid) a Workspace.ws_id
+	7: (workspace) a Workspace.ws_name
+	8: (chsum) a string
+	9: (size) an int
+	10: (meta) a Workspace.usermeta
+obj_id is an int
+obj_name is a string
+type_string is a string
+timestamp is a string
+username is a string
+ws_name is a string
+usermeta is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+
+
+=item Description
+
+Imports the trees of Newick and Nexus files as Tree objects, deriving their leaf_list
+and default_node_labels. Each tree is named after its file, and after its name or
+position in the file when a file holds several trees.
+
+=back
+
+=cut
+
+ sub newick_files_to_trees
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function newick_files_to_trees (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to newick_files_to_trees:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'newick_files_to_trees');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "TreeUtils.newick_files_to_trees",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'newick_files_to_trees',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method newick_files_to_trees",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'newick_files_to_trees',
+				       );
+    }
+}
+ 
+  
+sub status
+{
+    my($self, @args) = @_;
+    if ((my $n = @args) != 0) {
+        Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+                                   "Invalid argument count for function status (received $n, expecting 0)");
+    }
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+        method => "TreeUtils.status",
+        params => \@args,
+    });
+    if ($result) {
+        if ($result->is_error) {
+            Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+                           code => $result->content->{error}->{code},
+                           method_name => 'status',
+                           data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+                          );
+        } else {
+            return wantarray ? @{$result->result} : $result->result->[0];
+        }
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method status",
+                        status_line => $self->{client}->status_line,
+                        method_name => 'status',
+                       );
+    }
+}
+   
+
+sub version {
+    my ($self) = @_;
+    my $result = $self->{client}->call($self->{url}, $self->{headers}, {
+        method => "TreeUtils.version",
+        params => [],
+    });
+    if ($result) {
+        if ($result->is_error) {
+            Bio::KBase::Exceptions::JSONRPC->throw(
+                error => $result->error_message,
+                code => $result->content->{code},
+                method_name => 'export_tree_newick',
+            );
+        } else {
+            return wantarray ? @{$result->result} : $result->result->[0];
+        }
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(
+            error => "Error invoking method export_tree_newick",
+            status_line => $self->{client}->status_line,
+            method_name => 'export_tree_newick',
+        );
+    }
+}
+
+sub _validate_version {
+    my ($self) = @_;
+    my $svr_version = $self->version();
+    my $client_version = $VERSION;
+    my ($cMajor, $cMinor) = split(/\./, $client_version);
+    my ($sMajor, $sMinor) = split(/\./, $svr_version);
+    if ($sMajor != $cMajor) {
+        Bio::KBase::Exceptions::ClientServerIncompatible->throw(
+            error => "Major version numbers differ.",
+            server_version => $svr_version,
+            client_version => $client_version
+        );
+    }
+    if ($sMinor < $cMinor) {
+        Bio::KBase::Exceptions::ClientServerIncompatible->throw(
+            error => "Client minor version greater than Server minor version.",
+            server_version => $svr_version,
+            client_version => $client_version
+        );
+    }
+    if ($sMinor > $cMinor) {
+        warn "New client version available for TreeUtils::TreeUtilsClient\n";
+    }
+    if ($sMajor == 0) {
+        warn "TreeUtils::TreeUtilsClient version is $svr_version. API subject to change.\n";
+    }
+}
+
+=head1 TYPES
+
+
+
+=head2 Tree_id
+
+=over 4
+
+
+
+=item Description
+
+@id kb KBaseTrees.Tree
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a string
+</pre>
+
+=end html
+
+=begin text
+
+a string
+
+=end text
+
+=back
+
+
+
+=head2 GetTreesParams
+
+=over 4
+
+
+
+=item Description
+
+tree_refs - (required) list of WS references
+included_fields - (optional) subset of tree fields to include
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+tree_refs has a value which is a reference to a list where each element is a string
+included_fields has a value which is a reference to a list where each element is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+tree_refs has a value which is a reference to a list where each element is a string
+included_fields has a value which is a reference to a list where each element is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 TreeData
+
+=over 4
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+data has a value which is a KBaseTrees.Tree
+info has a value which is a Workspace.object_info
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+data has a value which is a KBaseTrees.Tree
+info has a value which is a Workspace.object_info
+
+
+=end text
+
+=back
+
+
+
+=head2 SaveTreesParams
+
+=over 4
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ws_id has a value which is a Workspace.ws_id
+trees has a value which is a reference to a list where each element is a Workspace.ObjectSaveData
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ws_id has a value which is a Workspace.ws_id
+trees has a value which is a reference to a list where each element is a Workspace.ObjectSaveData
+
+
+=end text
+
+=back
+
+
+
+=head2 TreeToNewickFileParams
+
+=over 4
+
+
+
+=item Description
+
+input_ref - (required) reference to the tree
+destination_dir - (required) directory to write the file to
+compression - (optional) "gzip" or "zstd" to compress the file while writing it
+relabel - (optional) "default_node_labels", "ws_refs" or "kb_refs" to write each node
+          with its label or first reference from that map instead of its node id
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+input_ref has a value which is a TreeUtils.Tree_id
+destination_dir has a value which is a string
+compression has a value which is a string
+relabel has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+input_ref has a value which is a TreeUtils.Tree_id
+destination_dir has a value which is a string
+compression has a value which is a string
+relabel has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 TreeToNewickFileOutput
+
+=over 4
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+file_path has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+file_path has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 ExportTreeParams
+
+=over 4
+
+
+
+=item Description
+
+input_ref - (required) reference to the tree
+compression - (optional) "gzip" or "zstd" to compress the file while writing it
+relabel - (optional) "default_node_labels", "ws_refs" or "kb_refs" to write each node
+          with its label or first reference from that map instead of its node id
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+input_ref has a value which is a TreeUtils.Tree_id
+compression has a value which is a string
+relabel has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+input_ref has a value which is a TreeUtils.Tree_id
+compression has a value which is a string
+relabel has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 ExportTreeOutput
+
+=over 4
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+shock_id has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+shock_id has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 TreesToNewickFilesParams
+
+=over 4
+
+
+
+=item Description
+
+input_refs - (required) list of tree references
+destination_dir - (required) directory to write the files to
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+destination_dir has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+destination_dir has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 TreesToNewickFilesOutput
+
+=over 4
+
+
+
+=item Description
+
+file_paths - mapping from each written tree reference to its newick file
+errors - mapping from each tree reference that could not be written to the error message
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+file_paths has a value which is a reference to a hash where the key is a string and the value is a string
+errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+file_paths has a value which is a reference to a hash where the key is a string and the value is a string
+errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 ExportTreesParams
+
+=over 4
+
+
+
+=item Description
+
+input_refs - (required) list of tree references
+archive - (optional) "zip" (default) to package the files with workspace metadata
+          or "targz" for a single .tar.gz
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+archive has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+input_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+archive has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 ExportTreesOutput
+
+=over 4
+
+
+
+=item Description
+
+shock_id - the SHOCK node holding the archive
+errors - mapping from each tree reference that could not be exported to the error message
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+shock_id has a value which is a string
+errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+shock_id has a value which is a string
+errors has a value which is a reference to a hash where the key is a string and the value is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 LCAParams
+
+=over 4
+
+
+
+=item Description
+
+tree_ref - (required) reference to the tree
+leaf_pairs - (required) pairs of leaf ids, as listed in the leaf_list of the tree
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+tree_ref has a value which is a TreeUtils.Tree_id
+leaf_pairs has a value which is a reference to a list where each element is a reference to a list containing 2 items:
+	0: a string
+	1: a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+tree_ref has a value which is a TreeUtils.Tree_id
+leaf_pairs has a value which is a reference to a list where each element is a reference to a list containing 2 items:
+	0: a string
+	1: a string
+
+
+=end text
+
+=back
+
+
+
+=head2 TreeNode
+
+=over 4
+
+
+
+=item Description
+
+node - index of the node in a preorder walk of the tree's newick, stable for a tree version
+label - the label of the node in the newick, null if it has none
+leaf_count - the number of leaves below the node
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+node has a value which is an int
+label has a value which is a string
+leaf_count has a value which is an int
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+node has a value which is an int
+label has a value which is a string
+leaf_count has a value which is an int
+
+
+=end text
+
+=back
+
+
+
+=head2 LCAOutput
+
+=over 4
+
+
+
+=item Description
+
+ancestors - the lowest common ancestor of each pair, in the order of leaf_pairs
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ancestors has a value which is a reference to a list where each element is a TreeUtils.TreeNode
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ancestors has a value which is a reference to a list where each element is a TreeUtils.TreeNode
+
+
+=end text
+
+=back
+
 
-sub version {
-    my ($self) = @_;
-    my $result = $self->{client}->call($self->{url}, $self->{headers}, {
-        method => "TreeUtils.version",
-        params => [],
-    });
-    if ($result) {
-        if ($result->is_error) {
-            Bio::KBase::Exceptions::JSONRPC->throw(
-                error => $result->error_message,
-                code => $result->content->{code},
-                method_name => 'export_tree_newick',
-            );
-        } else {
-            return wantarray ? @{$result->result} : $result->result->[0];
-        }
-    } else {
-        Bio::KBase::Exceptions::HTTP->throw(
-            error => "Error invoking method export_tree_newick",
-            status_line => $self->{client}->status_line,
-            method_name => 'export_tree_newick',
-        );
-    }
-}
 
-sub _validate_version {
-    my ($self) = @_;
-    my $svr_version = $self->version();
-    my $client_version = $VERSION;
-    my ($cMajor, $cMinor) = split(/\./, $client_version);
-    my ($sMajor, $sMinor) = split(/\./, $svr_version);
-    if ($sMajor != $cMajor) {
-        Bio::KBase::Exceptions::ClientServerIncompatible->throw(
-            error => "Major version numbers differ.",
-            server_version => $svr_version,
-            client_version => $client_version
-        );
-    }
-    if ($sMinor < $cMinor) {
-        Bio::KBase::Exceptions::ClientServerIncompatible->throw(
-            error => "Client minor version greater than Server minor version.",
-            server_version => $svr_version,
-            client_version => $client_version
-        );
-    }
-    if ($sMinor > $cMinor) {
-        warn "New client version available for TreeUtils::TreeUtilsClient\n";
-    }
-    if ($sMajor == 0) {
-        warn "TreeUtils::TreeUtilsClient version is $svr_version. API subject to change.\n";
-    }
-}
+=head2 PatristicDistancesParams
 
-=head1 TYPES
+=over 4
 
 
 
-=head2 Tree_id
+=item Description
+
+tree_ref - (required) reference to the tree
+leaf_ids - (optional) leaves to include, in the order of the matrix rows; all leaves by default
+to_file - (optional) if 1, write the matrix to a .npy file in scratch instead of returning it
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+tree_ref has a value which is a TreeUtils.Tree_id
+leaf_ids has a value which is a reference to a list where each element is a string
+to_file has a value which is an int
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+tree_ref has a value which is a TreeUtils.Tree_id
+leaf_ids has a value which is a reference to a list where each element is a string
+to_file has a value which is an int
+
+
+=end text
+
+=back
+
+
+
+=head2 PatristicDistancesOutput
 
 =over 4
 
@@ -775,7 +2418,9 @@ sub _validate_version {
 
 =item Description
 
-@id kb KBaseTrees.Tree
+leaf_ids - the leaves in the order of the matrix rows and columns
+distances - the summed branch lengths between each pair of leaves, unless to_file was set
+file_path - the .npy file holding the matrix, if to_file was set
 
 
 =item Definition
@@ -783,14 +2428,22 @@ sub _validate_version {
 =begin html
 
 <pre>
-a string
+a reference to a hash where the following keys are defined:
+leaf_ids has a value which is a reference to a list where each element is a string
+distances has a value which is a reference to a list where each element is a reference to a list where each element is a float
+file_path has a value which is a string
+
 </pre>
 
 =end html
 
 =begin text
 
-a string
+a reference to a hash where the following keys are defined:
+leaf_ids has a value which is a reference to a list where each element is a string
+distances has a value which is a reference to a list where each element is a reference to a list where each element is a float
+file_path has a value which is a string
+
 
 =end text
 
@@ -798,7 +2451,7 @@ a string
 
 
 
-=head2 GetTreesParams
+=head2 PruneTreeParams
 
 =over 4
 
@@ -806,8 +2459,10 @@ a string
 
 =item Description
 
-tree_refs - (required) list of WS references
-included_fields - (optional) subset of tree fields to include
+tree_ref - (required) reference to the tree
+leaf_ids - (required) the leaves to keep, at least two
+ws_id - (optional) workspace to save the pruned tree to
+output_name - (optional) object name for the saved tree, required with ws_id
 
 
 =item Definition
@@ -816,8 +2471,10 @@ included_fields - (optional) subset of tree fields to include
 
 <pre>
 a reference to a hash where the following keys are defined:
-tree_refs has a value which is a reference to a list where each element is a string
-included_fields has a value which is a reference to a list where each element is a string
+tree_ref has a value which is a TreeUtils.Tree_id
+leaf_ids has a value which is a reference to a list where each element is a string
+ws_id has a value which is a Workspace.ws_id
+output_name has a value which is a string
 
 </pre>
 
@@ -826,8 +2483,10 @@ included_fields has a value which is a reference to a list where each element is
 =begin text
 
 a reference to a hash where the following keys are defined:
-tree_refs has a value which is a reference to a list where each element is a string
-included_fields has a value which is a reference to a list where each element is a string
+tree_ref has a value which is a TreeUtils.Tree_id
+leaf_ids has a value which is a reference to a list where each element is a string
+ws_id has a value which is a Workspace.ws_id
+output_name has a value which is a string
 
 
 =end text
@@ -836,19 +2495,25 @@ included_fields has a value which is a reference to a list where each element is
 
 
 
-=head2 TreeData
+=head2 PruneTreeOutput
 
 =over 4
 
 
 
+=item Description
+
+tree - the pruned tree in Newick format, if it was not saved
+info - the object_info of the saved tree, if ws_id was given
+
+
 =item Definition
 
 =begin html
 
 <pre>
 a reference to a hash where the following keys are defined:
-data has a value which is a KBaseTrees.Tree
+tree has a value which is a string
 info has a value which is a Workspace.object_info
 
 </pre>
@@ -858,7 +2523,7 @@ info has a value which is a Workspace.object_info
 =begin text
 
 a reference to a hash where the following keys are defined:
-data has a value which is a KBaseTrees.Tree
+tree has a value which is a string
 info has a value which is a Workspace.object_info
 
 
@@ -868,20 +2533,147 @@ info has a value which is a Workspace.object_info
 
 
 
-=head2 SaveTreesParams
+=head2 CompareTreesParams
+
+=over 4
+
+
+
+=item Description
+
+tree_refs - (required) references to the trees to compare
+reference_ref - (optional) compare each tree with this tree instead of every pair of trees
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+reference_ref has a value which is a TreeUtils.Tree_id
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+reference_ref has a value which is a TreeUtils.Tree_id
+
+
+=end text
+
+=back
+
+
+
+=head2 TreeComparison
+
+=over 4
+
+
+
+=item Description
+
+tree_ref_1, tree_ref_2 - the trees compared
+common_leaves - the number of leaves in both trees, the only ones the comparison considers
+shared_splits - the number of bipartitions found in both trees
+rf_distance - the Robinson-Foulds distance, the number of bipartitions found in only one tree
+normalized_rf - rf_distance divided by the number of bipartitions of both trees
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+tree_ref_1 has a value which is a TreeUtils.Tree_id
+tree_ref_2 has a value which is a TreeUtils.Tree_id
+common_leaves has a value which is an int
+shared_splits has a value which is an int
+rf_distance has a value which is an int
+normalized_rf has a value which is a float
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+tree_ref_1 has a value which is a TreeUtils.Tree_id
+tree_ref_2 has a value which is a TreeUtils.Tree_id
+common_leaves has a value which is an int
+shared_splits has a value which is an int
+rf_distance has a value which is an int
+normalized_rf has a value which is a float
+
+
+=end text
+
+=back
+
+
+
+=head2 CompareTreesOutput
+
+=over 4
+
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+comparisons has a value which is a reference to a list where each element is a TreeUtils.TreeComparison
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+comparisons has a value which is a reference to a list where each element is a TreeUtils.TreeComparison
+
+
+=end text
+
+=back
+
+
+
+=head2 ConsensusTreeParams
 
 =over 4
 
 
 
+=item Description
+
+tree_refs - (required) references to the trees, which must all have the same leaves
+method - (optional) "majority" for a majority rule consensus (the default) or "strict"
+ws_id - (required) workspace to save the consensus tree to
+output_name - (required) object name for the consensus tree
+
+
 =item Definition
 
 =begin html
 
 <pre>
 a reference to a hash where the following keys are defined:
+tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+method has a value which is a string
 ws_id has a value which is a Workspace.ws_id
-trees has a value which is a reference to a list where each element is a Workspace.ObjectSaveData
+output_name has a value which is a string
 
 </pre>
 
@@ -890,8 +2682,10 @@ trees has a value which is a reference to a list where each element is a Workspa
 =begin text
 
 a reference to a hash where the following keys are defined:
+tree_refs has a value which is a reference to a list where each element is a TreeUtils.Tree_id
+method has a value which is a string
 ws_id has a value which is a Workspace.ws_id
-trees has a value which is a reference to a list where each element is a Workspace.ObjectSaveData
+output_name has a value which is a string
 
 
 =end text
@@ -900,12 +2694,55 @@ trees has a value which is a reference to a list where each element is a Workspa
 
 
 
-=head2 TreeToNewickFileParams
+=head2 ConsensusTreeOutput
+
+=over 4
+
+
+
+=item Description
+
+info - the object_info of the saved consensus tree
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+info has a value which is a Workspace.object_info
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+info has a value which is a Workspace.object_info
+
+
+=end text
+
+=back
+
+
+
+=head2 TreeToFileParams
 
 =over 4
 
 
 
+=item Description
+
+input_ref - (required) reference to the tree
+destination_dir - (required) directory to write the file to
+format - (required) "newick", "nexus", "phyloxml", "nexml" or "json"
+compression - (optional) "gzip" or "zstd" to compress the file while writing it
+
+
 =item Definition
 
 =begin html
@@ -914,6 +2751,8 @@ trees has a value which is a reference to a list where each element is a Workspa
 a reference to a hash where the following keys are defined:
 input_ref has a value which is a TreeUtils.Tree_id
 destination_dir has a value which is a string
+format has a value which is a string
+compression has a value which is a string
 
 </pre>
 
@@ -924,6 +2763,8 @@ destination_dir has a value which is a string
 a reference to a hash where the following keys are defined:
 input_ref has a value which is a TreeUtils.Tree_id
 destination_dir has a value which is a string
+format has a value which is a string
+compression has a value which is a string
 
 
 =end text
@@ -932,7 +2773,7 @@ destination_dir has a value which is a string
 
 
 
-=head2 TreeToNewickFileOutput
+=head2 TreeToFileOutput
 
 =over 4
 
@@ -962,19 +2803,27 @@ file_path has a value which is a string
 
 
 
-=head2 ExportTreeParams
+=head2 NewickFilesToTreesParams
 
 =over 4
 
 
 
+=item Description
+
+file_paths - (required) Newick or Nexus files, directories of them or tar archives of
+    them in the scratch directory. Files may be gzip compressed.
+ws_id - (required) workspace to save the trees to
+
+
 =item Definition
 
 =begin html
 
 <pre>
 a reference to a hash where the following keys are defined:
-input_ref has a value which is a TreeUtils.Tree_id
+file_paths has a value which is a reference to a list where each element is a string
+ws_id has a value which is a Workspace.ws_id
 
 </pre>
 
@@ -983,7 +2832,8 @@ input_ref has a value which is a TreeUtils.Tree_id
 =begin text
 
 a reference to a hash where the following keys are defined:
-input_ref has a value which is a TreeUtils.Tree_id
+file_paths has a value which is a reference to a list where each element is a string
+ws_id has a value which is a Workspace.ws_id
 
 
 =end text
@@ -992,19 +2842,27 @@ input_ref has a value which is a TreeUtils.Tree_id
 
 
 
-=head2 ExportTreeOutput
+=head2 NewickFilesToTreesOutput
 
 =over 4
 
 
 
+=item Description
+
+infos - the object_info of each saved tree
+errors - files, or trees of a file holding several, that could not be imported,
+    mapped to the reason
+
+
 =item Definition
 
 =begin html
 
 <pre>
 a reference to a hash where the following keys are defined:
-shock_id has a value which is a string
+infos has a value which is a reference to a list where each element is a Workspace.object_info
+errors has a value which is a reference to a hash where the key is a string and the value is a string
 
 </pre>
 
@@ -1013,7 +2871,8 @@ shock_id has a value which is a string
 =begin text
 
 a reference to a hash where the following keys are defined:
-shock_id has a value which is a string
+infos has a value which is a reference to a list where each element is a Workspace.object_info
+errors has a value which is a reference to a hash where the key is a string and the value is a string
 
 
 =end text
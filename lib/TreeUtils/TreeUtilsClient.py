@@ -363,9 +363,15 @@ class TreeUtils(object):
 
     def tree_to_newick_file(self, params, context=None):
         """
-        :param params: instance of type "TreeToNewickFileParams" ->
-           structure: parameter "input_ref" of type "Tree_id" (@id kb
-           KBaseTrees.Tree), parameter "destination_dir" of String
+        :param params: instance of type "TreeToNewickFileParams" (input_ref -
+           (required) reference to the tree destination_dir - (required)
+           directory to write the file to compression - (optional) "gzip" or
+           "zstd" to compress the file while writing it relabel - (optional)
+           "default_node_labels", "ws_refs" or "kb_refs" to write each node
+           with its label or first reference from that map instead of its node
+           id) -> structure: parameter "input_ref" of type "Tree_id" (@id kb
+           KBaseTrees.Tree), parameter "destination_dir" of String, parameter
+           "compression" of String, parameter "relabel" of String
         :returns: instance of type "TreeToNewickFileOutput" -> structure:
            parameter "file_path" of String
         """
@@ -375,8 +381,14 @@ class TreeUtils(object):
 
     def export_tree_newick(self, params, context=None):
         """
-        :param params: instance of type "ExportTreeParams" -> structure:
-           parameter "input_ref" of type "Tree_id" (@id kb KBaseTrees.Tree)
+        :param params: instance of type "ExportTreeParams" (input_ref -
+           (required) reference to the tree compression - (optional) "gzip" or
+           "zstd" to compress the file while writing it relabel - (optional)
+           "default_node_labels", "ws_refs" or "kb_refs" to write each node
+           with its label or first reference from that map instead of its node
+           id) -> structure: parameter "input_ref" of type "Tree_id" (@id kb
+           KBaseTrees.Tree), parameter "compression" of String, parameter
+           "relabel" of String
         :returns: instance of type "ExportTreeOutput" -> structure: parameter
            "shock_id" of String
         """
@@ -384,6 +396,334 @@ class TreeUtils(object):
             'TreeUtils.export_tree_newick',
             [params], self._service_ver, context)
 
+    def trees_to_newick_files(self, params, context=None):
+        """
+        :param params: instance of type "TreesToNewickFilesParams" (input_refs
+           - (required) list of tree references destination_dir - (required)
+           directory to write the files to) -> structure: parameter
+           "input_refs" of list of type "Tree_id" (@id kb KBaseTrees.Tree),
+           parameter "destination_dir" of String
+        :returns: instance of type "TreesToNewickFilesOutput" (file_paths -
+           mapping from each written tree reference to its newick file errors
+           - mapping from each tree reference that could not be written to the
+           error message) -> structure: parameter "file_paths" of mapping from
+           String to String, parameter "errors" of mapping from String to
+           String
+        """
+        return self._client.call_method(
+            'TreeUtils.trees_to_newick_files',
+            [params], self._service_ver, context)
+
+    def export_trees_newick(self, params, context=None):
+        """
+        :param params: instance of type "ExportTreesParams" (input_refs -
+           (required) list of tree references archive - (optional) "zip"
+           (default) to package the files with workspace metadata or "targz"
+           for a single .tar.gz) -> structure: parameter "input_refs" of list
+           of type "Tree_id" (@id kb KBaseTrees.Tree), parameter "archive" of
+           String
+        :returns: instance of type "ExportTreesOutput" (shock_id - the SHOCK
+           node holding the archive errors - mapping from each tree reference
+           that could not be exported to the error message) -> structure:
+           parameter "shock_id" of String, parameter "errors" of mapping from
+           String to String
+        """
+        return self._client.call_method(
+            'TreeUtils.export_trees_newick',
+            [params], self._service_ver, context)
+
+    def lowest_common_ancestors(self, params, context=None):
+        """
+        Finds the lowest common ancestor of many pairs of leaves in one call.
+        An index of the tree is built once and kept in memory for versioned
+        references.
+        :param params: instance of type "LCAParams" (tree_ref - (required)
+           reference to the tree leaf_pairs - (required) pairs of leaf ids, as
+           listed in the leaf_list of the tree) -> structure: parameter
+           "tree_ref" of type "Tree_id" (@id kb KBaseTrees.Tree), parameter
+           "leaf_pairs" of list of tuple of size 2: String, String
+        :returns: instance of type "LCAOutput" (ancestors - the lowest common
+           ancestor of each pair, in the order of leaf_pairs) -> structure:
+           parameter "ancestors" of list of type "TreeNode" (node - index of
+           the node in a preorder walk of the tree's newick, stable for a tree
+           version label - the label of the node in the newick, null if it has
+           none leaf_count - the number of leaves below the node) ->
+           structure: parameter "node" of Long, parameter "label" of String,
+           parameter "leaf_count" of Long
+        """
+        return self._client.call_method(
+            'TreeUtils.lowest_common_ancestors',
+            [params], self._service_ver, context)
+
+    def patristic_distances(self, params, context=None):
+        """
+        Computes the patristic distance between every pair of leaves, from the
+        distance of each leaf to the root and the lowest common ancestor of
+        the pair.
+        :param params: instance of type "PatristicDistancesParams" (tree_ref -
+           (required) reference to the tree leaf_ids - (optional) leaves to
+           include, in the order of the matrix rows; all leaves by default
+           to_file - (optional) if 1, write the matrix to a .npy file in
+           scratch instead of returning it) -> structure: parameter "tree_ref"
+           of type "Tree_id" (@id kb KBaseTrees.Tree), parameter "leaf_ids" of
+           list of String, parameter "to_file" of Long
+        :returns: instance of type "PatristicDistancesOutput" (leaf_ids - the
+           leaves in the order of the matrix rows and columns distances - the
+           summed branch lengths between each pair of leaves, unless to_file
+           was set file_path - the .npy file holding the matrix, if to_file
+           was set) -> structure: parameter "leaf_ids" of list of String,
+           parameter "distances" of list of list of Double, parameter
+           "file_path" of String
+        """
+        return self._client.call_method(
+            'TreeUtils.patristic_distances',
+            [params], self._service_ver, context)
+
+    def prune_tree(self, params, context=None):
+        """
+        Prunes a tree down to a subset of its leaves. Internal nodes left with
+        one child are removed and their branch lengths added to the child's. A
+        saved tree keeps the default_node_labels, ws_refs and kb_refs entries
+        of the nodes that remain.
+        :param params: instance of type "PruneTreeParams" (tree_ref -
+           (required) reference to the tree leaf_ids - (required) the leaves
+           to keep, at least two ws_id - (optional) workspace to save the
+           pruned tree to output_name - (optional) object name for the saved
+           tree, required with ws_id) -> structure: parameter "tree_ref" of
+           type "Tree_id" (@id kb KBaseTrees.Tree), parameter "leaf_ids" of
+           list of String, parameter "ws_id" of type "ws_id" (The unique,
+           permanent numerical ID of a workspace.), parameter "output_name" of
+           String
+        :returns: instance of type "PruneTreeOutput" (tree - the pruned tree
+           in Newick format, if it was not saved info - the object_info of the
+           saved tree, if ws_id was given) -> structure: parameter "tree" of
+           String, parameter "info" of type "object_info" (Information about
+           an object, including user provided metadata. obj_id objid - the
+           numerical id of the object. obj_name name - the name of the object.
+           type_string type - the type of the object. timestamp save_date -
+           the save date of the object. obj_ver ver - the version of the
+           object. username saved_by - the user that saved or copied the
+           object. ws_id wsid - the workspace containing the object. ws_name
+           workspace - the workspace containing the object. string chsum - the
+           md5 checksum of the object. int size - the size of the object in
+           bytes. usermeta meta - arbitrary user-supplied metadata about the
+           object.) -> tuple of size 11: parameter "objid" of type "obj_id"
+           (The unique, permanent numerical ID of an object.), parameter
+           "name" of type "obj_name" (A string used as a name for an object.
+           Any string consisting of alphanumeric characters and the characters
+           |._- that is not an integer is acceptable.), parameter "type" of
+           type "type_string" (A type string. Specifies the type and its
+           version in a single string in the format
+           [module].[typename]-[major].[minor]: module - a string. The module
+           name of the typespec containing the type. typename - a string. The
+           name of the type as assigned by the typedef statement. major - an
+           integer. The major version of the type. A change in the major
+           version implies the type has changed in a non-backwards compatible
+           way. minor - an integer. The minor version of the type. A change in
+           the minor version implies that the type has changed in a way that
+           is backwards compatible with previous type definitions. In many
+           cases, the major and minor versions are optional, and if not
+           provided the most recent version will be used. Example:
+           MyModule.MyType-3.1), parameter "save_date" of type "timestamp" (A
+           time in the format YYYY-MM-DDThh:mm:ssZ, where Z is either the
+           character Z (representing the UTC timezone) or the difference in
+           time to UTC in the format +/-HHMM, eg: 2012-12-17T23:24:06-0500
+           (EST time) 2013-04-03T08:56:32+0000 (UTC time) 2013-04-03T08:56:32Z
+           (UTC time)), parameter "version" of Long, parameter "saved_by" of
+           type "username" (Login name of a KBase user account.), parameter
+           "wsid" of type "ws_id" (The unique, permanent numerical ID of a
+           workspace.), parameter "workspace" of type "ws_name" (A string used
+           as a name for a workspace. Any string consisting of alphanumeric
+           characters and "_", ".", or "-" that is not an integer is
+           acceptable. The name may optionally be prefixed with the workspace
+           owner's user name and a colon, e.g. kbasetest:my_workspace.),
+           parameter "chsum" of String, parameter "size" of Long, parameter
+           "meta" of type "usermeta" (User provided metadata about an object.
+           Arbitrary key-value pairs provided by the user.) -> mapping from
+           String to String
+        """
+        return self._client.call_method(
+            'TreeUtils.prune_tree',
+            [params], self._service_ver, context)
+
+    def compare_trees(self, params, context=None):
+        """
+        Compares trees as unrooted trees by their bipartitions, returning the
+        Robinson-Foulds distance and shared bipartitions of each pair.
+        :param params: instance of type "CompareTreesParams" (tree_refs -
+           (required) references to the trees to compare reference_ref -
+           (optional) compare each tree with this tree instead of every pair
+           of trees) -> structure: parameter "tree_refs" of list of type
+           "Tree_id" (@id kb KBaseTrees.Tree), parameter "reference_ref" of
+           type "Tree_id" (@id kb KBaseTrees.Tree)
+        :returns: instance of type "CompareTreesOutput" -> structure:
+           parameter "comparisons" of list of type "TreeComparison"
+           (tree_ref_1, tree_ref_2 - the trees compared common_leaves - the
+           number of leaves in both trees, the only ones the comparison
+           considers shared_splits - the number of bipartitions found in both
+           trees rf_distance - the Robinson-Foulds distance, the number of
+           bipartitions found in only one tree normalized_rf - rf_distance
+           divided by the number of bipartitions of both trees) -> structure:
+           parameter "tree_ref_1" of type "Tree_id" (@id kb KBaseTrees.Tree),
+           parameter "tree_ref_2" of type "Tree_id" (@id kb KBaseTrees.Tree),
+           parameter "common_leaves" of Long, parameter "shared_splits" of
+           Long, parameter "rf_distance" of Long, parameter "normalized_rf" of
+           Double
+        """
+        return self._client.call_method(
+            'TreeUtils.compare_trees',
+            [params], self._service_ver, context)
+
+    def consensus_tree(self, params, context=None):
+        """
+        Builds the consensus of a set of trees, such as bootstrap replicates,
+        labeling each internal node with the fraction of the trees that have
+        its bipartition.
+        :param params: instance of type "ConsensusTreeParams" (tree_refs -
+           (required) references to the trees, which must all have the same
+           leaves method - (optional) "majority" for a majority rule consensus
+           (the default) or "strict" ws_id - (required) workspace to save the
+           consensus tree to output_name - (required) object name for the
+           consensus tree) -> structure: parameter "tree_refs" of list of type
+           "Tree_id" (@id kb KBaseTrees.Tree), parameter "method" of String,
+           parameter "ws_id" of type "ws_id" (The unique, permanent numerical
+           ID of a workspace.), parameter "output_name" of String
+        :returns: instance of type "ConsensusTreeOutput" (info - the
+           object_info of the saved consensus tree) -> structure: parameter
+           "info" of type "object_info" (Information about an object,
+           including user provided metadata. obj_id objid - the numerical id
+           of the object. obj_name name - the name of the object. type_string
+           type - the type of the object. timestamp save_date - the save date
+           of the object. obj_ver ver - the version of the object. username
+           saved_by - the user that saved or copied the object. ws_id wsid -
+           the workspace containing the object. ws_name workspace - the
+           workspace containing the object. string chsum - the md5 checksum of
+           the object. int size - the size of the object in bytes. usermeta
+           meta - arbitrary user-supplied metadata about the object.) -> tuple
+           of size 11: parameter "objid" of type "obj_id" (The unique,
+           permanent numerical ID of an object.), parameter "name" of type
+           "obj_name" (A string used as a name for an object. Any string
+           consisting of alphanumeric characters and the characters |._- that
+           is not an integer is acceptable.), parameter "type" of type
+           "type_string" (A type string. Specifies the type and its version in
+           a single string in the format [module].[typename]-[major].[minor]:
+           module - a string. The module name of the typespec containing the
+           type. typename - a string. The name of the type as assigned by the
+           typedef statement. major - an integer. The major version of the
+           type. A change in the major version implies the type has changed in
+           a non-backwards compatible way. minor - an integer. The minor
+           version of the type. A change in the minor version implies that the
+           type has changed in a way that is backwards compatible with
+           previous type definitions. In many cases, the major and minor
+           versions are optional, and if not provided the most recent version
+           will be used. Example: MyModule.MyType-3.1), parameter "save_date"
+           of type "timestamp" (A time in the format YYYY-MM-DDThh:mm:ssZ,
+           where Z is either the character Z (representing the UTC timezone)
+           or the difference in time to UTC in the format +/-HHMM, eg:
+           2012-12-17T23:24:06-0500 (EST time) 2013-04-03T08:56:32+0000 (UTC
+           time) 2013-04-03T08:56:32Z (UTC time)), parameter "version" of
+           Long, parameter "saved_by" of type "username" (Login name of a
+           KBase user account.), parameter "wsid" of type "ws_id" (The unique,
+           permanent numerical ID of a workspace.), parameter "workspace" of
+           type "ws_name" (A string used as a name for a workspace. Any string
+           consisting of alphanumeric characters and "_", ".", or "-" that is
+           not an integer is acceptable. The name may optionally be prefixed
+           with the workspace owner's user name and a colon, e.g.
+           kbasetest:my_workspace.), parameter "chsum" of String, parameter
+           "size" of Long, parameter "meta" of type "usermeta" (User provided
+           metadata about an object. Arbitrary key-value pairs provided by the
+           user.) -> mapping from String to String
+        """
+        return self._client.call_method(
+            'TreeUtils.consensus_tree',
+            [params], self._service_ver, context)
+
+    def tree_to_file(self, params, context=None):
+        """
+        Writes a tree to a file in one of several formats. Nodes are annotated
+        with their default_node_labels, ws_refs and kb_refs entries where the
+        format has a place for them.
+        :param params: instance of type "TreeToFileParams" (input_ref -
+           (required) reference to the tree destination_dir - (required)
+           directory to write the file to format - (required) "newick",
+           "nexus", "phyloxml", "nexml" or "json" compression - (optional)
+           "gzip" or "zstd" to compress the file while writing it) ->
+           structure: parameter "input_ref" of type "Tree_id" (@id kb
+           KBaseTrees.Tree), parameter "destination_dir" of String, parameter
+           "format" of String, parameter "compression" of String
+        :returns: instance of type "TreeToFileOutput" -> structure: parameter
+           "file_path" of String
+        """
+        return self._client.call_method(
+            'TreeUtils.tree_to_file',
+            [params], self._service_ver, context)
+
+    def newick_files_to_trees(self, params, context=None):
+        """
+        Imports the trees of Newick and Nexus files as Tree objects, deriving
+        their leaf_list and default_node_labels. Each tree is named after its
+        file, and after its name or position in the file when a file holds
+        several trees.
+        :param params: instance of type "NewickFilesToTreesParams" (file_paths
+           - (required) Newick or Nexus files, directories of them or tar
+           archives of them in the scratch directory. Files may be gzip
+           compressed. ws_id - (required) workspace to save the trees to) ->
+           structure: parameter "file_paths" of list of String, parameter
+           "ws_id" of type "ws_id" (The unique, permanent numerical ID of a
+           workspace.)
+        :returns: instance of type "NewickFilesToTreesOutput" (infos - the
+           object_info of each saved tree errors - files, or trees of a file
+           holding several, that could not be imported, mapped to the reason)
+           -> structure: parameter "infos" of list of type "object_info"
+           (Information about an object, including user provided metadata.
+           obj_id objid - the numerical id of the object. obj_name name - the
+           name of the object. type_string type - the type of the object.
+           timestamp save_date - the save date of the object. obj_ver ver -
+           the version of the object. username saved_by - the user that saved
+           or copied the object. ws_id wsid - the workspace containing the
+           object. ws_name workspace - the workspace containing the object.
+           string chsum - the md5 checksum of the object. int size - the size
+           of the object in bytes. usermeta meta - arbitrary user-supplied
+           metadata about the object.) -> tuple of size 11: parameter "objid"
+           of type "obj_id" (The unique, permanent numerical ID of an
+           object.), parameter "name" of type "obj_name" (A string used as a
+           name for an object. Any string consisting of alphanumeric
+           characters and the characters |._- that is not an integer is
+           acceptable.), parameter "type" of type "type_string" (A type
+           string. Specifies the type and its version in a single string in
+           the format [module].[typename]-[major].[minor]: module - a string.
+           The module name of the typespec containing the type. typename - a
+           string. The name of the type as assigned by the typedef statement.
+           major - an integer. The major version of the type. A change in the
+           major version implies the type has changed in a non-backwards
+           compatible way. minor - an integer. The minor version of the type.
+           A change in the minor version implies that the type has changed in
+           a way that is backwards compatible with previous type definitions.
+           In many cases, the major and minor versions are optional, and if
+           not provided the most recent version will be used. Example:
+           MyModule.MyType-3.1), parameter "save_date" of type "timestamp" (A
+           time in the format YYYY-MM-DDThh:mm:ssZ, where Z is either the
+           character Z (representing the UTC timezone) or the difference in
+           time to UTC in the format +/-HHMM, eg: 2012-12-17T23:24:06-0500
+           (EST time) 2013-04-03T08:56:32+0000 (UTC time) 2013-04-03T08:56:32Z
+           (UTC time)), parameter "version" of Long, parameter "saved_by" of
+           type "username" (Login name of a KBase user account.), parameter
+           "wsid" of type "ws_id" (The unique, permanent numerical ID of a
+           workspace.), parameter "workspace" of type "ws_name" (A string used
+           as a name for a workspace. Any string consisting of alphanumeric
+           characters and "_", ".", or "-" that is not an integer is
+           acceptable. The name may optionally be prefixed with the workspace
+           owner's user name and a colon, e.g. kbasetest:my_workspace.),
+           parameter "chsum" of String, parameter "size" of Long, parameter
+           "meta" of type "usermeta" (User provided metadata about an object.
+           Arbitrary key-value pairs provided by the user.) -> mapping from
+           String to String, parameter "errors" of mapping from String to
+           String
+        """
+        return self._client.call_method(
+            'TreeUtils.newick_files_to_trees',
+            [params], self._service_ver, context)
+
     def status(self, context=None):
         return self._client.call_method('TreeUtils.status',
                                         [], self._service_ver, context)
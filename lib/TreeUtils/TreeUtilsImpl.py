@@ -1,11 +1,8 @@
 # -*- coding: utf-8 -*-
 #BEGIN_HEADER
 import logging
-import os
 
 from .core.Utils import Utils
-from DataFileUtil.DataFileUtilClient import DataFileUtil
-from Workspace.WorkspaceClient import Workspace
 #END_HEADER
 
 
@@ -37,8 +34,11 @@ class TreeUtils:
         #BEGIN_CONSTRUCTOR
         self.utils = Utils(config)
         self.scratch = config['scratch']
-        self.dfu = DataFileUtil(os.environ['SDK_CALLBACK_URL'])
-        self.ws = Workspace(config['workspace-url'])
+        # the clients of Utils, which reuse pooled connections
+        self.dfu = self.utils.dfu
+        self.ws = self.utils.ws
+        # the server's token checking client, whose cache status reports
+        self.auth_client = None
         logging.basicConfig(level=logging.INFO)
         #END_CONSTRUCTOR
         pass
@@ -149,9 +149,8 @@ class TreeUtils:
         #BEGIN get_trees
         logging.info("Starting 'get_trees' with params:{}".format(params))
         self.utils.validate_params(params, ("tree_refs",), ("included_fields",))
-        ws_objs = [{'ref': r, 'included': params.get('included_fields', None)}
-                   for r in params['tree_refs']]
-        result = self.ws.get_objects2({'objects': ws_objs})['data']
+        result = self.utils.get_objects(params['tree_refs'], params.get('included_fields'),
+                                        ctx.get('user_id'))
         #END get_trees
 
         # At some point might do deeper type checking...
@@ -386,22 +385,18 @@ class TreeUtils:
         #BEGIN save_trees
         logging.info("Starting 'save_trees'")
         self.utils.validate_params(params, ("ws_id", "trees"), ('type',))
-        trees = []
-        for i, t in enumerate(params['trees']):
-            self.utils.validate_params(t, ("data",), ("name", "hidden", "meta", "type"))
-            if 'type' in t and t['type'] != 'KBaseTrees.Tree':
-                raise ValueError("This method only saves KBaseTrees.Tree objects")
-            if "tree" not in t['data']:
-                raise ValueError("Object {} missing 'tree' attribute containing newick tree"
-                                 .format(i))
-            if not Utils.validate_newick(t['data']['tree']):
-                raise ValueError("Object {} has an invalid newick tree: {}"
-                                 .format(i, t['data']['tree']))
-
-            t['type'] = 'KBaseTrees.Tree'
-            trees.append(t)
-
-        result = self.dfu.save_objects({"id": params["ws_id"], "objects": trees})
+        trees = params['trees']
+        if not isinstance(trees, list) and iter(trees) is trees:
+            # a one-shot iterator cannot be validated before it is saved
+            trees = list(trees)
+        if isinstance(trees, list):
+            result = self.utils.save_trees(params["ws_id"], trees)
+        else:
+            # the server parses the trees of a large request lazily, once to validate
+            # all of them, so that an invalid tree saves nothing, and once to save them
+            self.utils.validate_tree_stream(trees)
+            trees = (self.utils.check_tree_object(i, t) for i, t in enumerate(trees))
+            result = self.utils.save_objects_stream(params["ws_id"], trees, validate=False)
         #END save_trees
 
         # At some point might do deeper type checking...
@@ -413,9 +408,15 @@ class TreeUtils:
 
     def tree_to_newick_file(self, ctx, params):
         """
-        :param params: instance of type "TreeToNewickFileParams" ->
-           structure: parameter "input_ref" of type "Tree_id" (@id kb
-           KBaseTrees.Tree), parameter "destination_dir" of String
+        :param params: instance of type "TreeToNewickFileParams" (input_ref -
+           (required) reference to the tree destination_dir - (required)
+           directory to write the file to compression - (optional) "gzip" or
+           "zstd" to compress the file while writing it relabel - (optional)
+           "default_node_labels", "ws_refs" or "kb_refs" to write each node
+           with its label or first reference from that map instead of its node
+           id) -> structure: parameter "input_ref" of type "Tree_id" (@id kb
+           KBaseTrees.Tree), parameter "destination_dir" of String, parameter
+           "compression" of String, parameter "relabel" of String
         :returns: instance of type "TreeToNewickFileOutput" -> structure:
            parameter "file_path" of String
         """
@@ -423,8 +424,9 @@ class TreeUtils:
         # return variables are: result
         #BEGIN tree_to_newick_file
         logging.info("Starting 'tree_to_newick' with params: {}".format(params))
-        self.utils.validate_params(params, ("destination_dir", "input_ref"))
-        _, result = self.utils.to_newick(params)
+        self.utils.validate_params(params, ("destination_dir", "input_ref"),
+                                   ("compression", "relabel"))
+        _, result = self.utils.to_newick(params, ctx.get('user_id'))
         #END tree_to_newick_file
 
         # At some point might do deeper type checking...
@@ -436,8 +438,14 @@ class TreeUtils:
 
     def export_tree_newick(self, ctx, params):
         """
-        :param params: instance of type "ExportTreeParams" -> structure:
-           parameter "input_ref" of type "Tree_id" (@id kb KBaseTrees.Tree)
+        :param params: instance of type "ExportTreeParams" (input_ref -
+           (required) reference to the tree compression - (optional) "gzip" or
+           "zstd" to compress the file while writing it relabel - (optional)
+           "default_node_labels", "ws_refs" or "kb_refs" to write each node
+           with its label or first reference from that map instead of its node
+           id) -> structure: parameter "input_ref" of type "Tree_id" (@id kb
+           KBaseTrees.Tree), parameter "compression" of String, parameter
+           "relabel" of String
         :returns: instance of type "ExportTreeOutput" -> structure: parameter
            "shock_id" of String
         """
@@ -445,9 +453,9 @@ class TreeUtils:
         # return variables are: result
         #BEGIN export_tree_newick
         logging.info("Starting 'export_tree_newick' with params:{}".format(params))
-        self.utils.validate_params(params, ("input_ref",))
+        self.utils.validate_params(params, ("input_ref",), ("compression", "relabel"))
         params['destination_dir'] = self.scratch
-        cs_id, files = self.utils.to_newick(params)
+        cs_id, files = self.utils.to_newick(params, ctx.get('user_id'))
         result = self.utils.export(files['file_path'], cs_id, params['input_ref'])
         #END export_tree_newick
 
@@ -457,12 +465,480 @@ class TreeUtils:
                              'result is not type dict as required.')
         # return the results
         return [result]
+
+    def trees_to_newick_files(self, ctx, params):
+        """
+        :param params: instance of type "TreesToNewickFilesParams" (input_refs
+           - (required) list of tree references destination_dir - (required)
+           directory to write the files to) -> structure: parameter
+           "input_refs" of list of type "Tree_id" (@id kb KBaseTrees.Tree),
+           parameter "destination_dir" of String
+        :returns: instance of type "TreesToNewickFilesOutput" (file_paths -
+           mapping from each written tree reference to its newick file errors
+           - mapping from each tree reference that could not be written to the
+           error message) -> structure: parameter "file_paths" of mapping from
+           String to String, parameter "errors" of mapping from String to
+           String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN trees_to_newick_files
+        logging.info("Starting 'trees_to_newick_files' with params: {}".format(params))
+        self.utils.validate_params(params, ("destination_dir", "input_refs"))
+        file_paths, errors = self.utils.to_newick_files(params['input_refs'],
+                                                        params['destination_dir'],
+                                                        ctx.get('user_id'))
+        result = {'file_paths': file_paths, 'errors': errors}
+        #END trees_to_newick_files
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method trees_to_newick_files return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def export_trees_newick(self, ctx, params):
+        """
+        :param params: instance of type "ExportTreesParams" (input_refs -
+           (required) list of tree references archive - (optional) "zip"
+           (default) to package the files with workspace metadata or "targz"
+           for a single .tar.gz) -> structure: parameter "input_refs" of list
+           of type "Tree_id" (@id kb KBaseTrees.Tree), parameter "archive" of
+           String
+        :returns: instance of type "ExportTreesOutput" (shock_id - the SHOCK
+           node holding the archive errors - mapping from each tree reference
+           that could not be exported to the error message) -> structure:
+           parameter "shock_id" of String, parameter "errors" of mapping from
+           String to String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN export_trees_newick
+        logging.info("Starting 'export_trees_newick' with params:{}".format(params))
+        self.utils.validate_params(params, ("input_refs",), ("archive",))
+        result = self.utils.export_many(params['input_refs'], params.get('archive', "zip"),
+                                        ctx.get('user_id'))
+        #END export_trees_newick
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method export_trees_newick return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def lowest_common_ancestors(self, ctx, params):
+        """
+        Finds the lowest common ancestor of many pairs of leaves in one call.
+        An index of the tree is built once and kept in memory for versioned
+        references.
+        :param params: instance of type "LCAParams" (tree_ref - (required)
+           reference to the tree leaf_pairs - (required) pairs of leaf ids, as
+           listed in the leaf_list of the tree) -> structure: parameter
+           "tree_ref" of type "Tree_id" (@id kb KBaseTrees.Tree), parameter
+           "leaf_pairs" of list of tuple of size 2: String, String
+        :returns: instance of type "LCAOutput" (ancestors - the lowest common
+           ancestor of each pair, in the order of leaf_pairs) -> structure:
+           parameter "ancestors" of list of type "TreeNode" (node - index of
+           the node in a preorder walk of the tree's newick, stable for a tree
+           version label - the label of the node in the newick, null if it has
+           none leaf_count - the number of leaves below the node) ->
+           structure: parameter "node" of Long, parameter "label" of String,
+           parameter "leaf_count" of Long
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN lowest_common_ancestors
+        logging.info("Starting 'lowest_common_ancestors'")
+        self.utils.validate_params(params, ("tree_ref", "leaf_pairs"))
+        ancestors = self.utils.lowest_common_ancestors(params['tree_ref'], params['leaf_pairs'],
+                                                       ctx.get('user_id'))
+        result = {'ancestors': ancestors}
+        #END lowest_common_ancestors
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method lowest_common_ancestors return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def patristic_distances(self, ctx, params):
+        """
+        Computes the patristic distance between every pair of leaves, from the
+        distance of each leaf to the root and the lowest common ancestor of
+        the pair.
+        :param params: instance of type "PatristicDistancesParams" (tree_ref -
+           (required) reference to the tree leaf_ids - (optional) leaves to
+           include, in the order of the matrix rows; all leaves by default
+           to_file - (optional) if 1, write the matrix to a .npy file in
+           scratch instead of returning it) -> structure: parameter "tree_ref"
+           of type "Tree_id" (@id kb KBaseTrees.Tree), parameter "leaf_ids" of
+           list of String, parameter "to_file" of Long
+        :returns: instance of type "PatristicDistancesOutput" (leaf_ids - the
+           leaves in the order of the matrix rows and columns distances - the
+           summed branch lengths between each pair of leaves, unless to_file
+           was set file_path - the .npy file holding the matrix, if to_file
+           was set) -> structure: parameter "leaf_ids" of list of String,
+           parameter "distances" of list of list of Double, parameter
+           "file_path" of String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN patristic_distances
+        logging.info("Starting 'patristic_distances'")
+        self.utils.validate_params(params, ("tree_ref",), ("leaf_ids", "to_file"))
+        leaf_ids, distances, file_path = self.utils.patristic_distances(
+            params['tree_ref'], params.get('leaf_ids'),
+            self.scratch if params.get('to_file') else None, ctx.get('user_id'))
+        result = {'leaf_ids': leaf_ids}
+        if file_path:
+            result['file_path'] = file_path
+        else:
+            result['distances'] = distances.tolist()
+        #END patristic_distances
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method patristic_distances return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def prune_tree(self, ctx, params):
+        """
+        Prunes a tree down to a subset of its leaves. Internal nodes left with
+        one child are removed and their branch lengths added to the child's. A
+        saved tree keeps the default_node_labels, ws_refs and kb_refs entries
+        of the nodes that remain.
+        :param params: instance of type "PruneTreeParams" (tree_ref -
+           (required) reference to the tree leaf_ids - (required) the leaves
+           to keep, at least two ws_id - (optional) workspace to save the
+           pruned tree to output_name - (optional) object name for the saved
+           tree, required with ws_id) -> structure: parameter "tree_ref" of
+           type "Tree_id" (@id kb KBaseTrees.Tree), parameter "leaf_ids" of
+           list of String, parameter "ws_id" of type "ws_id" (The unique,
+           permanent numerical ID of a workspace.), parameter "output_name" of
+           String
+        :returns: instance of type "PruneTreeOutput" (tree - the pruned tree
+           in Newick format, if it was not saved info - the object_info of the
+           saved tree, if ws_id was given) -> structure: parameter "tree" of
+           String, parameter "info" of type "object_info" (Information about
+           an object, including user provided metadata. obj_id objid - the
+           numerical id of the object. obj_name name - the name of the object.
+           type_string type - the type of the object. timestamp save_date -
+           the save date of the object. obj_ver ver - the version of the
+           object. username saved_by - the user that saved or copied the
+           object. ws_id wsid - the workspace containing the object. ws_name
+           workspace - the workspace containing the object. string chsum - the
+           md5 checksum of the object. int size - the size of the object in
+           bytes. usermeta meta - arbitrary user-supplied metadata about the
+           object.) -> tuple of size 11: parameter "objid" of type "obj_id"
+           (The unique, permanent numerical ID of an object.), parameter
+           "name" of type "obj_name" (A string used as a name for an object.
+           Any string consisting of alphanumeric characters and the characters
+           |._- that is not an integer is acceptable.), parameter "type" of
+           type "type_string" (A type string. Specifies the type and its
+           version in a single string in the format
+           [module].[typename]-[major].[minor]: module - a string. The module
+           name of the typespec containing the type. typename - a string. The
+           name of the type as assigned by the typedef statement. major - an
+           integer. The major version of the type. A change in the major
+           version implies the type has changed in a non-backwards compatible
+           way. minor - an integer. The minor version of the type. A change in
+           the minor version implies that the type has changed in a way that
+           is backwards compatible with previous type definitions. In many
+           cases, the major and minor versions are optional, and if not
+           provided the most recent version will be used. Example:
+           MyModule.MyType-3.1), parameter "save_date" of type "timestamp" (A
+           time in the format YYYY-MM-DDThh:mm:ssZ, where Z is either the
+           character Z (representing the UTC timezone) or the difference in
+           time to UTC in the format +/-HHMM, eg: 2012-12-17T23:24:06-0500
+           (EST time) 2013-04-03T08:56:32+0000 (UTC time) 2013-04-03T08:56:32Z
+           (UTC time)), parameter "version" of Long, parameter "saved_by" of
+           type "username" (Login name of a KBase user account.), parameter
+           "wsid" of type "ws_id" (The unique, permanent numerical ID of a
+           workspace.), parameter "workspace" of type "ws_name" (A string used
+           as a name for a workspace. Any string consisting of alphanumeric
+           characters and "_", ".", or "-" that is not an integer is
+           acceptable. The name may optionally be prefixed with the workspace
+           owner's user name and a colon, e.g. kbasetest:my_workspace.),
+           parameter "chsum" of String, parameter "size" of Long, parameter
+           "meta" of type "usermeta" (User provided metadata about an object.
+           Arbitrary key-value pairs provided by the user.) -> mapping from
+           String to String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN prune_tree
+        logging.info("Starting 'prune_tree'")
+        self.utils.validate_params(params, ("tree_ref", "leaf_ids"), ("ws_id", "output_name"))
+        if params.get('ws_id') and not params.get('output_name'):
+            raise ValueError("output_name is required to save the pruned tree")
+        pruned = self.utils.prune_tree(params['tree_ref'], params['leaf_ids'], ctx.get('user_id'))
+        if params.get('ws_id'):
+            data = self.utils.derived_tree_object(params['tree_ref'], pruned, params['leaf_ids'],
+                                                  user_id=ctx.get('user_id'))
+            infos = self.utils.save_trees(params['ws_id'],
+                                          [{'data': data, 'name': params['output_name']}])
+            result = {'info': infos[0]}
+        else:
+            result = {'tree': pruned.to_newick()}
+        #END prune_tree
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method prune_tree return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def compare_trees(self, ctx, params):
+        """
+        Compares trees as unrooted trees by their bipartitions, returning the
+        Robinson-Foulds distance and shared bipartitions of each pair.
+        :param params: instance of type "CompareTreesParams" (tree_refs -
+           (required) references to the trees to compare reference_ref -
+           (optional) compare each tree with this tree instead of every pair
+           of trees) -> structure: parameter "tree_refs" of list of type
+           "Tree_id" (@id kb KBaseTrees.Tree), parameter "reference_ref" of
+           type "Tree_id" (@id kb KBaseTrees.Tree)
+        :returns: instance of type "CompareTreesOutput" -> structure:
+           parameter "comparisons" of list of type "TreeComparison"
+           (tree_ref_1, tree_ref_2 - the trees compared common_leaves - the
+           number of leaves in both trees, the only ones the comparison
+           considers shared_splits - the number of bipartitions found in both
+           trees rf_distance - the Robinson-Foulds distance, the number of
+           bipartitions found in only one tree normalized_rf - rf_distance
+           divided by the number of bipartitions of both trees) -> structure:
+           parameter "tree_ref_1" of type "Tree_id" (@id kb KBaseTrees.Tree),
+           parameter "tree_ref_2" of type "Tree_id" (@id kb KBaseTrees.Tree),
+           parameter "common_leaves" of Long, parameter "shared_splits" of
+           Long, parameter "rf_distance" of Long, parameter "normalized_rf" of
+           Double
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN compare_trees
+        logging.info("Starting 'compare_trees'")
+        self.utils.validate_params(params, ("tree_refs",), ("reference_ref",))
+        comparisons = self.utils.compare_trees(params['tree_refs'], params.get('reference_ref'),
+                                               ctx.get('user_id'))
+        result = {'comparisons': comparisons}
+        #END compare_trees
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method compare_trees return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def consensus_tree(self, ctx, params):
+        """
+        Builds the consensus of a set of trees, such as bootstrap replicates,
+        labeling each internal node with the fraction of the trees that have
+        its bipartition.
+        :param params: instance of type "ConsensusTreeParams" (tree_refs -
+           (required) references to the trees, which must all have the same
+           leaves method - (optional) "majority" for a majority rule consensus
+           (the default) or "strict" ws_id - (required) workspace to save the
+           consensus tree to output_name - (required) object name for the
+           consensus tree) -> structure: parameter "tree_refs" of list of type
+           "Tree_id" (@id kb KBaseTrees.Tree), parameter "method" of String,
+           parameter "ws_id" of type "ws_id" (The unique, permanent numerical
+           ID of a workspace.), parameter "output_name" of String
+        :returns: instance of type "ConsensusTreeOutput" (info - the
+           object_info of the saved consensus tree) -> structure: parameter
+           "info" of type "object_info" (Information about an object,
+           including user provided metadata. obj_id objid - the numerical id
+           of the object. obj_name name - the name of the object. type_string
+           type - the type of the object. timestamp save_date - the save date
+           of the object. obj_ver ver - the version of the object. username
+           saved_by - the user that saved or copied the object. ws_id wsid -
+           the workspace containing the object. ws_name workspace - the
+           workspace containing the object. string chsum - the md5 checksum of
+           the object. int size - the size of the object in bytes. usermeta
+           meta - arbitrary user-supplied metadata about the object.) -> tuple
+           of size 11: parameter "objid" of type "obj_id" (The unique,
+           permanent numerical ID of an object.), parameter "name" of type
+           "obj_name" (A string used as a name for an object. Any string
+           consisting of alphanumeric characters and the characters |._- that
+           is not an integer is acceptable.), parameter "type" of type
+           "type_string" (A type string. Specifies the type and its version in
+           a single string in the format [module].[typename]-[major].[minor]:
+           module - a string. The module name of the typespec containing the
+           type. typename - a string. The name of the type as assigned by the
+           typedef statement. major - an integer. The major version of the
+           type. A change in the major version implies the type has changed in
+           a non-backwards compatible way. minor - an integer. The minor
+           version of the type. A change in the minor version implies that the
+           type has changed in a way that is backwards compatible with
+           previous type definitions. In many cases, the major and minor
+           versions are optional, and if not provided the most recent version
+           will be used. Example: MyModule.MyType-3.1), parameter "save_date"
+           of type "timestamp" (A time in the format YYYY-MM-DDThh:mm:ssZ,
+           where Z is either the character Z (representing the UTC timezone)
+           or the difference in time to UTC in the format +/-HHMM, eg:
+           2012-12-17T23:24:06-0500 (EST time) 2013-04-03T08:56:32+0000 (UTC
+           time) 2013-04-03T08:56:32Z (UTC time)), parameter "version" of
+           Long, parameter "saved_by" of type "username" (Login name of a
+           KBase user account.), parameter "wsid" of type "ws_id" (The unique,
+           permanent numerical ID of a workspace.), parameter "workspace" of
+           type "ws_name" (A string used as a name for a workspace. Any string
+           consisting of alphanumeric characters and "_", ".", or "-" that is
+           not an integer is acceptable. The name may optionally be prefixed
+           with the workspace owner's user name and a colon, e.g.
+           kbasetest:my_workspace.), parameter "chsum" of String, parameter
+           "size" of Long, parameter "meta" of type "usermeta" (User provided
+           metadata about an object. Arbitrary key-value pairs provided by the
+           user.) -> mapping from String to String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN consensus_tree
+        logging.info("Starting 'consensus_tree'")
+        self.utils.validate_params(params, ("tree_refs", "ws_id", "output_name"), ("method",))
+        method = params.get('method', 'majority')
+        if method not in ('majority', 'strict'):
+            raise ValueError("method must be one of 'majority' or 'strict'")
+        data = self.utils.consensus_tree_object(params['tree_refs'], method == 'strict',
+                                                ctx.get('user_id'))
+        infos = self.utils.save_trees(params['ws_id'],
+                                      [{'data': data, 'name': params['output_name']}])
+        result = {'info': infos[0]}
+        #END consensus_tree
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method consensus_tree return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def tree_to_file(self, ctx, params):
+        """
+        Writes a tree to a file in one of several formats. Nodes are annotated
+        with their default_node_labels, ws_refs and kb_refs entries where the
+        format has a place for them.
+        :param params: instance of type "TreeToFileParams" (input_ref -
+           (required) reference to the tree destination_dir - (required)
+           directory to write the file to format - (required) "newick",
+           "nexus", "phyloxml", "nexml" or "json" compression - (optional)
+           "gzip" or "zstd" to compress the file while writing it) ->
+           structure: parameter "input_ref" of type "Tree_id" (@id kb
+           KBaseTrees.Tree), parameter "destination_dir" of String, parameter
+           "format" of String, parameter "compression" of String
+        :returns: instance of type "TreeToFileOutput" -> structure: parameter
+           "file_path" of String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN tree_to_file
+        logging.info("Starting 'tree_to_file' with params: {}".format(params))
+        self.utils.validate_params(params, ("destination_dir", "input_ref", "format"),
+                                   ("compression",))
+        file_path = self.utils.to_file(params['input_ref'], params['format'],
+                                       params['destination_dir'], params.get('compression'),
+                                       ctx.get('user_id'))
+        result = {'file_path': file_path}
+        #END tree_to_file
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method tree_to_file return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
+
+    def newick_files_to_trees(self, ctx, params):
+        """
+        Imports the trees of Newick and Nexus files as Tree objects, deriving
+        their leaf_list and default_node_labels. Each tree is named after its
+        file, and after its name or position in the file when a file holds
+        several trees.
+        :param params: instance of type "NewickFilesToTreesParams" (file_paths
+           - (required) Newick or Nexus files, directories of them or tar
+           archives of them in the scratch directory. Files may be gzip
+           compressed. ws_id - (required) workspace to save the trees to) ->
+           structure: parameter "file_paths" of list of String, parameter
+           "ws_id" of type "ws_id" (The unique, permanent numerical ID of a
+           workspace.)
+        :returns: instance of type "NewickFilesToTreesOutput" (infos - the
+           object_info of each saved tree errors - files, or trees of a file
+           holding several, that could not be imported, mapped to the reason)
+           -> structure: parameter "infos" of list of type "object_info"
+           (Information about an object, including user provided metadata.
+           obj_id objid - the numerical id of the object. obj_name name - the
+           name of the object. type_string type - the type of the object.
+           timestamp save_date - the save date of the object. obj_ver ver -
+           the version of the object. username saved_by - the user that saved
+           or copied the object. ws_id wsid - the workspace containing the
+           object. ws_name workspace - the workspace containing the object.
+           string chsum - the md5 checksum of the object. int size - the size
+           of the object in bytes. usermeta meta - arbitrary user-supplied
+           metadata about the object.) -> tuple of size 11: parameter "objid"
+           of type "obj_id" (The unique, permanent numerical ID of an
+           object.), parameter "name" of type "obj_name" (A string used as a
+           name for an object. Any string consisting of alphanumeric
+           characters and the characters |._- that is not an integer is
+           acceptable.), parameter "type" of type "type_string" (A type
+           string. Specifies the type and its version in a single string in
+           the format [module].[typename]-[major].[minor]: module - a string.
+           The module name of the typespec containing the type. typename - a
+           string. The name of the type as assigned by the typedef statement.
+           major - an integer. The major version of the type. A change in the
+           major version implies the type has changed in a non-backwards
+           compatible way. minor - an integer. The minor version of the type.
+           A change in the minor version implies that the type has changed in
+           a way that is backwards compatible with previous type definitions.
+           In many cases, the major and minor versions are optional, and if
+           not provided the most recent version will be used. Example:
+           MyModule.MyType-3.1), parameter "save_date" of type "timestamp" (A
+           time in the format YYYY-MM-DDThh:mm:ssZ, where Z is either the
+           character Z (representing the UTC timezone) or the difference in
+           time to UTC in the format +/-HHMM, eg: 2012-12-17T23:24:06-0500
+           (EST time) 2013-04-03T08:56:32+0000 (UTC time) 2013-04-03T08:56:32Z
+           (UTC time)), parameter "version" of Long, parameter "saved_by" of
+           type "username" (Login name of a KBase user account.), parameter
+           "wsid" of type "ws_id" (The unique, permanent numerical ID of a
+           workspace.), parameter "workspace" of type "ws_name" (A string used
+           as a name for a workspace. Any string consisting of alphanumeric
+           characters and "_", ".", or "-" that is not an integer is
+           acceptable. The name may optionally be prefixed with the workspace
+           owner's user name and a colon, e.g. kbasetest:my_workspace.),
+           parameter "chsum" of String, parameter "size" of Long, parameter
+           "meta" of type "usermeta" (User provided metadata about an object.
+           Arbitrary key-value pairs provided by the user.) -> mapping from
+           String to String, parameter "errors" of mapping from String to
+           String
+        """
+        # ctx is the context object
+        # return variables are: result
+        #BEGIN newick_files_to_trees
+        logging.info("Starting 'newick_files_to_trees'")
+        self.utils.validate_params(params, ("file_paths", "ws_id"))
+        infos, errors = self.utils.import_tree_files(params['file_paths'], params['ws_id'])
+        result = {'infos': infos, 'errors': errors}
+        #END newick_files_to_trees
+
+        # At some point might do deeper type checking...
+        if not isinstance(result, dict):
+            raise ValueError('Method newick_files_to_trees return value ' +
+                             'result is not type dict as required.')
+        # return the results
+        return [result]
     def status(self, ctx):
         #BEGIN_STATUS
         returnVal = {'state': "OK",
                      'message': "",
                      'version': self.VERSION,
                      'git_url': self.GIT_URL,
-                     'git_commit_hash': self.GIT_COMMIT_HASH}
+                     'git_commit_hash': self.GIT_COMMIT_HASH,
+                     'tree_cache': self.utils.object_cache.stats(),
+                     'disk_cache': self.utils.disk_cache.stats(),
+                     'parsed_tree_cache': self.utils.parsed_cache.stats(),
+                     'token_cache': self.auth_client.stats() if self.auth_client else {}}
         #END_STATUS
         return [returnVal]
@@ -5,7 +5,9 @@ import json
 import os
 import random as _random
 import sys
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from getopt import getopt, GetoptError
 from multiprocessing import Process
 from os import environ
@@ -18,6 +20,8 @@ from jsonrpcbase import ServerError as JSONServerError
 
 from biokbase import log
 from TreeUtils.authclient import KBaseAuth as _KBaseAuth
+from TreeUtils.core import HttpEncoding, RequestStream
+from TreeUtils.core.JsonEncoding import encode_json
 
 try:
     from ConfigParser import ConfigParser
@@ -69,17 +73,29 @@ class JSONObjectEncoder(json.JSONEncoder):
 
 class JSONRPCServiceCustom(JSONRPCService):
 
+    def __init__(self, batch_workers=1):
+        """
+        Arguments:
+        batch_workers -- the number of threads used to run the requests of a
+            batch concurrently. 1 runs them one after another. Either way no
+            request is started after one has failed, and the error of the
+            first failed request is raised. Concurrently, the requests already
+            running when one fails still finish.
+        """
+        super(JSONRPCServiceCustom, self).__init__()
+        self.batch_workers = batch_workers
+
     def call(self, ctx, jsondata):
         """
-        Calls jsonrpc service's method and returns its return value in a JSON
-        string or None if there is none.
+        Calls jsonrpc service's method and returns its return value as UTF-8
+        encoded JSON bytes or None if there is none.
 
         Arguments:
         jsondata -- remote method call in jsonrpc format
         """
         result = self.call_py(ctx, jsondata)
         if result is not None:
-            return json.dumps(result, cls=JSONObjectEncoder)
+            return encode_json(result)
 
         return None
 
@@ -164,8 +180,28 @@ class JSONRPCServiceCustom(JSONRPCService):
                 self._fill_request(request_, rdata_)
                 requests.append(request_)
 
-            for request_ in requests:
-                respond = self._handle_request(ctx, request_)
+            workers = min(self.batch_workers, len(requests))
+            if workers > 1:
+                # requests start in order and are skipped once one has failed,
+                # as they are in serial mode, and the first failure in request
+                # order is raised
+                failed = threading.Event()
+
+                def handle(request_):
+                    if failed.is_set():
+                        return None
+                    try:
+                        return self._handle_request(ctx, request_)
+                    except Exception:
+                        failed.set()
+                        raise
+
+                with ThreadPoolExecutor(workers) as executor:
+                    results = list(executor.map(handle, requests))
+            else:
+                results = (self._handle_request(ctx, request_)
+                           for request_ in requests)
+            for respond in results:
                 # Don't respond to notifications
                 if respond is not None:
                     responds.append(respond)
@@ -337,7 +373,8 @@ class Application(object):
             submod, ip_address=True, authuser=True, module=True, method=True,
             call_id=True, logfile=self.userlog.get_log_file())
         self.serverlog.set_log_level(6)
-        self.rpc_service = JSONRPCServiceCustom()
+        self.rpc_service = JSONRPCServiceCustom(
+            int(config.get('batch-workers', 1)) if config else 1)
         self.method_authentication = dict()
         self.rpc_service.add(impl_TreeUtils.get_trees,
                              name='TreeUtils.get_trees',
@@ -355,11 +392,64 @@ class Application(object):
                              name='TreeUtils.export_tree_newick',
                              types=[dict])
         self.method_authentication['TreeUtils.export_tree_newick'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.trees_to_newick_files,
+                             name='TreeUtils.trees_to_newick_files',
+                             types=[dict])
+        self.method_authentication['TreeUtils.trees_to_newick_files'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.export_trees_newick,
+                             name='TreeUtils.export_trees_newick',
+                             types=[dict])
+        self.method_authentication['TreeUtils.export_trees_newick'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.lowest_common_ancestors,
+                             name='TreeUtils.lowest_common_ancestors',
+                             types=[dict])
+        self.method_authentication['TreeUtils.lowest_common_ancestors'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.patristic_distances,
+                             name='TreeUtils.patristic_distances',
+                             types=[dict])
+        self.method_authentication['TreeUtils.patristic_distances'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.prune_tree,
+                             name='TreeUtils.prune_tree',
+                             types=[dict])
+        self.method_authentication['TreeUtils.prune_tree'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.compare_trees,
+                             name='TreeUtils.compare_trees',
+                             types=[dict])
+        self.method_authentication['TreeUtils.compare_trees'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.consensus_tree,
+                             name='TreeUtils.consensus_tree',
+                             types=[dict])
+        self.method_authentication['TreeUtils.consensus_tree'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.tree_to_file,
+                             name='TreeUtils.tree_to_file',
+                             types=[dict])
+        self.method_authentication['TreeUtils.tree_to_file'] = 'required'  # noqa
+        self.rpc_service.add(impl_TreeUtils.newick_files_to_trees,
+                             name='TreeUtils.newick_files_to_trees',
+                             types=[dict])
+        self.method_authentication['TreeUtils.newick_files_to_trees'] = 'required'  # noqa
         self.rpc_service.add(impl_TreeUtils.status,
                              name='TreeUtils.status',
                              types=[dict])
         authurl = config.get(AUTH) if config else None
         self.auth_client = _KBaseAuth(authurl)
+        # status reports the counters of its token cache
+        impl_TreeUtils.auth_client = self.auth_client
+        # responses of at least compress-min-bytes are compressed when the
+        # client accepts it. A compress-level of 0 turns compression off.
+        self.compress_min_bytes = int(config.get('compress-min-bytes', 1024)) \
+            if config else 1024
+        self.compress_level = int(config.get('compress-level', 6)) \
+            if config else 6
+        # compressed request bodies may decompress to at most this many bytes
+        self.max_decoded_body_bytes = int(
+            config.get('max-decoded-body-bytes', 2 ** 30)) \
+            if config else 2 ** 30
+        # bodies of at least stream-min-bytes are spooled to scratch and
+        # parsed incrementally when ijson is installed. 0 turns this off.
+        self.stream_min_bytes = int(config.get('stream-min-bytes', 0)) \
+            if config and RequestStream.STREAMING else 0
+        self.scratch = config.get('scratch') if config else None
 
     def __call__(self, environ, start_response):
         # Context object, equivalent to the perl impl CallContext
@@ -376,9 +466,20 @@ class Application(object):
             status = '200 OK'
             rpc_result = ""
         else:
-            request_body = environ['wsgi.input'].read(body_size)
+            spool = None
             try:
-                req = json.loads(request_body)
+                if self.stream_min_bytes and body_size >= self.stream_min_bytes:
+                    spool = RequestStream.spool_body(
+                        environ['wsgi.input'], body_size,
+                        environ.get('HTTP_CONTENT_ENCODING'), self.scratch,
+                        self.max_decoded_body_bytes)
+                    req = RequestStream.load_request(spool)
+                else:
+                    request_body = environ['wsgi.input'].read(body_size)
+                    request_body = HttpEncoding.decode(
+                        request_body, environ.get('HTTP_CONTENT_ENCODING'),
+                        self.max_decoded_body_bytes)
+                    req = json.loads(request_body)
             except ValueError as ve:
                 err = {'error': {'code': -32700,
                                  'name': "Parse error",
@@ -387,25 +488,28 @@ class Application(object):
                        }
                 rpc_result = self.process_error(err, ctx, {'version': '1.1'})
             else:
-                ctx['module'], ctx['method'] = req['method'].split('.')
-                ctx['call_id'] = req['id']
+                # a batch shares one context, described by its first request
+                calls = req if isinstance(req, list) and req else [req]
+                ctx['module'], ctx['method'] = calls[0]['method'].split('.')
+                ctx['call_id'] = calls[0]['id']
                 ctx['rpc_context'] = {
                     'call_stack': [{'time': self.now_in_utc(),
-                                    'method': req['method']}
+                                    'method': calls[0]['method']}
                                    ]
                 }
                 prov_action = {'service': ctx['module'],
                                'method': ctx['method'],
-                               'method_params': req['params']
+                               'method_params': calls[0]['params']
                                }
                 ctx['provenance'] = [prov_action]
                 try:
                     token = environ.get('HTTP_AUTHORIZATION')
                     # parse out the method being requested and check if it
                     # has an authentication requirement
-                    method_name = req['method']
-                    auth_req = self.method_authentication.get(
-                        method_name, 'none')
+                    auth_reqs = set(self.method_authentication.get(
+                        call['method'], 'none') for call in calls)
+                    auth_req = next((a for a in ('required', 'optional')
+                                     if a in auth_reqs), 'none')
                     if auth_req != 'none':
                         if token is None and auth_req == 'required':
                             err = JSONServerError()
@@ -452,6 +556,8 @@ class Application(object):
                            }
                     rpc_result = self.process_error(err, ctx, req,
                                                     traceback.format_exc())
+            if spool is not None:
+                spool.close()
 
         # print('Request method was %s\n' % environ['REQUEST_METHOD'])
         # print('Environment dictionary is:\n%s\n' % pprint.pformat(environ))
@@ -462,16 +568,25 @@ class Application(object):
         if rpc_result:
             response_body = rpc_result
         else:
-            response_body = ''
+            response_body = b''
+        if not isinstance(response_body, bytes):
+            response_body = response_body.encode('utf8')
 
         response_headers = [
             ('Access-Control-Allow-Origin', '*'),
             ('Access-Control-Allow-Headers', environ.get(
                 'HTTP_ACCESS_CONTROL_REQUEST_HEADERS', 'authorization')),
             ('content-type', 'application/json'),
-            ('content-length', str(len(response_body)))]
+            ('vary', 'Accept-Encoding')]
+        encoding = HttpEncoding.negotiate(environ.get('HTTP_ACCEPT_ENCODING'))
+        if (encoding and self.compress_level and
+                len(response_body) >= self.compress_min_bytes):
+            response_body = HttpEncoding.encode(response_body, encoding,
+                                                self.compress_level)
+            response_headers.append(('content-encoding', encoding))
+        response_headers.append(('content-length', str(len(response_body))))
         start_response(status, response_headers)
-        return [response_body.encode('utf8')]
+        return [response_body]
 
     def process_error(self, error, context, request, trace=None):
         if trace:
@@ -607,8 +722,8 @@ def process_async_cli(input_file_path, output_file_path, token):
                 }
     if 'error' in resp:
         exit_code = 500
-    with open(output_file_path, "w") as f:
-        f.write(json.dumps(resp, cls=JSONObjectEncoder))
+    with open(output_file_path, "wb") as f:
+        f.write(encode_json(resp))
     return exit_code
 
 if __name__ == "__main__":
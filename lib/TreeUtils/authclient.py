@@ -9,30 +9,37 @@ import time as _time
 import requests as _requests
 import threading as _threading
 import hashlib
+from collections import OrderedDict as _OrderedDict
 
 
 class TokenCache(object):
-    ''' A basic cache for tokens. '''
+    ''' A least recently used cache for tokens that expire after a fixed time. '''
 
     _MAX_TIME_SEC = 5 * 60  # 5 min
 
-    _lock = _threading.RLock()
-
-    def __init__(self, maxsize=2000):
-        self._cache = {}
+    def __init__(self, maxsize=2000, ttl=_MAX_TIME_SEC):
+        # token hash -> (user, time added), least recently used first
+        self._cache = _OrderedDict()
         self._maxsize = maxsize
-        self._halfmax = maxsize / 2  # int division to round down
+        self._ttl = ttl
+        self._lock = _threading.Lock()
+
+    @staticmethod
+    def _hash(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
     def get_user(self, token):
-        token = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        token = self._hash(token)
+        now = _time.time()
         with self._lock:
             usertime = self._cache.get(token)
-        if not usertime:
-            return None
-
-        user, intime = usertime
-        if _time.time() - intime > self._MAX_TIME_SEC:
-            return None
+            if not usertime:
+                return None
+            user, intime = usertime
+            if now - intime > self._ttl:
+                del self._cache[token]
+                return None
+            self._cache.move_to_end(token)
         return user
 
     def add_valid_token(self, token, user):
@@ -40,19 +47,22 @@ class TokenCache(object):
             raise ValueError('Must supply token')
         if not user:
             raise ValueError('Must supply user')
-        token = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        token = self._hash(token)
+        now = _time.time()
         with self._lock:
-            self._cache[token] = [user, _time.time()]
-            if len(self._cache) > self._maxsize:
-                sorted_items = sorted(
-                    list(self._cache.items()),
-                    key=(lambda v: v[1][1])
-                )
-                for i, (t, _) in enumerate(sorted_items):
-                    if i <= self._halfmax:
-                        del self._cache[t]
-                    else:
-                        break
+            self._cache[token] = (user, now)
+            self._cache.move_to_end(token)
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+
+
+class _Lookup(object):
+    ''' An auth service lookup that concurrent requests for a token wait on. '''
+
+    def __init__(self):
+        self.done = _threading.Event()
+        self.user = None
+        self.error = None
 
 
 class KBaseAuth(object):
@@ -62,7 +72,9 @@ class KBaseAuth(object):
 
     _LOGIN_URL = 'https://kbase.us/services/auth/api/legacy/KBase/Sessions/Login'
 
-    def __init__(self, auth_url=None):
+    _REJECTED_TIME_SEC = 30
+
+    def __init__(self, auth_url=None, rejected_ttl=_REJECTED_TIME_SEC):
         '''
         Constructor
         '''
@@ -70,14 +82,58 @@ class KBaseAuth(object):
         if not self._authurl:
             self._authurl = self._LOGIN_URL
         self._cache = TokenCache()
+        # error messages for tokens the auth service rejected
+        self._rejected = TokenCache(ttl=rejected_ttl)
+        # token hash -> _Lookup in progress
+        self._lookups = {}
+        self._lock = _threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.rejected_hits = 0
 
     def get_user(self, token):
         if not token:
             raise ValueError('Must supply token')
         user = self._cache.get_user(token)
         if user:
+            with self._lock:
+                self.hits += 1
             return user
-
+        error = self._rejected.get_user(token)
+        if error:
+            with self._lock:
+                self.rejected_hits += 1
+            raise ValueError(error)
+
+        # only one request per token goes to the auth service at a time,
+        # the others wait for its result
+        key = TokenCache._hash(token)
+        with self._lock:
+            lookup = self._lookups.get(key)
+            waiting = lookup is not None
+            if waiting:
+                self.coalesced += 1
+            else:
+                lookup = self._lookups[key] = _Lookup()
+                self.misses += 1
+        if waiting:
+            lookup.done.wait()
+            if lookup.error:
+                raise lookup.error
+            return lookup.user
+        try:
+            lookup.user = self._fetch_user(token)
+        except Exception as e:
+            lookup.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._lookups[key]
+            lookup.done.set()
+        return lookup.user
+
+    def _fetch_user(self, token):
         d = {'token': token, 'fields': 'user_id'}
         ret = _requests.post(self._authurl, data=d)
         if not ret.ok:
@@ -85,10 +141,22 @@ class KBaseAuth(object):
                 err = ret.json()
             except Exception as e:
                 ret.raise_for_status()
-            raise ValueError('Error connecting to auth service: {} {}\n{}'
-                             .format(ret.status_code, ret.reason,
-                                     err['error']['message']))
+            message = ('Error connecting to auth service: {} {}\n{}'
+                       .format(ret.status_code, ret.reason,
+                               err['error']['message']))
+            if ret.status_code in (401, 403):
+                # the token was rejected, rather than the request or the
+                # service failing
+                self._rejected.add_valid_token(token, message)
+            raise ValueError(message)
 
         user = ret.json()['user_id']
         self._cache.add_valid_token(token, user)
         return user
+
+    def stats(self):
+        ''' Counts of cache hits, auth service lookups and coalesced requests. '''
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'coalesced': self.coalesced,
+                    'rejected_hits': self.rejected_hits}
@@ -0,0 +1,277 @@
+"""Compact array backed representation of a parsed tree.
+
+Nodes are numbered in preorder, so a node's subtree occupies a contiguous
+range of indices and every parent has a lower index than its children.
+Structure is kept in parallel NumPy arrays, which costs roughly 24 bytes per
+node plus an interned table of the distinct labels.
+"""
+from array import array
+
+import numpy as np
+
+from .Newick import CLOSE, LEAF, OPEN, iter_events, quote
+
+# nodes are converted to python values in blocks of this size while serializing
+_BLOCK = 65536
+
+
+class ArrayTree:
+    """A rooted tree stored as parent, first child/next sibling, branch length and label arrays
+
+    parent, first_child and next_sibling hold node indices with -1 for none,
+    length holds branch lengths with NaN where a node has none and label holds
+    an index into labels, or -1 for an unlabeled node.
+    """
+    def __init__(self, parent, first_child, next_sibling, length, label, labels):
+        self.parent = parent
+        self.first_child = first_child
+        self.next_sibling = next_sibling
+        self.length = length
+        self.label = label
+        self.labels = labels
+        self._leaf_ids = None
+
+    @classmethod
+    def from_newick(cls, newick):
+        """Builds a tree from a Newick string in a single pass of the tokenizer"""
+        parent, first_child, next_sibling = array('i'), array('i'), array('i')
+        length, label = array('d'), array('i')
+        labels, label_ids = [], {}
+        # open internal nodes and the last child added to each of them
+        stack, last_child = [], []
+        nan = float('nan')
+
+        def intern(text):
+            if text is None:
+                return -1
+            idx = label_ids.get(text)
+            if idx is None:
+                idx = label_ids[text] = len(labels)
+                labels.append(text)
+            return idx
+
+        for event, text, branch, _ in iter_events(newick):
+            if event == CLOSE:
+                idx = stack.pop()
+                last_child.pop()
+                label[idx] = intern(text)
+                if branch is not None:
+                    length[idx] = branch
+                continue
+            idx = len(parent)
+            parent.append(stack[-1] if stack else -1)
+            first_child.append(-1)
+            next_sibling.append(-1)
+            if stack:
+                if last_child[-1] == -1:
+                    first_child[stack[-1]] = idx
+                else:
+                    next_sibling[last_child[-1]] = idx
+                last_child[-1] = idx
+            if event == OPEN:
+                length.append(nan)
+                label.append(-1)
+                stack.append(idx)
+                last_child.append(-1)
+            elif event == LEAF:
+                length.append(nan if branch is None else branch)
+                label.append(intern(text))
+
+        return cls(np.frombuffer(parent, dtype=np.int32),
+                   np.frombuffer(first_child, dtype=np.int32),
+                   np.frombuffer(next_sibling, dtype=np.int32),
+                   np.frombuffer(length, dtype=np.float64),
+                   np.frombuffer(label, dtype=np.int32),
+                   labels)
+
+    @classmethod
+    def from_parents(cls, parent, length, label, labels):
+        """Builds a tree from preorder parent, branch length and label arrays"""
+        n = len(parent)
+        first_child = np.full(n, -1, dtype=np.int32)
+        next_sibling = np.full(n, -1, dtype=np.int32)
+        last_child = [-1] * n
+        for node, up in enumerate(parent.tolist()):
+            if up == -1:
+                continue
+            if last_child[up] == -1:
+                first_child[up] = node
+            else:
+                next_sibling[last_child[up]] = node
+            last_child[up] = node
+        return cls(np.asarray(parent, dtype=np.int32), first_child, next_sibling,
+                   np.asarray(length, dtype=np.float64), np.asarray(label, dtype=np.int32),
+                   labels)
+
+    def __len__(self):
+        return len(self.parent)
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the tree, including the label table"""
+        arrays = (self.parent, self.first_child, self.next_sibling, self.length, self.label)
+        nbytes = sum(a.nbytes for a in arrays) + sum(len(label) + 50 for label in self.labels)
+        if self._leaf_ids is not None:
+            nbytes += 100 * len(self._leaf_ids)
+        return nbytes
+
+    def is_leaf(self):
+        """Boolean array which is True for leaf nodes"""
+        return self.first_child == -1
+
+    def leaves(self):
+        """Indices of the leaves in preorder"""
+        return np.flatnonzero(self.first_child == -1)
+
+    def label_of(self, node):
+        """The label of a node or None if it has none"""
+        idx = self.label[node]
+        return self.labels[idx] if idx >= 0 else None
+
+    def children(self, node):
+        """Yields the indices of the children of a node"""
+        child = int(self.first_child[node])
+        while child != -1:
+            yield child
+            child = int(self.next_sibling[child])
+
+    def leaf_nodes(self, leaf_labels):
+        """Node indices of leaves given by label, raising a ValueError for unknown labels
+
+        The label to node mapping is built on first use and kept with the tree.
+        """
+        if self._leaf_ids is None:
+            leaves = self.leaves()
+            self._leaf_ids = dict(zip((self.labels[i] for i in self.label[leaves].tolist()),
+                                      leaves.tolist()))
+        by_label = self._leaf_ids
+        missing = [label for label in leaf_labels if label not in by_label]
+        if missing:
+            raise ValueError("Leaves not found in the tree: {}".format(", ".join(missing[:10])))
+        return np.fromiter((by_label[label] for label in leaf_labels), dtype=np.int32,
+                           count=len(leaf_labels))
+
+    def depths(self):
+        """Number of edges between the root and each node"""
+        parent = self.parent.tolist()
+        depth = [0] * len(parent)
+        for node in range(1, len(parent)):
+            depth[node] = depth[parent[node]] + 1
+        return np.array(depth, dtype=np.int32)
+
+    def root_distances(self):
+        """Sum of branch lengths between the root and each node, missing lengths counting 0"""
+        length = np.nan_to_num(self.length)
+        length[0] = 0.0
+        parent = self.parent.tolist()
+        distance = length.tolist()
+        for node in range(1, len(parent)):
+            distance[node] += distance[parent[node]]
+        return np.array(distance)
+
+    def subtree_sizes(self):
+        """Number of nodes in the subtree of each node, itself included"""
+        parent = self.parent.tolist()
+        size = [1] * len(parent)
+        for node in range(len(parent) - 1, 0, -1):
+            size[parent[node]] += size[node]
+        return np.array(size, dtype=np.int32)
+
+    def leaf_counts(self):
+        """Number of leaves in the subtree of each node"""
+        parent = self.parent.tolist()
+        count = (self.first_child == -1).astype(np.int32).tolist()
+        for node in range(len(parent) - 1, 0, -1):
+            count[parent[node]] += count[node]
+        return np.array(count, dtype=np.int32)
+
+    def prune(self, leaves):
+        """A new tree keeping only the given leaf nodes, in one pass over the nodes
+
+        Internal nodes left with a single child are collapsed, their branch length
+        being added to the child's, so distances between the kept leaves are
+        unchanged. Lengths above the new root are dropped and it keeps the old root's.
+        """
+        n = len(self.parent)
+        kept = np.zeros(n, dtype=bool)
+        kept[leaves] = True
+        parent = self.parent.tolist()
+        kept_list = kept.tolist()
+        for node in range(n - 1, 0, -1):
+            if kept_list[node]:
+                kept_list[parent[node]] = True
+        kept = np.array(kept_list, dtype=bool)
+        has_parent = kept & (self.parent >= 0)
+        kept_children = np.bincount(self.parent[has_parent], minlength=n)
+        collapsed = (kept & (kept_children == 1)).tolist()
+        length = self.length.tolist()
+
+        # for each collapsed node, the nearest kept ancestor and the summed lengths up to it
+        above, extra = [-1] * n, [float('nan')] * n
+        new_index = [-1] * n
+        new_parent, new_length, new_label = [], [], []
+        label = self.label.tolist()
+        for node in np.flatnonzero(kept).tolist():
+            up = parent[node]
+            if up == -1 or not collapsed[up]:
+                ancestor, carried = up, float('nan')
+            else:
+                ancestor, carried = above[up], extra[up]
+            branch = length[node]
+            if carried == carried:
+                branch = carried if branch != branch else branch + carried
+            if collapsed[node]:
+                above[node], extra[node] = ancestor, branch
+                continue
+            new_index[node] = len(new_parent)
+            new_parent.append(new_index[ancestor] if ancestor != -1 else -1)
+            new_length.append(branch if ancestor != -1 else length[0])
+            new_label.append(label[node])
+
+        new_label = np.array(new_label, dtype=np.int32)
+        used = np.unique(new_label[new_label >= 0])
+        # the extra last entry maps the -1 of unlabeled nodes to itself
+        remap = np.full(len(self.labels) + 1, -1, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        return self.from_parents(np.array(new_parent, dtype=np.int32), np.array(new_length),
+                                 remap[new_label], [self.labels[i] for i in used.tolist()])
+
+    def _tail(self, node, label=None, branch=None):
+        """A node's Newick label and branch length"""
+        if label is None:
+            label, branch = self.label[node], self.length[node]
+        text = quote(self.labels[label]) if label >= 0 else ''
+        if branch == branch:
+            text += ':' + repr(float(branch))
+        return text
+
+    def iter_newick(self):
+        """Yields the tree as Newick text in small pieces.
+
+        Relies on preorder numbering: when a node is not the first child of the
+        node before it, the previous node was a leaf and its ancestors up to the
+        new node's parent are closed before starting the new sibling.
+        """
+        parent = self.parent
+        for start in range(0, len(parent), _BLOCK):
+            block = slice(start, start + _BLOCK)
+            nodes = zip(parent[block].tolist(), self.first_child[block].tolist(),
+                        self.label[block].tolist(), self.length[block].tolist())
+            for node, (up, first, label, branch) in enumerate(nodes, start):
+                if node and up != node - 1:
+                    ancestor = int(parent[node - 1])
+                    while ancestor != up:
+                        yield ')' + self._tail(ancestor)
+                        ancestor = int(parent[ancestor])
+                    yield ','
+                yield '(' if first != -1 else self._tail(node, label, branch)
+        if len(parent):
+            ancestor = int(parent[-1])
+            while ancestor != -1:
+                yield ')' + self._tail(ancestor)
+                ancestor = int(parent[ancestor])
+        yield ';'
+
+    def to_newick(self):
+        """Serializes the tree to a Newick string"""
+        return ''.join(self.iter_newick())
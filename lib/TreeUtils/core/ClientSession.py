@@ -0,0 +1,63 @@
+"""Pooled keep-alive connections for the kb-sdk generated JSON-RPC clients.
+
+The generated BaseClient posts every call with requests.post, which opens a new
+connection, and TLS handshake, each time. Rather than editing generated code,
+which kb-sdk compile and install overwrite, pool_connections points the
+requests module a client's baseclient posts through at PooledRequests, which
+posts through a requests.Session whose connections are kept alive and reused.
+"""
+import os
+import sys
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PooledRequests:
+    """Stands in for the requests module, posting through a shared pooled session
+
+    The session is shared by every thread and client of the baseclient module it
+    is installed in, and keeps up to pool_maxsize connections to each host. A
+    forked worker process gets a fresh session so that it never writes to a
+    socket opened by its parent. Other attributes are those of requests.
+    """
+    def __init__(self, pool_maxsize=10):
+        if pool_maxsize < 1:
+            raise ValueError('pool_maxsize must be at least 1')
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._session is None or self._session_pid != pid:
+                session = requests.Session()
+                # calls are stateless, so never store or send cookies
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_maxsize=self.pool_maxsize)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session, self._session_pid = session, pid
+            return self._session
+
+    def post(self, url, **kwargs):
+        return self.session().post(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def pool_connections(client, pool_maxsize=10):
+    """Makes a generated client reuse pooled keep-alive connections and returns it
+
+    Every other client of the same baseclient module shares the pool, which is
+    sized by the first call for that module.
+    """
+    module = sys.modules[type(client._client).__module__]
+    if not isinstance(module._requests, PooledRequests):
+        module._requests = PooledRequests(pool_maxsize)
+    return client
@@ -0,0 +1,161 @@
+"""A size bounded file cache in scratch that can be shared by several processes"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+
+def content_key(data):
+    """Key under which a payload is stored by its SHA-256 digest"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+class DiskCache:
+    """Stores byte payloads in files named by the SHA-256 of their key.
+
+    Writes go to a temporary file in the cache directory which is renamed into
+    place, so concurrent readers and writers in other processes only ever see
+    complete entries. Reads refresh a file's access time and once the cache
+    grows past max_bytes eviction removes the entries with the oldest access
+    times until it is back under the low water mark, a fraction of max_bytes,
+    so that the puts that follow do not each scan the directory again. A
+    max_bytes of 0 disables the cache.
+    """
+    LOW_WATER = 0.9
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.max_bytes:
+            os.makedirs(directory, exist_ok=True)
+        # approximate size, corrected by a directory scan whenever it exceeds max_bytes
+        self._bytes = self._scan()[1] if self.max_bytes else 0
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _entries(self):
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir() or sub.name.startswith('.'):
+                continue
+            for entry in os.scandir(sub.path):
+                if not entry.name.startswith('.'):
+                    yield entry
+
+    def _scan(self):
+        """Returns the list of (atime, size, path) entries and their total size"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+        return entries, sum(e[1] for e in entries)
+
+    def contains(self, key):
+        """True if key is cached. Does not refresh the entry or count as a hit or miss"""
+        return bool(self.max_bytes) and os.path.exists(self._path(key))
+
+    def get_path(self, key):
+        """Returns the path of the file cached for key, or None"""
+        if not self.max_bytes:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def get(self, key):
+        """Returns the bytes cached for key, or None"""
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            # evicted by another process since get_path
+            return None
+
+    def put(self, key, data):
+        """Caches bytes for key and returns the path of the entry"""
+        def write(out):
+            out.write(data)
+        return self._put(key, write)
+
+    def put_file(self, key, file_path):
+        """Caches a copy of a file for key and returns the path of the entry"""
+        def write(out):
+            with open(file_path, 'rb') as f:
+                shutil.copyfileobj(f, out)
+        return self._put(key, write)
+
+    def _put(self, key, write):
+        if not self.max_bytes:
+            return None
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                write(out)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._bytes += size
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def evict(self):
+        """Removes the least recently read entries until the cache is under its low water mark"""
+        entries, total = self._scan()
+        entries.sort()
+        evicted = 0
+        low_water = int(self.max_bytes * self.LOW_WATER)
+        for _, size, path in entries:
+            if total <= low_water:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._bytes = total
+            self.evictions += evicted
+
+    def stats(self, scan=False):
+        """Counters for this process along with the size of the shared cache
+
+        bytes is the size tracked as this process adds and evicts entries, which
+        misses the entries other processes added since its last eviction. scan=True
+        walks the cache directory for the exact size and number of entries instead.
+        """
+        with self._lock:
+            stats = {'bytes': self._bytes, 'max_bytes': self.max_bytes, 'hits': self.hits,
+                     'misses': self.misses, 'evictions': self.evictions}
+        if scan:
+            entries, stats['bytes'] = self._scan() if self.max_bytes else ([], 0)
+            stats['entries'] = len(entries)
+        return stats
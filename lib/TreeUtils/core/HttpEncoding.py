@@ -0,0 +1,139 @@
+"""Content-Encoding negotiation and coding of HTTP bodies for the JSON-RPC server"""
+import gzip
+import zlib
+
+# supported content codings in order of preference
+ENCODINGS = ('gzip', 'deflate')
+
+
+def negotiate(accept_encoding):
+    """Picks the preferred supported coding allowed by an Accept-Encoding header, or None"""
+    qualities = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encode(body, encoding, level=6):
+    """Compresses bytes with gzip or deflate (the zlib format, as HTTP defines it)"""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(body, level)
+    raise ValueError("Unsupported content encoding: {}".format(encoding))
+
+
+def _inflate(body, wbits, max_bytes, members=False):
+    """Decompresses a zlib, gzip or raw deflate stream, raising ValueError past max_bytes
+
+    With members, the concatenated members of a gzip body are decompressed in turn.
+    """
+    parts, total = [], 0
+    while True:
+        decompressor = zlib.decompressobj(wbits)
+        # one byte more than allowed is enough to tell that the body is too large
+        data = decompressor.decompress(body, max_bytes + 1 - total if max_bytes else 0)
+        total += len(data)
+        if max_bytes and total > max_bytes:
+            raise ValueError("Decompressed request body is larger than {} bytes"
+                             .format(max_bytes))
+        parts.append(data)
+        if not decompressor.eof:
+            raise zlib.error("incomplete stream")
+        body = decompressor.unused_data
+        if not (members and body.strip(b'\0')):
+            return b''.join(parts)
+
+
+def decode(body, encoding, max_bytes=0):
+    """Decompresses a request body sent with a Content-Encoding header.
+
+    Raises ValueError for an unsupported coding, a corrupt body, or a body that
+    decompresses to more than max_bytes (0 for no limit). Decompression stops as
+    soon as the limit is passed, so a small body cannot expand to fill memory.
+    """
+    encoding = (encoding or 'identity').strip().lower()
+    if encoding == 'identity':
+        return body
+    try:
+        if encoding in ('gzip', 'x-gzip'):
+            return _inflate(body, 16 + zlib.MAX_WBITS, max_bytes, members=True)
+        if encoding == 'deflate':
+            try:
+                return _inflate(body, zlib.MAX_WBITS, max_bytes)
+            except zlib.error:
+                # some clients send a raw deflate stream without the zlib header
+                return _inflate(body, -zlib.MAX_WBITS, max_bytes)
+    except zlib.error as e:
+        raise ValueError("Invalid {} request body: {}".format(encoding, e))
+    raise ValueError("Unsupported content encoding: {}".format(encoding))
+
+
+class _Identity:
+    def decompress(self, data, max_length=0):
+        return data
+
+    def flush(self):
+        return b''
+
+
+class _GzipMembers:
+    """Decodes the concatenated members of a gzip body as zlib's decompressobj does one
+
+    When a member ends, the data after it is left in unconsumed_tail, and the next
+    call to decompress starts a new member with it. Trailing NULs are ignored, as
+    decode ignores them.
+    """
+    def __init__(self):
+        self._member = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.unconsumed_tail = b''
+
+    @property
+    def eof(self):
+        return self._member.eof
+
+    def decompress(self, data, max_length=0):
+        if self._member.eof:
+            if not data.strip(b'\0'):
+                self.unconsumed_tail = b''
+                return b''
+            self._member = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        data = self._member.decompress(data, max_length)
+        if self._member.eof:
+            self.unconsumed_tail = self._member.unused_data
+        else:
+            self.unconsumed_tail = self._member.unconsumed_tail
+        return data
+
+    def flush(self):
+        return self._member.flush()
+
+
+def decoder(encoding):
+    """An object with zlib's decompress and flush methods for decoding a body in chunks
+
+    The caller must pass unconsumed_tail back to decompress, if it has one, before
+    the next chunk. Unlike decode, a deflate body must include the zlib header.
+    """
+    encoding = (encoding or 'identity').strip().lower()
+    if encoding == 'identity':
+        return _Identity()
+    if encoding in ('gzip', 'x-gzip'):
+        return _GzipMembers()
+    if encoding == 'deflate':
+        return zlib.decompressobj()
+    raise ValueError("Unsupported content encoding: {}".format(encoding))
@@ -0,0 +1,38 @@
+"""Serialization of JSON-RPC responses straight to UTF-8 bytes"""
+import json
+
+# optional faster encoders, preferred in this order when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _to_jsonable(obj):
+    """Converts the values the server's JSONObjectEncoder supports beyond plain JSON"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'toJSONable'):
+        return obj.toJSONable()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+
+def encode_json(obj):
+    """Serializes obj to UTF-8 encoded JSON bytes
+
+    Uses orjson or ujson when installed and falls back to the json module for
+    anything they reject, such as non string keys or integers wider than 64 bits.
+    """
+    try:
+        if orjson is not None:
+            return orjson.dumps(obj, default=_to_jsonable)
+        if ujson is not None:
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False,
+                               default=_to_jsonable).encode('utf-8')
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return json.dumps(obj, default=_to_jsonable).encode('utf-8')
@@ -0,0 +1,66 @@
+"""Constant time lowest common ancestor queries on an ArrayTree"""
+import numpy as np
+
+
+class LCAIndex:
+    """An Euler tour of a tree with a sparse table for range minimum queries on it
+
+    The tour lists nodes as a depth first walk enters them and returns to them,
+    2n - 1 entries in all. The shallowest entry between the first visits of two
+    nodes is their lowest common ancestor. Level k of the sparse table holds, for
+    every tour position, the position of the shallowest entry in the 2**k
+    entries starting there, so any range is covered by two overlapping blocks.
+    Building takes O(n log n) time and memory and each query takes O(1).
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        depth = tree.depths()
+        size = tree.subtree_sizes()
+        self.leaf_count = tree.leaf_counts()
+        self.root_distance = tree.root_distances()
+        nodes = np.arange(len(tree), dtype=np.int32)
+        # nodes are numbered in preorder: before node v the walk has entered
+        # v nodes and returned from the v - depth[v] of them that are not its ancestors
+        self.first = 2 * nodes - depth
+        tour = np.empty(max(2 * len(tree) - 1, 0), dtype=np.int32)
+        tour[self.first] = nodes
+        # after the subtree of a non-root node the walk returns to its parent
+        tour[self.first[1:] + 2 * size[1:] - 1] = tree.parent[1:]
+        self.tour = tour
+        self.tour_depth = depth[tour]
+        self.table = [np.arange(len(tour), dtype=np.int32)]
+        span = 1
+        while 2 * span <= len(tour):
+            prev = self.table[-1]
+            left, right = prev[:len(prev) - span], prev[span:]
+            self.table.append(np.where(self.tour_depth[left] <= self.tour_depth[right],
+                                       left, right))
+            span *= 2
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the index and its tree"""
+        arrays = [self.first, self.tour, self.tour_depth, self.leaf_count,
+                  self.root_distance] + self.table
+        return sum(a.nbytes for a in arrays) + self.tree.nbytes
+
+    def query(self, u, v):
+        """Lowest common ancestors of the node pairs given by two equal length arrays"""
+        left = np.minimum(self.first[u], self.first[v])
+        right = np.maximum(self.first[u], self.first[v])
+        # the largest block that fits in each range
+        level = np.floor(np.log2(right - left + 1)).astype(np.int64)
+        result = np.empty(len(left), dtype=np.int32)
+        for k in np.unique(level).tolist():
+            pick = np.flatnonzero(level == k)
+            a = self.table[k][left[pick]]
+            b = self.table[k][right[pick] - (1 << k) + 1]
+            best = np.where(self.tour_depth[a] <= self.tour_depth[b], a, b)
+            result[pick] = self.tour[best]
+        return result
+
+    def distances(self, u, v):
+        """Patristic distances, the summed branch lengths of the paths between node pairs"""
+        ancestors = self.query(u, v)
+        return (self.root_distance[u] + self.root_distance[v] -
+                2 * self.root_distance[ancestors])
@@ -0,0 +1,187 @@
+"""Single pass Newick tokenizer and validator.
+
+The parser never builds node objects. It walks the string once with a regular
+expression and yields a flat stream of node events which callers can consume
+to validate a tree or build their own compact representation of it.
+"""
+import re
+
+# node events yielded by iter_events
+OPEN, LEAF, CLOSE = 0, 1, 2
+
+_WORD = r"[^\s()\[\]',:;]+"
+# a label and its branch length are matched as a single token to keep the
+# number of regex matches per node low
+_TOKEN_RE = re.compile(r"""
+      (?P<punct>[(),;])
+    | (?P<space>\s+)
+    | (?P<comment>\[[^\]]*\])
+    | (?P<label>'(?:[^']|'')*'|{word})(?:\s*:\s*(?P<length>{word}))?
+    | :\s*(?P<bare_length>{word})
+    | (?P<bad>.)
+""".format(word=_WORD), re.VERBOSE | re.DOTALL)
+
+# parser phases
+_START, _NAME, _AFTER_NAME, _TERM, _END = range(5)
+
+
+class NewickSyntaxError(ValueError):
+    """Raised for malformed Newick. offset is the byte offset of the problem"""
+    def __init__(self, message, newick, pos):
+        self.offset = len(newick[:pos].encode('utf-8'))
+        super(NewickSyntaxError, self).__init__(
+            "{} at byte {}".format(message, self.offset))
+
+
+_NEEDS_QUOTES = re.compile(r"[\s()\[\]',:;]")
+
+
+def quote(label):
+    """Returns label as a Newick token, quoting it if it contains special characters"""
+    if not label or _NEEDS_QUOTES.search(label):
+        return "'{}'".format(label.replace("'", "''"))
+    return label
+
+
+def unquote(token):
+    """Returns the label represented by a quoted or unquoted label token"""
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    return token
+
+
+def _parse_length(newick, m, group):
+    try:
+        return float(m.group(group))
+    except ValueError:
+        raise NewickSyntaxError("Invalid branch length {!r}".format(m.group(group)),
+                                newick, m.start(group))
+
+
+def iter_events(newick):
+    """Parses a Newick string in one pass, yielding (event, label, length, position).
+
+    An OPEN event is yielded for every '(' and a CLOSE event once the matching
+    internal node's label and branch length are known, so internal nodes are
+    reported in post order. LEAF events carry the leaf label and length.
+    Labels are None when absent and quoted labels are unquoted. Raises
+    NewickSyntaxError on the first problem encountered.
+    """
+    depth = 0
+    phase = _START
+    event, label, length, node_pos = LEAF, None, None, 0
+    for m in _TOKEN_RE.finditer(newick):
+        kind = m.lastgroup
+        if kind == 'space' or kind == 'comment':
+            continue
+        pos = m.start()
+        if phase == _END:
+            raise NewickSyntaxError("Unexpected text after ';'", newick, pos)
+        if not depth and phase == _START and m.group() != '(' and kind not in ('label', 'length'):
+            # a tree is either a parenthesized subtree or a single labeled leaf
+            raise NewickSyntaxError("Tree must start with '(' or a leaf label", newick, pos)
+
+        if kind == 'punct':
+            tok = m.group()
+            if tok == '(':
+                if phase != _START:
+                    raise NewickSyntaxError("Unexpected '('", newick, pos)
+                depth += 1
+                yield OPEN, None, None, pos
+                continue
+            if phase == _START:
+                # a leaf without a label or branch length
+                event, label, length, node_pos = LEAF, None, None, pos
+            if tok == ',':
+                if not depth:
+                    raise NewickSyntaxError("',' outside of parentheses", newick, pos)
+                yield event, label, length, node_pos
+                phase = _START
+            elif tok == ')':
+                if not depth:
+                    raise NewickSyntaxError("Unbalanced ')'", newick, pos)
+                yield event, label, length, node_pos
+                depth -= 1
+                event, label, length, node_pos = CLOSE, None, None, pos
+                phase = _NAME
+            else:
+                if depth:
+                    raise NewickSyntaxError("Unbalanced '('", newick, pos)
+                yield event, label, length, node_pos
+                phase = _END
+        elif kind == 'label' or kind == 'length':
+            if phase == _START:
+                event, node_pos = LEAF, pos
+            elif phase != _NAME:
+                raise NewickSyntaxError("Unexpected {!r}".format(m.group()), newick, pos)
+            label = unquote(m.group('label'))
+            if kind == 'length':
+                length = _parse_length(newick, m, 'length')
+                phase = _TERM
+            else:
+                length = None
+                phase = _AFTER_NAME
+        elif kind == 'bare_length':
+            if phase == _START:
+                event, label, node_pos = LEAF, None, pos
+            elif phase == _TERM:
+                raise NewickSyntaxError("Unexpected {!r}".format(m.group()), newick, pos)
+            length = _parse_length(newick, m, 'bare_length')
+            phase = _TERM
+        else:
+            message = "Unexpected character {!r}".format(m.group())
+            if m.group() == ':':
+                message = "Expected a branch length"
+            raise NewickSyntaxError(message, newick, pos)
+
+    if phase == _START and not depth:
+        raise NewickSyntaxError("Empty tree", newick, len(newick))
+    if phase != _END:
+        raise NewickSyntaxError("Missing ';' at end of tree", newick, len(newick))
+
+
+def relabel(newick, labels, leaves_only=False):
+    """Yields a Newick string in pieces with node labels replaced by their value in labels.
+
+    Only label tokens are rewritten, quoting the new labels where needed, so
+    branch lengths, comments and whitespace are kept as they are. With
+    leaves_only the labels of internal nodes, such as support values, are kept.
+    The string is not validated.
+    """
+    last = 0
+    # a label follows '(' or ',' or starts the tree for a leaf, and ')' for an internal node
+    after = None
+    for m in _TOKEN_RE.finditer(newick):
+        kind = m.lastgroup
+        if kind == 'punct':
+            after = m.group()
+        if kind != 'label' and kind != 'length':
+            continue
+        if leaves_only and after == ')':
+            continue
+        new_label = labels.get(unquote(m.group('label')))
+        if new_label is None:
+            continue
+        start, end = m.span('label')
+        yield newick[last:start]
+        yield quote(new_label)
+        last = end
+    yield newick[last:]
+
+
+def check_newick(newick, unique_leaves=True):
+    """Raises NewickSyntaxError if newick is malformed or has duplicate leaf names.
+
+    Returns the number of leaves in the tree.
+    """
+    seen = set()
+    leaves = 0
+    for event, label, _, pos in iter_events(newick):
+        if event != LEAF:
+            continue
+        leaves += 1
+        if unique_leaves and label:
+            if label in seen:
+                raise NewickSyntaxError("Duplicate leaf name {!r}".format(label), newick, pos)
+            seen.add(label)
+    return leaves
@@ -0,0 +1,118 @@
+"""Incremental parsing of large JSON-RPC request bodies.
+
+A large body is spooled to a temporary file. A first pass builds the request
+while leaving out the items of the streamed list of a method in STREAMED_LISTS,
+which is replaced by a SpooledItems that parses those items one at a time each
+time the method iterates over it. Memory use is then bounded by the largest
+item rather than by the whole request.
+"""
+import json
+import tempfile
+import zlib
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from . import HttpEncoding
+
+# True when the ijson package needed for incremental parsing is installed
+STREAMING = ijson is not None
+
+# methods whose first parameter holds a list that is parsed lazily, by list key
+STREAMED_LISTS = {'TreeUtils.save_trees': 'trees'}
+
+_CHUNK = 2 ** 20
+
+
+def spool_body(stream, size, encoding=None, directory=None, max_bytes=0):
+    """Copies size bytes of a request body to a temporary file, decoding it on the way
+
+    Raises ValueError for an unsupported or corrupt Content-Encoding, or once a
+    compressed body decompresses to more than max_bytes (0 for no limit).
+    """
+    decoder = HttpEncoding.decoder(encoding)
+    spool = tempfile.TemporaryFile(dir=directory)
+    limited = max_bytes and (encoding or 'identity').strip().lower() != 'identity'
+    try:
+        remaining, written = size, 0
+        while remaining > 0:
+            chunk = stream.read(min(_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            while chunk:
+                # output is bounded per call, so one chunk cannot expand without limit
+                data = decoder.decompress(chunk, _CHUNK)
+                written += len(data)
+                if limited and written > max_bytes:
+                    raise ValueError("Decompressed request body is larger than {} bytes"
+                                     .format(max_bytes))
+                spool.write(data)
+                chunk = getattr(decoder, 'unconsumed_tail', b'')
+        spool.write(decoder.flush())
+        if not getattr(decoder, 'eof', True):
+            raise zlib.error("incomplete stream")
+    except zlib.error as e:
+        spool.close()
+        raise ValueError("Invalid {} request body: {}".format(encoding, e))
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def _items_prefix(key):
+    return 'params.item.{}.item'.format(key)
+
+
+class SpooledItems:
+    """The items of a list in a spooled request, parsed one at a time whenever it is iterated
+
+    Iterations share the spool's file position, so one must end before the next
+    starts.
+    """
+    def __init__(self, spool, prefix):
+        self.spool = spool
+        self.prefix = prefix
+
+    def __iter__(self):
+        self.spool.seek(0)
+        return ijson.items(self.spool, self.prefix, use_float=True)
+
+
+def load_request(spool):
+    """Parses a spooled request, replacing a streamed list with a SpooledItems
+
+    Raises ValueError if the body is not valid JSON. Batches and methods without a
+    streamed list are parsed whole. The spool must stay open while the items are
+    iterated.
+    """
+    if not STREAMING:
+        return json.load(spool)
+    skipped = tuple(set(_items_prefix(key) for key in STREAMED_LISTS.values()))
+    nested = tuple(p + '.' for p in skipped)
+    builder = ijson.ObjectBuilder()
+    omitted = False
+    try:
+        for prefix, event, value in ijson.parse(spool, use_float=True):
+            if prefix in skipped or prefix.startswith(nested):
+                omitted = True
+                continue
+            builder.event(event, value)
+    except ijson.JSONError as e:
+        raise ValueError(str(e))
+    req = builder.value
+    if not omitted:
+        return req
+    key = STREAMED_LISTS.get(req.get('method')) if isinstance(req, dict) else None
+    params = req.get('params') if key else None
+    spool.seek(0)
+    if not (isinstance(params, list) and params and isinstance(params[0], dict) and
+            isinstance(params[0].get(key), list)):
+        # the omitted items belong to another method or parameter
+        return json.load(spool)
+    params[0][key] = SpooledItems(spool, _items_prefix(key))
+    return req
@@ -0,0 +1,186 @@
+"""Bipartitions of trees encoded as integer bitsets over a shared leaf index.
+
+Each leaf label is given a bit the first time any tree mentions it, and the
+bipartition an edge induces is the bitset of the leaves on one side of it.
+Splits are canonicalized to the side without the tree's lowest leaf bit, so
+trees are compared as unrooted and the same split always hashes the same.
+"""
+import os
+import pickle
+import tempfile
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+
+from .ArrayTree import ArrayTree
+
+
+def popcount(bits):
+    return bin(bits).count('1')
+
+
+def set_bits(bits):
+    """Positions of the set bits of an integer, in increasing order"""
+    return [i for i, digit in enumerate(reversed(bin(bits)[2:])) if digit == '1']
+
+
+def tree_splits(tree, leaf_index):
+    """Returns (leaf mask, frozenset of non-trivial splits) of an ArrayTree
+
+    leaf_index maps leaf labels to bit positions and is extended with the
+    labels it does not have yet. Unlabeled leaves are ignored.
+    """
+    parent = tree.parent.tolist()
+    first_child = tree.first_child.tolist()
+    label = tree.label.tolist()
+    labels = tree.labels
+    bits = [0] * len(parent)
+    for node in range(len(parent) - 1, -1, -1):
+        if first_child[node] == -1 and label[node] >= 0:
+            bits[node] |= 1 << leaf_index.setdefault(labels[label[node]], len(leaf_index))
+        if node:
+            bits[parent[node]] |= bits[node]
+    mask = bits[0] if bits else 0
+    internal = [bits[node] for node in range(1, len(parent)) if first_child[node] != -1]
+    return mask, canonical_splits(internal, mask)
+
+
+def canonical_splits(splits, mask):
+    """Restricts splits to the leaves in mask and drops the trivial ones"""
+    low = mask & -mask
+    total = popcount(mask)
+    result = set()
+    for split in splits:
+        split &= mask
+        if split & low:
+            split ^= mask
+        if 2 <= popcount(split) <= total - 2:
+            result.add(split)
+    return frozenset(result)
+
+
+def compare_splits(first, second):
+    """Compares two (leaf mask, splits) pairs on the leaves they have in common
+
+    Returns (common leaf count, shared splits, Robinson-Foulds distance and the
+    distance divided by the total number of splits of both trees).
+    """
+    (mask_a, splits_a), (mask_b, splits_b) = first, second
+    if mask_a != mask_b:
+        common = mask_a & mask_b
+        splits_a = canonical_splits(splits_a, common)
+        splits_b = canonical_splits(splits_b, common)
+    else:
+        common = mask_a
+    shared = len(splits_a & splits_b)
+    distance = len(splits_a) + len(splits_b) - 2 * shared
+    total = len(splits_a) + len(splits_b)
+    return popcount(common), shared, distance, distance / total if total else 0.0
+
+
+# (path, trees) of the comparison a pool worker last loaded trees for
+_loaded = (None, None)
+
+
+def _compare_pairs(task):
+    """Pool worker: compares pairs of trees given by their positions in the file at path
+
+    The trees are loaded once per worker and comparison rather than sent with
+    every task.
+    """
+    global _loaded
+    path, pairs = task
+    if _loaded[0] != path:
+        _loaded = (None, None)
+        with open(path, 'rb') as f:
+            _loaded = (path, pickle.load(f))
+    trees = _loaded[1]
+    return [compare_splits(trees[i], trees[j]) for i, j in pairs]
+
+
+def all_pairs(count, reference=None):
+    """Pairs of tree positions to compare: every pair, or each tree against reference"""
+    if reference is None:
+        return list(combinations(range(count), 2))
+    return [(reference, i) for i in range(count) if i != reference]
+
+
+def compare_trees(trees, pairs, workers=1, pool=None, directory=None):
+    """Compares (leaf mask, splits) pairs of trees, spreading the pairs over a process pool
+
+    pool may be shared with other callers, so rather than being set up in the
+    workers the trees are written once to a temporary file in directory, which
+    each worker reads when it is first given pairs of this comparison. Without
+    a pool the pairs are compared in this process.
+    """
+    if pool is None or workers < 2 or len(pairs) < 2:
+        return [compare_splits(trees[i], trees[j]) for i, j in pairs]
+    fd, path = tempfile.mkstemp(prefix='compare_trees_', suffix='.pickle', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(trees, f, pickle.HIGHEST_PROTOCOL)
+        chunksize = max(1, len(pairs) // (workers * 4))
+        tasks = [(path, pairs[start:start + chunksize])
+                 for start in range(0, len(pairs), chunksize)]
+        return [result for results in pool.map(_compare_pairs, tasks) for result in results]
+    finally:
+        os.unlink(path)
+
+
+def count_splits(trees, leaf_index):
+    """Counts the splits of a stream of ArrayTrees that must all have the same leaves
+
+    Only the counts are kept, so memory grows with the number of distinct splits
+    rather than the number of trees. Returns (leaf mask, tree count, Counter).
+    """
+    counts, mask, count = Counter(), None, 0
+    for count, tree in enumerate(trees, 1):
+        tree_mask, splits = tree_splits(tree, leaf_index)
+        if mask is None:
+            mask = tree_mask
+        elif tree_mask != mask:
+            raise ValueError("Tree {} does not have the same leaves as the first tree"
+                             .format(count - 1))
+        counts.update(splits)
+    return mask, count, counts
+
+
+def consensus_tree(mask, tree_count, counts, leaf_index, strict=False):
+    """Builds the majority rule or strict consensus of counted splits as an ArrayTree
+
+    Splits are taken as clusters, the side without the lowest leaf, and nested in
+    order of decreasing size under a root holding every leaf. Internal nodes are
+    labeled with the fraction of trees that have their split.
+    """
+    if strict:
+        kept = [(split, n) for split, n in counts.items() if n == tree_count]
+    else:
+        kept = [(split, n) for split, n in counts.items() if 2 * n > tree_count]
+    kept.sort(key=lambda item: popcount(item[0]), reverse=True)
+    leaves = set_bits(mask)
+    # node 0 is the root, then a node per kept split, then a node per leaf
+    children = [[] for _ in range(len(kept) + 1)]
+    deepest = dict.fromkeys(leaves, 0)
+    for node, (split, _) in enumerate(kept, 1):
+        members = set_bits(split)
+        children[deepest[members[0]]].append(node)
+        for bit in members:
+            deepest[bit] = node
+    first_leaf = len(children)
+    for i, bit in enumerate(leaves):
+        children[deepest[bit]].append(first_leaf + i)
+
+    labels = ["{:.3f}".format(n / tree_count) for _, n in kept]
+    by_bit = {bit: label for label, bit in leaf_index.items()}
+    labels += [by_bit[bit] for bit in leaves]
+    parent, label, stack = [], [], [(0, -1)]
+    while stack:
+        node, up = stack.pop()
+        index = len(parent)
+        parent.append(up)
+        label.append(node - 1)
+        if node < first_leaf:
+            stack.extend((child, index) for child in reversed(children[node]))
+    return ArrayTree.from_parents(np.array(parent, dtype=np.int32),
+                                  np.full(len(parent), np.nan), np.array(label), labels)
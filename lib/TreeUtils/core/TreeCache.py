@@ -0,0 +1,68 @@
+"""In memory caches for workspace data that can never change"""
+import re
+import threading
+from collections import OrderedDict
+
+# wsid/objid/ver with numeric ids and an explicit version. Workspaces and objects
+# can be renamed, so a ref by name may later resolve to another object, and
+# reference paths are not cached either.
+_VERSIONED_REF = re.compile(r"^\d+/\d+/\d+$")
+
+
+def is_versioned_ref(ref):
+    """True if ref names a single, fully versioned workspace object by its ids"""
+    return bool(_VERSIONED_REF.match(ref))
+
+
+class LRUCache:
+    """A thread safe least recently used cache bounded by the total size of its values
+
+    Sizes are supplied by the caller when a value is added. A value larger than
+    the whole cache is never stored. A max_bytes of 0 disables the cache.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value for key or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Adds a value, evicting the least recently used entries to stay under max_bytes"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit, miss and eviction counters along with the current size of the cache"""
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,172 @@
+"""Readers for importing trees from Newick and Nexus files.
+
+A file may hold several trees: Newick files one after another, each ending in
+';', and Nexus files as the TREE commands of a TREES block, with their leaf
+numbers replaced through the block's TRANSLATE table. Each tree is validated
+and turned into the data of a KBaseTrees.Tree object.
+"""
+import gzip
+import os
+import re
+from collections import deque
+from itertools import chain, islice
+
+from .Newick import LEAF, NewickSyntaxError, iter_events, relabel, unquote
+
+# splits text into statements at ';' outside of quoted labels and comments
+_STATEMENT_RE = re.compile(r"'(?:[^']|'')*'|\[[^\]]*\]|[^';\[]+|;|.", re.DOTALL)
+_COMMENT_RE = re.compile(r"\[[^\]]*\]")
+_LEADING_COMMENTS_RE = re.compile(r"^(?:\s*\[[^\]]*\])*\s*")
+_WORD_RE = re.compile(r"'(?:[^']|'')*'|[^\s,]+")
+# characters read from a tree file at a time
+_READ_SIZE = 1 << 16
+# file name extensions dropped when naming imported trees
+TREE_EXTENSIONS = ('.gz', '.nwk', '.newick', '.tree', '.tre', '.treefile', '.nex', '.nexus',
+                   '.nxs', '.txt')
+
+
+def split_statements(text):
+    """Yields the statements of text ended by ';', without the ';'
+
+    text is a string or an iterable of strings, such as chunks read from a file,
+    which are consumed only as far as the statements yielded so far. Trailing
+    text that is not blank is yielded as a last statement.
+    """
+    chunks = (text,) if isinstance(text, str) else text
+    parts, rest = [], ''
+    for chunk in chain(chunks, (None,)):
+        eof = chunk is None
+        rest += chunk or ''
+        pos = 0
+        for m in _STATEMENT_RE.finditer(rest):
+            if not eof and (m.end() == len(rest) or m.group() in ("'", '[')):
+                # a token that may go on in the next chunk is matched again with it
+                break
+            pos = m.end()
+            if m.group() == ';':
+                yield ''.join(parts).strip()
+                parts = []
+            else:
+                parts.append(m.group())
+        rest = rest[pos:]
+    rest = ''.join(parts).strip()
+    if rest:
+        yield rest
+
+
+def newick_trees(text):
+    """Yields (None, newick) for each tree of a Newick file, given as for split_statements"""
+    for statement in split_statements(text):
+        statement = _LEADING_COMMENTS_RE.sub('', statement)
+        if statement:
+            yield None, statement + ';'
+
+
+def nexus_trees(text):
+    """Yields (name, newick) for each TREE command in the TREES blocks of a Nexus file
+
+    The file is given as for split_statements.
+    """
+    in_trees, translate = False, {}
+    for i, statement in enumerate(split_statements(text)):
+        if not i and statement[:6].upper() == '#NEXUS':
+            statement = statement[6:]
+        command = _COMMENT_RE.sub('', statement).strip()
+        keyword = command.split(None, 1)[0].lower() if command else ''
+        if keyword == 'begin':
+            in_trees = command.split()[1].lower() == 'trees' if len(command.split()) > 1 else False
+            translate = {}
+        elif keyword in ('end', 'endblock'):
+            in_trees = False
+        elif not in_trees:
+            continue
+        elif keyword == 'translate':
+            for pair in command[len(keyword):].split(','):
+                words = _WORD_RE.findall(pair)
+                if len(words) == 2:
+                    translate[unquote(words[0])] = unquote(words[1])
+        elif keyword in ('tree', 'utree'):
+            name, _, newick = statement.partition('=')
+            name = _COMMENT_RE.sub('', name).split(None, 1)
+            name = unquote(name[1].strip()) if len(name) > 1 else None
+            # comments such as [&R] before the tree are dropped, those inside it kept
+            newick = _LEADING_COMMENTS_RE.sub('', newick) + ';'
+            if translate:
+                # the table names taxa, so internal labels such as support values are kept
+                newick = ''.join(relabel(newick, translate, leaves_only=True))
+            yield name, newick
+
+
+def tree_data(newick):
+    """Validates a Newick string and returns the data of a KBaseTrees.Tree for it
+
+    Leaf labels become the node ids of leaf_list and default_node_labels.
+    Raises NewickSyntaxError for an invalid tree, unlabeled leaves or duplicate
+    leaf labels.
+    """
+    leaves, seen = [], set()
+    for event, label, _, pos in iter_events(newick):
+        if event != LEAF:
+            continue
+        if not label:
+            raise NewickSyntaxError("Leaf without a label", newick, pos)
+        if label in seen:
+            raise NewickSyntaxError("Duplicate leaf name {!r}".format(label), newick, pos)
+        seen.add(label)
+        leaves.append(label)
+    return {'tree': newick, 'leaf_list': leaves,
+            'default_node_labels': {leaf: leaf for leaf in leaves}}
+
+
+def read_tree_file(path):
+    """Pool worker: reads the trees of a Newick or Nexus file, which may be gzip compressed
+
+    The file is read in chunks and each tree is validated as soon as its statement
+    is complete. Returns a list of (tree name, data, error message), the name being
+    None for Newick trees, or a single entry with the error when the file cannot be
+    read.
+    """
+    results = []
+    try:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            chunks = iter(lambda: f.read(_READ_SIZE), '')
+            first = ''
+            for chunk in chunks:
+                first += chunk
+                if len(first.lstrip()) >= 6:
+                    break
+            is_nexus = first.lstrip()[:6].upper() == '#NEXUS'
+            chunks = chain((first,), chunks)
+            for name, newick in (nexus_trees(chunks) if is_nexus else newick_trees(chunks)):
+                try:
+                    results.append((name, tree_data(newick), None))
+                except NewickSyntaxError as e:
+                    results.append((name, None, str(e)))
+    except (OSError, UnicodeDecodeError) as e:
+        return [(None, None, "Could not read {}: {}".format(os.path.basename(path), e))]
+    if not results:
+        return [(None, None, "No trees found in {}".format(os.path.basename(path)))]
+    return results
+
+
+def read_tree_files(file_paths, workers=1, pool=None):
+    """Yields the read_tree_file results of each file in order, parsing on a process pool
+
+    Results are yielded as they arrive so their trees can be saved while later
+    files are parsed. At most four files per worker are queued on pool at a time,
+    so a caller that stops early leaves little work behind on a shared pool.
+    Without a pool the files are read in this process.
+    """
+    if pool is None or workers < 2 or len(file_paths) < 2:
+        for results in map(read_tree_file, file_paths):
+            yield results
+        return
+    paths = iter(file_paths)
+    pending = deque(pool.apply_async(read_tree_file, (path,))
+                    for path in islice(paths, workers * 4))
+    while pending:
+        results = pending.popleft().get()
+        for path in islice(paths, 1):
+            pending.append(pool.apply_async(read_tree_file, (path,)))
+        yield results
@@ -0,0 +1,218 @@
+"""Streaming writers for exporting trees in Nexus, PhyloXML, NeXML and JSON.
+
+Each writer is a generator of text pieces over an ArrayTree, so a tree is
+written out as it is serialized and memory stays flat apart from the parsed
+tree itself. Nodes are annotated from the node maps of the tree object:
+default_node_labels gives a node its display name, and ws_refs and kb_refs
+its references, where the format has a place for them.
+"""
+import json
+import re
+from collections import Counter
+from xml.sax.saxutils import escape, quoteattr
+
+from .ArrayTree import ArrayTree
+
+# walk events yielded by iter_walk
+OPEN, CLOSE = 0, 1
+# reference maps of a tree object, keyed by node id and then reference type
+REF_FIELDS = ('ws_refs', 'kb_refs')
+
+_BLOCK = 65536
+_NEXUS_NEEDS_QUOTES = re.compile(r"[\s()\[\]{}/\\,;:=*'\"`+<>-]")
+
+
+def iter_walk(tree):
+    """Yields the events of a depth first walk of a tree, in preorder node order
+
+    (OPEN, node, label, length, is_leaf) starts a node, label being None and
+    length NaN when it has none, and (CLOSE, node, None, None, is_leaf) ends it
+    after its subtree.
+    """
+    parent, labels = tree.parent, tree.labels
+    stack = []
+    for start in range(0, len(parent), _BLOCK):
+        block = slice(start, start + _BLOCK)
+        nodes = zip(parent[block].tolist(), tree.first_child[block].tolist(),
+                    tree.label[block].tolist(), tree.length[block].tolist())
+        for node, (up, first, label, length) in enumerate(nodes, start):
+            while stack and stack[-1][0] != up:
+                closed, leaf = stack.pop()
+                yield CLOSE, closed, None, None, leaf
+            leaf = first == -1
+            yield OPEN, node, labels[label] if label >= 0 else None, length, leaf
+            stack.append((node, leaf))
+    while stack:
+        closed, leaf = stack.pop()
+        yield CLOSE, closed, None, None, leaf
+
+
+def iter_references(node_maps, node_id):
+    """Yields (field, ref_type, ref) for the ws_refs and kb_refs of a node"""
+    for field in REF_FIELDS:
+        refs = (node_maps.get(field) or {}).get(node_id) or {}
+        for ref_type, values in refs.items():
+            for value in values:
+                yield field, ref_type, value
+
+
+def iter_phyloxml(tree, node_maps, name=None):
+    """Yields a tree as a PhyloXML document of nested clade elements"""
+    names = node_maps.get('default_node_labels') or {}
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<phyloxml xmlns="http://www.phyloxml.org">\n<phylogeny rooted="true">\n')
+    if name:
+        yield '<name>{}</name>\n'.format(escape(name))
+    for event, node, label, length, leaf in iter_walk(tree):
+        if event == CLOSE:
+            yield '</clade>\n'
+            continue
+        parts = ['<clade>']
+        display = names.get(label, label) if label is not None else None
+        if display is not None:
+            parts.append('<name>{}</name>'.format(escape(display)))
+        if length == length:
+            parts.append('<branch_length>{!r}</branch_length>'.format(length))
+        if label is not None:
+            parts.append('<node_id>{}</node_id>'.format(escape(label)))
+            for field, ref_type, ref in iter_references(node_maps, label):
+                parts.append('<property ref={} datatype="xsd:string" applies_to="clade">{}'
+                             '</property>'.format(quoteattr(field + ':' + ref_type), escape(ref)))
+        parts.append('\n')
+        yield ''.join(parts)
+    yield '</phylogeny>\n</phyloxml>\n'
+
+
+def iter_nexml(tree, node_maps, name=None):
+    """Yields a tree as a NeXML document, with an otu per leaf and flat node and edge lists"""
+    names = node_maps.get('default_node_labels') or {}
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<nex:nexml version="0.9" xmlns="http://www.nexml.org/2009" '
+           'xmlns:nex="http://www.nexml.org/2009" xmlns:kb="https://kbase.us/terms#" '
+           'xmlns:xsd="http://www.w3.org/2001/XMLSchema#" '
+           'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n<otus id="otus">\n')
+    for event, node, label, _, leaf in iter_walk(tree):
+        if event == OPEN and leaf:
+            display = names.get(label, label) if label is not None else None
+            yield '<otu id="t{}"{}/>\n'.format(
+                node, ' label=' + quoteattr(display) if display is not None else '')
+    yield ('</otus>\n<trees id="trees" otus="otus">\n'
+           '<tree id="tree" xsi:type="nex:FloatTree"{}>\n').format(
+        ' label=' + quoteattr(name) if name else '')
+
+    for event, node, label, _, leaf in iter_walk(tree):
+        if event == CLOSE:
+            continue
+        attrs = ' label=' + quoteattr(label) if label is not None else ''
+        if leaf:
+            attrs += ' otu="t{}"'.format(node)
+        if node == 0:
+            attrs += ' root="true"'
+        meta = ''.join(
+            '<meta xsi:type="nex:LiteralMeta" property={} content={} datatype="xsd:string"/>'
+            .format(quoteattr('kb:' + field + '_' + ref_type), quoteattr(ref))
+            for field, ref_type, ref in iter_references(node_maps, label)) \
+            if label is not None else ''
+        if meta:
+            yield '<node id="n{}"{}>{}</node>\n'.format(node, attrs, meta)
+        else:
+            yield '<node id="n{}"{}/>\n'.format(node, attrs)
+
+    parent = tree.parent
+    for start in range(0, len(parent), _BLOCK):
+        block = slice(start, start + _BLOCK)
+        edges = zip(parent[block].tolist(), tree.length[block].tolist())
+        for node, (up, length) in enumerate(edges, start):
+            if up == -1:
+                continue
+            yield '<edge id="e{}" source="n{}" target="n{}"{}/>\n'.format(
+                node, up, node, ' length="{!r}"'.format(length) if length == length else '')
+    yield '</tree>\n</trees>\n</nex:nexml>\n'
+
+
+def nexus_quote(label):
+    """Returns label as a Nexus word, quoting it if it contains Nexus punctuation"""
+    if not label or _NEXUS_NEEDS_QUOTES.search(label):
+        return "'{}'".format(label.replace("'", "''"))
+    return label
+
+
+def iter_nexus(tree, node_maps, name=None):
+    """Yields a tree as a Nexus file with a TAXA block and a translated TREES block
+
+    Taxa are named by their default_node_labels entry unless two leaves would
+    share a name, in which case those leaves keep their node ids. References have
+    no place in Nexus and are left out.
+    """
+    names = node_maps.get('default_node_labels') or {}
+    leaves = tree.leaves()
+    leaf_labels = tree.label[leaves].tolist()
+
+    def leaf_ids():
+        return (tree.labels[label] if label >= 0 else None for label in leaf_labels)
+
+    counts = Counter(names.get(node_id, node_id) for node_id in leaf_ids())
+
+    def taxa():
+        for node_id in leaf_ids():
+            display = names.get(node_id, node_id)
+            yield nexus_quote((display if counts[display] == 1 else node_id) or '')
+
+    yield '#NEXUS\n\nBEGIN TAXA;\n\tDIMENSIONS NTAX={};\n\tTAXLABELS\n'.format(len(leaves))
+    for taxon in taxa():
+        yield '\t\t{}\n'.format(taxon)
+    yield '\t;\nEND;\n\nBEGIN TREES;\n\tTRANSLATE\n'
+    for number, taxon in enumerate(taxa(), 1):
+        yield '\t\t{} {}{}\n'.format(number, taxon, ',' if number < len(leaves) else '')
+    yield '\t;\n\tTREE {} = [&R] '.format(nexus_quote(name or 'tree'))
+
+    # the leaves are written by their TRANSLATE numbers
+    labels = list(tree.labels) + [str(number) for number in range(1, len(leaves) + 1)]
+    label = tree.label.copy()
+    label[leaves] = range(len(tree.labels), len(labels))
+    numbered = ArrayTree(tree.parent, tree.first_child, tree.next_sibling, tree.length,
+                         label, labels)
+    for piece in numbered.iter_newick():
+        yield piece
+    yield '\nEND;\n'
+
+
+def iter_json(tree, node_maps, name=None):
+    """Yields a tree as a JSON object whose nested root node lists its children
+
+    Each node has its id and, when it has them, its label, branch length and
+    ws_refs and kb_refs.
+    """
+    names = node_maps.get('default_node_labels') or {}
+    yield '{{"name": {}, "root": '.format(json.dumps(name))
+    sibling = False
+    for event, node, label, length, leaf in iter_walk(tree):
+        if event == CLOSE:
+            if not leaf:
+                yield ']}'
+            sibling = True
+            continue
+        fields = {'id': label}
+        if label is not None and label in names:
+            fields['label'] = names[label]
+        if length == length:
+            fields['length'] = length
+        for field in REF_FIELDS:
+            refs = (node_maps.get(field) or {}).get(label) if label is not None else None
+            if refs:
+                fields[field] = refs
+        text = json.dumps(fields)
+        if not leaf:
+            text = text[:-1] + ', "children": ['
+        yield (',' if sibling else '') + text
+        sibling = False
+    yield '}\n'
+
+
+# writer and file suffix of each export format
+WRITERS = {
+    'nexus': (iter_nexus, '.nex'),
+    'phyloxml': (iter_phyloxml, '.phyloxml.xml'),
+    'nexml': (iter_nexml, '.nexml.xml'),
+    'json': (iter_json, '.json'),
+}
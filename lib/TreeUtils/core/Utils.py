@@ -1,18 +1,109 @@
+import gzip
+import hashlib
+import json
 import logging
 import os
+import re
 import shutil
+import tarfile
+import threading
 import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
 
-import ete3
-from ete3.parser.newick import NewickError
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from DataFileUtil.DataFileUtilClient import DataFileUtil
+from Workspace.WorkspaceClient import Workspace
+from .ArrayTree import ArrayTree
+from .ClientSession import pool_connections
+from .DiskCache import DiskCache
+from .LCAIndex import LCAIndex
+from .Newick import LEAF, NewickSyntaxError, check_newick, iter_events, relabel
+from .Splits import all_pairs, compare_trees, consensus_tree, count_splits, tree_splits
+from .TreeCache import LRUCache, is_versioned_ref
+from .TreeReaders import TREE_EXTENSIONS, read_tree_files
+from .TreeWriters import WRITERS
+
+# file name suffixes for the supported output compression types
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+# fields of a tree copied to its pruned version, and those of them keyed by node id
+PRUNED_TREE_FIELDS = ['name', 'description', 'type', 'tree_attributes',
+                      'default_node_labels', 'ws_refs', 'kb_refs']
+NODE_MAP_FIELDS = ('default_node_labels', 'ws_refs', 'kb_refs')
+# file name suffixes of tar archives accepted by import_tree_files
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+
+_OBJECT_NAME_RE = re.compile(r"[^A-Za-z0-9|._-]")
+
+
+def _newick_error(newick):
+    """Pool worker: returns the syntax error in a newick string or None if it is valid"""
+    try:
+        check_newick(newick)
+    except NewickSyntaxError as e:
+        return str(e)
+    return None
+
+
+def _newick_errors(newicks):
+    """Pool worker: returns the _newick_error of each of a chunk of newick strings"""
+    return [_newick_error(newick) for newick in newicks]
+
+
+def tree_object_name(path):
+    """Derives a workspace object name from the name of a tree file"""
+    name = os.path.basename(path)
+    stripped = True
+    while stripped:
+        stripped = False
+        for extension in TREE_EXTENSIONS:
+            if name.lower().endswith(extension) and len(name) > len(extension):
+                name, stripped = name[:-len(extension)], True
+    name = _OBJECT_NAME_RE.sub('_', name)
+    return 'tree_' + name if name.isdigit() else name
+
+
+def iter_chunks(text, size):
+    """Yields consecutive slices of text no longer than size"""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
 
 class Utils:
     def __init__(self, config):
         self.cfg = config
         self.scratch = config['scratch']
-        self.dfu = DataFileUtil(os.environ['SDK_CALLBACK_URL'])
+        pool_size = int(config.get('client-pool-size', 10))
+        self.dfu = pool_connections(DataFileUtil(os.environ['SDK_CALLBACK_URL']), pool_size)
+        self.ws = pool_connections(Workspace(config['workspace-url']), pool_size)
+        self.object_cache = LRUCache(int(config.get('tree-cache-max-bytes', 0)))
+        self.parsed_cache = LRUCache(int(config.get('parsed-tree-cache-max-bytes', 0)))
+        self.distance_block_size = int(config.get('distance-block-size', 2 ** 22))
+        self.max_inline_distance_leaves = int(config.get('max-inline-distance-leaves', 2000))
+        self.disk_cache = DiskCache(os.path.join(self.scratch, 'tree_cache'),
+                                    int(config.get('disk-cache-max-bytes', 0)))
+        self.validation_workers = int(config.get('validation-workers', 1))
+        # process pools by name, shared by every call and started on first use
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self.comparison_workers = int(config.get('comparison-workers', 1))
+        self.import_workers = int(config.get('import-workers', 1))
+        self.write_chunk_size = int(config.get('write-chunk-size', 2 ** 20))
+        self.write_workers = int(config.get('write-workers', 4))
+        self.fetch_batch_size = int(config.get('fetch-batch-size', 100))
+        self.save_batch_max_bytes = int(config.get('save-batch-max-bytes', 50 * 2 ** 20))
+        self.save_batch_max_objects = int(config.get('save-batch-max-objects', 1000))
+        self.save_batch_concurrency = int(config.get('save-batch-concurrency', 2))
 
     @staticmethod
     def validate_params(params, expected, opt_param=set()):
@@ -30,30 +121,759 @@ class Utils:
 
     @staticmethod
     def validate_newick(newick):
-        """Validates a Newick string by attempting to make a tree with ete3"""
+        """Validates a Newick string with a single pass of the Newick tokenizer"""
         try:
-            ete3.Tree(newick)
-        except NewickError:
+            check_newick(newick)
+        except NewickSyntaxError:
             return False
         return True
 
-    def to_newick(self, params):
-        """Convert an Tree to a Newick File"""
-        files = {}
+    def process_pool(self, name, workers):
+        """Returns the named process pool shared by every call, starting it on first use
+
+        Workers are started by a fork server rather than forked from the threaded
+        server process, whose other threads may hold locks the children would inherit.
+        """
+        with self._pools_lock:
+            if name not in self._pools:
+                self._pools[name] = get_context('forkserver').Pool(workers)
+            return self._pools[name]
+
+    def validation_pool(self):
+        """Returns the process pool shared by every validate_trees call"""
+        return self.process_pool('validation', self.validation_workers)
+
+    def validate_trees(self, newicks, start=0):
+        """Validates a list of Newick strings, spreading the work over a process pool.
+
+        Raises a ValueError for the lowest index invalid tree, numbering the trees
+        from start. Chunks of trees are consumed in order and only one per worker
+        is queued on the shared pool at a time, so the first invalid tree is
+        reported as soon as it is seen and no more chunks are queued after it.
+        """
+        if self.validation_workers < 2 or len(newicks) < 2:
+            errors = map(_newick_error, newicks)
+            self._raise_first_error(errors, start)
+            return
+        chunksize = max(1, len(newicks) // (self.validation_workers * 4))
+        chunks = (newicks[i:i + chunksize] for i in range(0, len(newicks), chunksize))
+        pool = self.validation_pool()
+        pending = deque(pool.apply_async(_newick_errors, (chunk,))
+                        for chunk in islice(chunks, self.validation_workers))
+        while pending:
+            errors = pending.popleft().get()
+            self._raise_first_error(errors, start)
+            start += len(errors)
+            for chunk in islice(chunks, 1):
+                pending.append(pool.apply_async(_newick_errors, (chunk,)))
+
+    def check_tree_object(self, i, obj):
+        """Checks the structure of the i-th object passed to save_trees and sets its type"""
+        self.validate_params(obj, ("data",), ("name", "hidden", "meta", "type"))
+        if 'type' in obj and obj['type'] != 'KBaseTrees.Tree':
+            raise ValueError("This method only saves KBaseTrees.Tree objects")
+        if "tree" not in obj['data']:
+            raise ValueError("Object {} missing 'tree' attribute containing newick tree"
+                             .format(i))
+        obj['type'] = 'KBaseTrees.Tree'
+        return obj
+
+    def save_trees(self, ws_id, objects):
+        """Checks, validates and saves a list of tree objects as save_trees does
+
+        The error raised is that of the lowest index object with a problem, as if each
+        object were checked and then validated in turn: the newicks of the objects
+        before the first malformed one are validated before its error is raised.
+        """
+        checked, check_error = [], None
+        for i, obj in enumerate(objects):
+            try:
+                checked.append(self.check_tree_object(i, obj))
+            except ValueError as e:
+                check_error = e
+                break
+        self.validate_trees([obj['data']['tree'] for obj in checked])
+        if check_error is not None:
+            raise check_error
+        return self.save_objects(ws_id, checked)
+
+    def validate_tree_stream(self, objects):
+        """Checks and validates tree objects from an iterable without keeping them all
+
+        Newicks are validated on the validation pool in groups bounded like save
+        batches. Raises the error of the lowest index object with a problem, as
+        save_trees does.
+        """
+        group, group_bytes, start = [], 0, 0
+        for i, obj in enumerate(objects):
+            try:
+                newick = self.check_tree_object(i, obj)['data']['tree']
+            except ValueError:
+                self.validate_trees(group, start)
+                raise
+            if group and (group_bytes + len(newick) > self.save_batch_max_bytes or
+                          len(group) >= self.save_batch_max_objects):
+                self.validate_trees(group, start)
+                group, group_bytes, start = [], 0, i
+            group.append(newick)
+            group_bytes += len(newick)
+        self.validate_trees(group, start)
+
+    @staticmethod
+    def _raise_first_error(errors, start=0):
+        for i, error in enumerate(errors, start):
+            if error:
+                raise ValueError("Object {} has an invalid newick tree: {}".format(i, error))
 
-        res = self.dfu.get_objects({
-            'object_refs': [params['input_ref']]
-        })['data'][0]
-        name = res['info'][1]
-        if "KBaseTrees.Tree" not in res['info'][2]:
+    def get_objects(self, refs, included_fields=None, user_id=None):
+        """Fetches objects with get_objects2, serving fully versioned refs from the object cache
+
+        Versioned objects never change, so they are cached per user and per
+        included_fields projection. Results are shared with the cache and must not be
+        modified by the caller.
+        """
+        projection = tuple(sorted(included_fields)) if included_fields else None
+        results = [None] * len(refs)
+        keys, missing = {}, []
+        for i, ref in enumerate(refs):
+            if is_versioned_ref(ref):
+                keys[i] = (user_id, ref, projection)
+                results[i] = self.object_cache.get(keys[i])
+                if results[i] is None:
+                    results[i] = self._disk_get_object(keys[i])
+            if results[i] is None:
+                missing.append(i)
+        if not missing:
+            return results
+
+        ws_objs = [{'ref': refs[i], 'included': included_fields} for i in missing]
+        fetched = self.ws.get_objects2({'objects': ws_objs})['data']
+        for i, obj in zip(missing, fetched):
+            results[i] = obj
+            if i in keys:
+                data = json.dumps(obj).encode('utf-8')
+                self.object_cache.put(keys[i], obj, len(data))
+                self.disk_cache.put("objects2|" + json.dumps(keys[i]), data)
+        return results
+
+    def _disk_get_object(self, key):
+        """Loads an object from the disk cache into the memory cache"""
+        data = self.disk_cache.get("objects2|" + json.dumps(key))
+        if data is None:
+            return None
+        obj = json.loads(data)
+        self.object_cache.put(key, obj, len(data))
+        return obj
+
+    def batch_objects(self, objects):
+        """Splits objects into (start index, batch) chunks bounded by serialized size and count
+
+        A single object larger than the byte limit is sent on its own.
+        """
+        batch, batch_bytes, start = [], 0, 0
+        for i, obj in enumerate(objects):
+            size = len(json.dumps(obj))
+            if batch and (batch_bytes + size > self.save_batch_max_bytes or
+                          len(batch) >= self.save_batch_max_objects):
+                yield start, batch
+                batch, batch_bytes, start = [], 0, i
+            batch.append(obj)
+            batch_bytes += size
+        if batch:
+            yield start, batch
+
+    def save_objects(self, ws_id, objects):
+        """Saves objects with DataFileUtil in size bounded batches
+
+        Batches are uploaded with bounded concurrency and the object_info list is returned
+        in input order. If any batch fails a ValueError describes every failed batch along
+        with the batches that were saved, as those cannot be rolled back.
+        """
+        batches = list(self.batch_objects(objects))
+        if len(batches) == 1:
+            return self.dfu.save_objects({"id": ws_id, "objects": objects})
+
+        def save(batch):
+            return self.dfu.save_objects({"id": ws_id, "objects": batch})
+
+        logging.info("Saving {} objects in {} batches".format(len(objects), len(batches)))
+        with ThreadPoolExecutor(self.save_batch_concurrency) as executor:
+            futures = [executor.submit(save, batch) for _, batch in batches]
+        results, failed, saved = [], [], []
+        for (start, batch), future in zip(batches, futures):
+            span = "objects {}-{}".format(start, start + len(batch) - 1)
+            try:
+                infos = future.result()
+            except Exception as e:
+                failed.append("{}: {}".format(span, e))
+                continue
+            results.extend(infos)
+            saved.append(span)
+        if failed:
+            raise ValueError("Failed to save {} of {} batches. {}. Saved: {}".format(
+                len(failed), len(batches), "; ".join(failed), ", ".join(saved) or "none"))
+        return results
+
+    def save_objects_stream(self, ws_id, objects, validate=True):
+        """Validates and saves tree objects from an iterable as it is consumed
+
+        Each tree is validated as it arrives and batches are saved while the next one
+        is filled, so no more than save-batch-concurrency batches and the one being
+        filled are held in memory. Unlike save_objects, batches saved before an invalid
+        tree or a failed batch cannot be rolled back and are listed in the ValueError.
+        Trees that were already validated, as by validate_tree_stream, are passed with
+        validate=False so that only a failed save can leave earlier batches saved.
+        """
+        def save(batch):
+            return self.dfu.save_objects({"id": ws_id, "objects": batch})
+
+        def validated():
+            for i, obj in enumerate(objects):
+                if validate:
+                    self._raise_first_error([_newick_error(obj['data']['tree'])], i)
+                yield obj
+
+        results, saved, pending = [], [], deque()
+
+        def collect():
+            start, count, future = pending.popleft()
+            span = "objects {}-{}".format(start, start + count - 1)
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                raise ValueError("Failed to save {}: {}".format(span, e))
+            saved.append(span)
+
+        with ThreadPoolExecutor(self.save_batch_concurrency) as executor:
+            try:
+                for start, batch in self.batch_objects(validated()):
+                    if len(pending) >= self.save_batch_concurrency:
+                        collect()
+                    pending.append((start, len(batch), executor.submit(save, batch)))
+                while pending:
+                    collect()
+            except Exception as e:
+                # wait for the batches in flight to learn which of them were saved
+                while pending:
+                    try:
+                        collect()
+                    except ValueError:
+                        pass
+                raise ValueError("{}. Saved: {}".format(e, ", ".join(saved) or "none"))
+        return results
+
+    def get_parsed_tree(self, ref, user_id=None):
+        """Returns a tree as an ArrayTree, caching it in parsed_cache when ref is versioned"""
+        key = (user_id, ref, 'tree')
+        tree = self.parsed_cache.get(key) if is_versioned_ref(ref) else None
+        if tree is not None:
+            return tree
+        res = self.ws.get_objects2({'objects': [{'ref': ref, 'included': ['tree']}]})['data']
+        if "KBaseTrees.Tree" not in res[0]['info'][2]:
             raise ValueError("Supplied reference is not a Tree")
+        tree = ArrayTree.from_newick(res.pop()['data'].get('tree', ''))
+        if is_versioned_ref(ref):
+            self.parsed_cache.put(key, tree, tree.nbytes)
+        return tree
+
+    def get_lca_index(self, ref, user_id=None):
+        """Returns the LCAIndex of a tree, caching it in parsed_cache when ref is versioned"""
+        key = (user_id, ref, 'lca')
+        index = self.parsed_cache.get(key) if is_versioned_ref(ref) else None
+        if index is not None:
+            return index
+        index = LCAIndex(self.get_parsed_tree(ref, user_id))
+        # build the leaf label mapping now so it is counted in the cached size
+        index.tree.leaf_nodes([])
+        if is_versioned_ref(ref):
+            self.parsed_cache.put(key, index, index.nbytes)
+        return index
+
+    def lowest_common_ancestors(self, ref, leaf_pairs, user_id=None):
+        """Finds the lowest common ancestor of each pair of leaf ids in a tree"""
+        if any(len(pair) != 2 for pair in leaf_pairs):
+            raise ValueError("leaf_pairs must be a list of pairs of leaf ids")
+        index = self.get_lca_index(ref, user_id)
+        leaves = index.tree.leaf_nodes([leaf for pair in leaf_pairs for leaf in pair])
+        nodes = index.query(leaves[0::2], leaves[1::2]).tolist()
+        return [{'node': node, 'label': index.tree.label_of(node),
+                 'leaf_count': int(index.leaf_count[node])} for node in nodes]
+
+    def patristic_distances(self, ref, leaf_ids=None, destination_dir=None, user_id=None):
+        """Computes the matrix of branch length distances between the leaves of a tree
+
+        Distances come from root distances and the tree's LCA index, a block of rows
+        of about distance-block-size entries at a time. With destination_dir each
+        block is written to a memory mapped .npy file as it is computed and the path
+        is returned instead of the matrix. Returns (leaf_ids, matrix, file_path).
+        """
+        index = self.get_lca_index(ref, user_id)
+        tree = index.tree
+        if leaf_ids:
+            leaves = tree.leaf_nodes(leaf_ids)
+        else:
+            leaves = tree.leaves()
+            leaf_ids = [tree.label_of(node) for node in leaves.tolist()]
+        n = len(leaves)
+        file_path = None
+        if destination_dir:
+            # a unique name so that concurrent calls for one tree never share a file
+            file_path = os.path.join(destination_dir, "{}_distances_{}.npy".format(
+                ref.replace('/', '_').replace(';', '_'), uuid.uuid4()))
+            matrix = np.lib.format.open_memmap(file_path, mode='w+', dtype=np.float64,
+                                               shape=(n, n))
+        elif n > self.max_inline_distance_leaves:
+            raise ValueError("A matrix for {} leaves is too large to return, write it "
+                             "to a file instead".format(n))
+        else:
+            matrix = np.empty((n, n))
+        rows = max(1, self.distance_block_size // max(n, 1))
+        for start in range(0, n, rows):
+            block = leaves[start:start + rows]
+            matrix[start:start + len(block)] = index.distances(
+                np.repeat(block, n), np.tile(leaves, len(block))).reshape(len(block), n)
+        if file_path:
+            matrix.flush()
+            del matrix
+            return leaf_ids, None, file_path
+        return leaf_ids, matrix, None
+
+    def prune_tree(self, ref, leaf_ids, user_id=None):
+        """Prunes a tree to a subset of its leaves, returning the pruned ArrayTree
+
+        The parsed tree comes from parsed_cache, so pruning the same version of a tree
+        again does not fetch or parse it.
+        """
+        if len(set(leaf_ids)) < 2:
+            raise ValueError("leaf_ids must list at least two distinct leaves")
+        tree = self.get_parsed_tree(ref, user_id)
+        return tree.prune(tree.leaf_nodes(leaf_ids))
+
+    def derived_tree_object(self, ref, tree, leaf_ids, fields=PRUNED_TREE_FIELDS, user_id=None):
+        """Builds the data of a tree derived from ref, copying fields of ref's object
+
+        Node maps are copied only for the nodes of the new tree.
+        """
+        obj = self.get_objects([ref], list(fields), user_id)[0]
+        if "KBaseTrees.Tree" not in obj['info'][2]:
+            raise ValueError("Supplied reference is not a Tree")
+        node_ids = set(tree.labels)
+        data = {'tree': tree.to_newick(), 'leaf_list': list(dict.fromkeys(leaf_ids))}
+        for field, value in obj['data'].items():
+            if field in NODE_MAP_FIELDS:
+                value = {node: item for node, item in value.items() if node in node_ids}
+            data[field] = value
+        return data
+
+    def iter_parsed_trees(self, refs, user_id=None):
+        """Yields the ArrayTree of each ref, fetching fetch-batch-size trees per workspace call
 
-        files['file_path'] = os.path.join(params['destination_dir'], name + ".newick")
-        with open(files['file_path'], 'w') as out_file:
-            out_file.write(res['data']['tree'])
+        Trees are not added to parsed_cache and each Newick string is released once it
+        is parsed, so at most one group of trees is held in memory.
+        """
+        for start in range(0, len(refs), self.fetch_batch_size):
+            group = refs[start:start + self.fetch_batch_size]
+            res = self.ws.get_objects2({
+                'objects': [{'ref': ref, 'included': ['tree']} for ref in group]})['data']
+            res.reverse()
+            while res:
+                obj = res.pop()
+                if "KBaseTrees.Tree" not in obj['info'][2]:
+                    raise ValueError("Supplied reference is not a Tree")
+                yield ArrayTree.from_newick(obj['data'].get('tree', ''))
+
+    def consensus_tree_object(self, refs, strict=False, user_id=None):
+        """Builds the data of the majority rule or strict consensus of trees with the same leaves
+
+        Splits are counted as the trees are streamed in, so memory is bounded by the
+        number of distinct splits. Node maps are copied from the first tree.
+        """
+        if len(refs) < 2:
+            raise ValueError("At least two trees are needed for a consensus")
+        leaf_index = {}
+        mask, count, counts = count_splits(self.iter_parsed_trees(refs, user_id), leaf_index)
+        tree = consensus_tree(mask, count, counts, leaf_index, strict)
+        leaf_ids = [tree.label_of(node) for node in tree.leaves().tolist()]
+        data = self.derived_tree_object(refs[0], tree, leaf_ids, NODE_MAP_FIELDS, user_id)
+        data['description'] = "{} consensus of {} trees".format(
+            "Strict" if strict else "Majority rule", count)
+        return data
+
+    def compare_trees(self, refs, reference_ref=None, user_id=None):
+        """Robinson-Foulds comparison of every pair of trees, or of each tree with reference_ref
+
+        The splits of all trees are encoded over one leaf index, and pairs of trees
+        with different leaves are compared on the leaves they share. Comparisons are
+        spread over comparison-workers processes.
+        """
+        refs = list(dict.fromkeys(([reference_ref] if reference_ref else []) + list(refs)))
+        if len(refs) < 2:
+            raise ValueError("At least two distinct trees are needed for a comparison")
+        leaf_index = {}
+        splits = [tree_splits(self.get_parsed_tree(ref, user_id), leaf_index) for ref in refs]
+        pairs = all_pairs(len(refs), 0 if reference_ref else None)
+        pool = None
+        if self.comparison_workers > 1 and len(pairs) > 1:
+            pool = self.process_pool('comparison', self.comparison_workers)
+        results = compare_trees(splits, pairs, self.comparison_workers, pool, self.scratch)
+        return [{'tree_ref_1': refs[i], 'tree_ref_2': refs[j], 'common_leaves': common,
+                 'shared_splits': shared, 'rf_distance': distance, 'normalized_rf': normalized}
+                for (i, j), (common, shared, distance, normalized) in zip(pairs, results)]
+
+    def tree_files(self, paths):
+        """Lists the files to import from paths in scratch as (file path, source) pairs
+
+        Directories are walked in sorted order, skipping hidden entries, and the
+        regular files of tar archives are extracted to a new scratch directory, their
+        source being "archive:member". Other paths are taken as tree files. Every path
+        and walked file must resolve, following symlinks, to a path in scratch.
+        """
+        scratch = os.path.realpath(self.scratch)
+
+        def check_in_scratch(path):
+            real_path = os.path.realpath(path)
+            if real_path != scratch and not real_path.startswith(scratch + os.sep):
+                raise ValueError("{} is not in the scratch directory".format(path))
+
+        files = []
+        for path in paths:
+            check_in_scratch(path)
+            if not os.path.exists(path):
+                raise ValueError("{} does not exist".format(path))
+            if not os.path.isdir(path):
+                files.extend(self._archive_files(path))
+                continue
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                for name in sorted(names):
+                    if not name.startswith('.'):
+                        file_path = os.path.join(root, name)
+                        check_in_scratch(file_path)
+                        files.extend(self._archive_files(file_path))
+        return files
+
+    def _archive_files(self, path):
+        """Returns [(path, path)] for a tree file or the extracted files of a tar archive"""
+        if not path.lower().endswith(TAR_SUFFIXES):
+            return [(path, path)]
+        extract_dir = os.path.join(self.scratch, "newick_files_" + str(uuid.uuid4()))
+        os.makedirs(extract_dir)
+        files = []
+        with tarfile.open(path) as archive:
+            for member in archive:
+                name = os.path.basename(member.name)
+                if not member.isfile() or not name or name.startswith('.'):
+                    continue
+                # members are written flat under a generated name, never to member.name
+                file_path = os.path.join(extract_dir, "{}_{}".format(len(files), name))
+                with archive.extractfile(member) as src, open(file_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                files.append((file_path, "{}:{}".format(path, member.name)))
+        return files
+
+    def import_tree_files(self, paths, ws_id):
+        """Imports the trees of Newick and Nexus files in scratch as KBaseTrees.Tree objects
+
+        Files are parsed and validated in a process pool and the trees saved with
+        save_objects_stream as they are read, each named after its file, and after its
+        name or position in the file when the file holds several trees. Returns the
+        object_info list and a mapping of the files or trees that could not be imported
+        to their error.
+        """
+        files = self.tree_files(paths)
+        if not files:
+            raise ValueError("No files to import were found")
+        errors, used_names = {}, set()
+
+        def objects():
+            pool = None
+            if self.import_workers > 1 and len(files) > 1:
+                pool = self.process_pool('import', self.import_workers)
+            results = read_tree_files([file_path for file_path, _ in files], self.import_workers,
+                                      pool)
+            for (_, source), trees in zip(files, results):
+                base = tree_object_name(source)
+                for i, (tree_name, data, error) in enumerate(trees, 1):
+                    if len(trees) == 1:
+                        key, name = source, base
+                    else:
+                        key = "{}#{}".format(source, tree_name or i)
+                        name = "{}_{}".format(base, _OBJECT_NAME_RE.sub('_', tree_name or str(i)))
+                    if error:
+                        errors[key] = error
+                        continue
+                    unique, n = name, 1
+                    while unique in used_names:
+                        n += 1
+                        unique = "{}_{}".format(name, n)
+                    used_names.add(unique)
+                    yield {'type': 'KBaseTrees.Tree', 'name': unique, 'data': data}
+
+        infos = self.save_objects_stream(ws_id, objects(), validate=False)
+        if not infos:
+            raise ValueError("None of the supplied files had a valid tree: {}".format(errors))
+        return infos, errors
+
+    def to_newick(self, params, user_id=None):
+        """Convert an Tree to a Newick File, optionally compressed with gzip or zstd"""
+        files = {}
+        ref = params['input_ref']
+        compression = params.get('compression')
+        suffix = ".newick" + self.compression_suffix(compression)
+        if params.get('relabel'):
+            return self._to_relabeled_newick(ref, params['relabel'], params['destination_dir'],
+                                             suffix, compression)
+
+        cached = self._disk_get_newick(ref, user_id)
+        src = None
+        if cached:
+            try:
+                src = open(cached[1], 'rb')
+            except FileNotFoundError:
+                # evicted by another worker since it was looked up, so fetch it instead
+                pass
+        if src:
+            name = cached[0]
+            files['file_path'] = os.path.join(params['destination_dir'], name + suffix)
+            with src, self.open_output(files['file_path'], compression) as out:
+                shutil.copyfileobj(src, out)
+            return name, files
+
+        # only the tree is requested so the rest of the object is never decoded
+        res = self.ws.get_objects2({'objects': [{'ref': ref, 'included': ['tree']}]})['data']
+        name = res[0]['info'][1]
+        files['file_path'] = os.path.join(params['destination_dir'], name + suffix)
+        self._write_newick(ref, res.pop(), files['file_path'], user_id, compression)
 
         return name, files
 
+    def _to_relabeled_newick(self, ref, field, destination_dir, suffix, compression):
+        """Writes a tree with its node labels replaced from one of its node maps
+
+        The labels are rewritten in a single pass of the tokenizer as the file is
+        written, and the result is not added to the disk cache. Leaves that would
+        share a label keep their node ids, as unique_leaf_labels describes.
+        """
+        if field not in NODE_MAP_FIELDS:
+            raise ValueError("relabel must be one of {}".format(", ".join(NODE_MAP_FIELDS)))
+        res = self.ws.get_objects2({'objects': [{'ref': ref, 'included': ['tree', field]}]})['data']
+        info, data = res[0]['info'], res.pop()['data']
+        if "KBaseTrees.Tree" not in info[2]:
+            raise ValueError("Supplied reference is not a Tree")
+        tree = data.pop('tree', '')
+        labels = self.unique_leaf_labels(tree, self.node_labels(data.get(field, {})))
+        file_path = os.path.join(destination_dir, info[1] + suffix)
+        pieces = (chunk for piece in relabel(tree, labels)
+                  for chunk in iter_chunks(piece, self.write_chunk_size))
+        self.write_text(pieces, file_path, compression)
+        return info[1], {'file_path': file_path}
+
+    def to_file(self, ref, file_format, destination_dir, compression=None, user_id=None):
+        """Writes a tree to a file in destination_dir in one of the TreeWriters formats
+
+        The tree comes from parsed_cache and its node maps from the object cache, and
+        the writer's output is streamed to the file. Returns the file path.
+        """
+        if file_format == 'newick':
+            params = {'input_ref': ref, 'destination_dir': destination_dir,
+                      'compression': compression}
+            return self.to_newick(params, user_id)[1]['file_path']
+        if file_format not in WRITERS:
+            raise ValueError("format must be one of newick, {}".format(", ".join(WRITERS)))
+        writer, suffix = WRITERS[file_format]
+        suffix += self.compression_suffix(compression)
+        tree = self.get_parsed_tree(ref, user_id)
+        obj = self.get_objects([ref], list(NODE_MAP_FIELDS), user_id)[0]
+        name = obj['info'][1]
+        file_path = os.path.join(destination_dir, name + suffix)
+        self.write_text(writer(tree, obj['data'], name), file_path, compression)
+        return file_path
+
+    @staticmethod
+    def node_labels(node_map):
+        """Maps node ids to new labels from default_node_labels, ws_refs or kb_refs
+
+        For the reference maps a node takes the first reference listed for it.
+        """
+        labels = {}
+        for node, value in node_map.items():
+            if isinstance(value, dict):
+                value = next((ref for refs in value.values() for ref in refs), None)
+            if value:
+                labels[node] = value
+        return labels
+
+    @staticmethod
+    def unique_leaf_labels(newick, labels):
+        """Drops the new labels of the leaves of a tree that would share a label
+
+        A tree with duplicate leaf names is invalid, so as in iter_nexus those leaves
+        keep their node ids. Returns the labels of the other nodes.
+        """
+        leaf_ids = [label for event, label, _, _ in iter_events(newick) if event == LEAF]
+        counts = Counter(labels.get(node_id, node_id) for node_id in leaf_ids)
+        shared = {node_id for node_id in leaf_ids if counts[labels.get(node_id, node_id)] > 1}
+        return {node: label for node, label in labels.items() if node not in shared}
+
+    @staticmethod
+    def compression_suffix(compression):
+        """Returns the file suffix for a compression type, checking that it is available"""
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError("compression must be one of 'gzip' or 'zstd'")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        return COMPRESSION_SUFFIXES[compression]
+
+    @staticmethod
+    def open_output(file_path, compression=None):
+        """Opens a binary file for writing that compresses everything written to it"""
+        if compression == 'gzip':
+            return gzip.open(file_path, 'wb', compresslevel=6)
+        if compression == 'zstd':
+            return zstandard.ZstdCompressor().stream_writer(open(file_path, 'wb'))
+        return open(file_path, 'wb')
+
+    def to_newick_files(self, refs, destination_dir, user_id=None):
+        """Writes many trees to newick files in destination_dir
+
+        Trees are fetched in groups of fetch-batch-size refs per get_objects2 call and
+        written by a pool of write-workers threads while the next group is fetched. A
+        group whose call fails is fetched again one ref at a time. Returns a mapping of
+        ref to file path and a mapping of ref to error message; a failure for one ref
+        does not stop the others.
+        """
+        file_paths, errors, used_names = {}, {}, set()
+
+        def file_path(ref, name):
+            # trees with the same object name in different workspaces must not clash
+            if name in used_names:
+                name = "{}_{}".format(name, ref.replace('/', '_'))
+            used_names.add(name)
+            return os.path.join(destination_dir, name + ".newick")
+
+        def fetch(group):
+            return self.ws.get_objects2({
+                'objects': [{'ref': ref, 'included': ['tree']} for ref in group],
+                'ignoreErrors': 1
+            })['data']
+
+        pending = []
+        for ref in dict.fromkeys(refs):
+            cached = self._disk_get_newick(ref, user_id)
+            if cached:
+                path = file_path(ref, cached[0])
+                try:
+                    shutil.copyfile(cached[1], path)
+                    file_paths[ref] = path
+                    continue
+                except FileNotFoundError:
+                    # evicted by another worker since it was looked up, so it is fetched
+                    used_names.discard(os.path.basename(path)[:-len(".newick")])
+                except OSError as e:
+                    errors[ref] = str(e)
+                    continue
+            pending.append(ref)
+
+        groups = [pending[i:i + self.fetch_batch_size]
+                  for i in range(0, len(pending), self.fetch_batch_size)]
+        with ThreadPoolExecutor(self.write_workers) as executor:
+            writing = {}
+            for group in groups:
+                try:
+                    res = fetch(group)
+                except Exception as e:
+                    if len(group) == 1:
+                        errors[group[0]] = str(e)
+                        continue
+                    # ignoreErrors does not cover every bad ref, a malformed one fails
+                    # the whole call, so each ref of the group is tried on its own
+                    res = []
+                    for ref in group:
+                        try:
+                            res.extend(fetch([ref]))
+                        except Exception as ref_error:
+                            errors[ref] = str(ref_error)
+                            res.append(None)
+                # only one group of trees waits in memory for the writers
+                self._collect_writes(writing, file_paths, errors)
+                for ref, obj in zip(group, res):
+                    if obj is None:
+                        errors.setdefault(ref, "Object {} could not be accessed".format(ref))
+                        continue
+                    path = file_path(ref, obj['info'][1])
+                    writing[ref] = (path, executor.submit(
+                        self._write_newick, ref, obj, path, user_id))
+                res = obj = None
+            self._collect_writes(writing, file_paths, errors)
+        return file_paths, errors
+
+    @staticmethod
+    def _collect_writes(writing, file_paths, errors):
+        """Waits for submitted writes, moving each ref into file_paths or errors"""
+        for ref, (path, future) in writing.items():
+            try:
+                future.result()
+                file_paths[ref] = path
+            except Exception as e:
+                errors[ref] = str(e)
+        writing.clear()
+
+    def _write_newick(self, ref, obj, file_path, user_id, compression=None):
+        """Writes the tree in a get_objects2 result to a file, caching it if ref is versioned
+
+        Only uncompressed files are added to the disk cache.
+        """
+        info = obj['info']
+        if "KBaseTrees.Tree" not in info[2]:
+            raise ValueError("Supplied reference is not a Tree")
+        tree = obj['data'].get('tree', '')
+        del obj
+        content = self.write_text(iter_chunks(tree, self.write_chunk_size), file_path,
+                                  compression)
+        if is_versioned_ref(ref) and not compression:
+            self._disk_put_newick(ref, user_id, info[1], file_path, content)
+
+    def write_text(self, pieces, file_path, compression=None):
+        """Streams text pieces to a file, encoding and writing in write_chunk_size chunks
+
+        When compression is given the chunks pass through the compressor as they are
+        written. Returns the SHA-256 content key of the uncompressed text so it can be
+        cached without encoding the whole text a second time.
+        """
+        digest = hashlib.sha256()
+        buffer, buffered = [], 0
+        with self.open_output(file_path, compression) as out:
+            for piece in pieces:
+                buffer.append(piece)
+                buffered += len(piece)
+                if buffered >= self.write_chunk_size:
+                    data = ''.join(buffer).encode('utf-8')
+                    digest.update(data)
+                    out.write(data)
+                    buffer, buffered = [], 0
+            data = ''.join(buffer).encode('utf-8')
+            digest.update(data)
+            out.write(data)
+        return "sha256:" + digest.hexdigest()
+
+    def _disk_get_newick(self, ref, user_id):
+        """Returns the object name and cached file path of a versioned tree's newick"""
+        if not is_versioned_ref(ref):
+            return None
+        entry = self.disk_cache.get("newick|" + json.dumps([user_id, ref]))
+        if entry is None:
+            return None
+        entry = json.loads(entry)
+        path = self.disk_cache.get_path(entry['content'])
+        return (entry['name'], path) if path else None
+
+    def _disk_put_newick(self, ref, user_id, name, file_path, content):
+        """Caches a newick file by content hash and points the tree's ref at it"""
+        if not self.disk_cache.contains(content):
+            self.disk_cache.put_file(content, file_path)
+        entry = {'name': name, 'content': content}
+        self.disk_cache.put("newick|" + json.dumps([user_id, ref]), json.dumps(entry).encode())
+
     def export(self, file, name, input_ref):
         """Saves a set of files to SHOCK for export"""
         export_package_dir = os.path.join(self.scratch, name+str(uuid.uuid4()))
@@ -67,3 +887,31 @@ class Utils:
         })
 
         return {'shock_id': package_details['shock_id']}
+
+    def export_many(self, refs, archive="zip", user_id=None):
+        """Writes many trees into one package directory and uploads it to SHOCK once
+
+        archive "zip" packages the directory with package_for_download, which also adds
+        workspace metadata for every exported tree. "targz" uploads a single .tar.gz
+        with file_to_shock instead. Refs that could not be written are returned in errors.
+        """
+        if archive not in ("zip", "targz"):
+            raise ValueError("archive must be 'zip' or 'targz'")
+        export_package_dir = os.path.join(self.scratch, "newick_trees_" + str(uuid.uuid4()))
+        os.makedirs(export_package_dir)
+        file_paths, errors = self.to_newick_files(refs, export_package_dir, user_id)
+        if not file_paths:
+            raise ValueError("None of the supplied trees could be exported: {}".format(errors))
+
+        if archive == "zip":
+            package_details = self.dfu.package_for_download({
+                'file_path': export_package_dir,
+                'ws_refs': list(file_paths)
+            })
+        else:
+            package_details = self.dfu.file_to_shock({
+                'file_path': export_package_dir,
+                'pack': 'targz'
+            })
+
+        return {'shock_id': package_details['shock_id'], 'errors': errors}
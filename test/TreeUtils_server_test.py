@@ -1,13 +1,32 @@
 # -*- coding: utf-8 -*-
+import gzip
+import io
 import json
 import os
+import sys
+import tarfile
 import time
 import unittest
+import xml.etree.ElementTree as ElementTree
 from configparser import ConfigParser
 
+import numpy as np
+
 from TreeUtils.TreeUtilsImpl import TreeUtils
-from TreeUtils.TreeUtilsServer import MethodContext
-from TreeUtils.authclient import KBaseAuth as _KBaseAuth
+from TreeUtils.TreeUtilsServer import Application, JSONRPCServiceCustom, MethodContext
+from TreeUtils.authclient import KBaseAuth as _KBaseAuth, TokenCache
+from TreeUtils.core.ArrayTree import ArrayTree
+from TreeUtils.core.ClientSession import PooledRequests
+from TreeUtils.core import HttpEncoding, RequestStream
+from TreeUtils.core.DiskCache import DiskCache, content_key
+from TreeUtils.core.LCAIndex import LCAIndex
+from TreeUtils.core.Splits import compare_splits, consensus_tree, count_splits, tree_splits
+from TreeUtils.core.JsonEncoding import encode_json
+from TreeUtils.core.Newick import NewickSyntaxError, check_newick, relabel
+from TreeUtils.core.TreeCache import is_versioned_ref
+from TreeUtils.core.TreeReaders import nexus_trees, tree_data
+from TreeUtils.core.TreeWriters import iter_json, iter_nexus
+from TreeUtils.core.Utils import Utils
 
 from DataFileUtil.DataFileUtilClient import DataFileUtil
 from Workspace.WorkspaceClient import Workspace
@@ -95,6 +114,162 @@ class TreeUtilsTest(unittest.TestCase):
         ret = self.getImpl().get_trees(self.getContext(), params)[0]
         self.assertEqual(set(ret[0]['data'].keys()), {'default_node_labels', 'type'})
 
+    def test_get_trees_cache(self):
+        cache = self.getImpl().utils.object_cache
+        params = {'tree_refs': [self.tree_ref], 'included_fields': ['tree']}
+        first = self.getImpl().get_trees(self.getContext(), params)[0]
+        hits = cache.stats()['hits']
+        second = self.getImpl().get_trees(self.getContext(), params)[0]
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()['hits'], hits + 1)
+        status = self.getImpl().status(self.getContext())[0]
+        self.assertIn('hits', status['tree_cache'])
+        self.assertTrue(is_versioned_ref(self.tree_ref))
+        # names can be reassigned by renaming, so only refs by id are cached
+        for ref in ('myws/tree/1', '{}/tree/1'.format(self.wsId), '1/2', '1/2/3;4/5/6'):
+            self.assertFalse(is_versioned_ref(ref))
+
+    def test_disk_cache(self):
+        cache = DiskCache(os.path.join(self.scratch, 'test_disk_cache'), 100)
+        key = content_key("(a,b);")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, b"(a,b);")
+        self.assertEqual(cache.get(key), b"(a,b);")
+        for i in range(20):
+            cache.put(str(i), b"0123456789")
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 100)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(stats['hits'], 1)
+        self.assertNotIn('entries', stats)
+        stats = cache.stats(scan=True)
+        self.assertLessEqual(stats['bytes'], 100)
+        self.assertGreater(stats['entries'], 0)
+
+        # eviction goes down to the low water mark, so a full cache is not scanned per put
+        cache = DiskCache(os.path.join(self.scratch, 'test_disk_cache_scans'), 1000)
+        scans, scan = [], cache._scan
+        cache._scan = lambda: scans.append(1) or scan()
+        for i in range(300):
+            cache.put("scan_{}".format(i), b"0123456789")
+        self.assertLess(len(scans), 50)
+
+        params = {'input_ref': self.tree_ref, 'destination_dir': self.scratch}
+        first = self.getImpl().tree_to_newick_file(self.getContext(), params)[0]
+        second = self.getImpl().tree_to_newick_file(self.getContext(), params)[0]
+        self.assertEqual(open(first['file_path']).read(), open(second['file_path']).read())
+        # a cached file evicted by another worker after the lookup is fetched again
+        utils = self.getImpl().utils
+        utils._disk_get_newick = lambda ref, user_id: ('evicted', '/nonexistent/tree.newick')
+        try:
+            third = self.getImpl().tree_to_newick_file(self.getContext(), params)[0]
+        finally:
+            del utils._disk_get_newick
+        self.assertEqual(open(first['file_path']).read(), open(third['file_path']).read())
+
+    def test_client_session(self):
+        pooled = sys.modules[type(self.getImpl().ws._client).__module__]._requests
+        self.assertIsInstance(pooled, PooledRequests)
+        session = pooled.session()
+        self.getImpl().ws.ver()
+        self.assertIs(pooled.session(), session)
+        self.assertEqual(pooled.pool_maxsize, int(self.cfg.get('client-pool-size', 10)))
+        self.assertIs(self.getImpl().dfu, self.getImpl().utils.dfu)
+
+    def test_encode_json(self):
+        data = {'labels': {'kb|g.1': 'é'}, 'refs': {'1/2/3'}, 'big': 2 ** 70}
+        encoded = encode_json(data)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(json.loads(encoded.decode('utf-8')),
+                         {'labels': {'kb|g.1': 'é'}, 'refs': ['1/2/3'], 'big': 2 ** 70})
+        with self.assertRaises(TypeError):
+            encode_json({'bad': object()})
+
+    def test_batch_requests(self):
+        service = JSONRPCServiceCustom(batch_workers=4)
+        service.add(self.getImpl().get_trees, name='TreeUtils.get_trees', types=[dict])
+        batch = [{'method': 'TreeUtils.get_trees', 'version': '1.1', 'id': str(i),
+                  'params': [{'tree_refs': [self.tree_ref], 'included_fields': ['type']}]}
+                 for i in range(8)]
+        ret = service.call_py(self.getContext(), batch)
+        self.assertEqual([r['id'] for r in ret], [str(i) for i in range(8)])
+        self.assertEqual(ret[0]['result'][0][0]['data'], {'type': self.tree_obj['type']})
+
+        # no request is started once one has failed
+        calls = []
+
+        def record(ctx, params):
+            calls.append(params['n'])
+            if params['n'] == 1:
+                raise ValueError("request 1 failed")
+            return [params['n']]
+        service = JSONRPCServiceCustom(batch_workers=2)
+        service.add(record, name='TreeUtils.record', types=[dict])
+        batch = [{'method': 'TreeUtils.record', 'version': '1.1', 'id': str(i),
+                  'params': [{'n': i}]} for i in range(20)]
+        with self.assertRaises(Exception):
+            service.call_py(self.getContext(), batch)
+        self.assertIn(1, calls)
+        self.assertLess(len(calls), 20)
+
+    def test_http_encoding(self):
+        self.assertEqual(HttpEncoding.negotiate('deflate, gzip'), 'gzip')
+        self.assertEqual(HttpEncoding.negotiate('gzip;q=0, deflate;q=0.5'), 'deflate')
+        self.assertIsNone(HttpEncoding.negotiate('identity'))
+        body = json.dumps(self.tree_obj).encode('utf-8')
+        for encoding in HttpEncoding.ENCODINGS:
+            encoded = HttpEncoding.encode(body, encoding)
+            self.assertLess(len(encoded), len(body))
+            self.assertEqual(HttpEncoding.decode(encoded, encoding), body)
+        with self.assertRaisesRegexp(ValueError, "Invalid gzip"):
+            HttpEncoding.decode(body, 'gzip')
+        with self.assertRaisesRegexp(ValueError, "Unsupported"):
+            HttpEncoding.decode(body, 'br')
+
+        # a small body that decompresses past the limit is rejected without inflating it all
+        bomb = gzip.compress(b'0' * 2 ** 26)
+        self.assertLess(len(bomb), 2 ** 17)
+        with self.assertRaisesRegexp(ValueError, "larger than 1048576 bytes"):
+            HttpEncoding.decode(bomb, 'gzip', 2 ** 20)
+        app = Application()
+        environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(bomb)),
+                   'HTTP_CONTENT_ENCODING': 'gzip', 'wsgi.input': io.BytesIO(bomb),
+                   'REMOTE_ADDR': '127.0.0.1'}
+        app.max_decoded_body_bytes = 2 ** 20
+        response = json.loads(b''.join(app(environ, lambda status, headers: None)))
+        self.assertIn("larger than 1048576 bytes", response['error']['message'])
+
+    def test_token_cache(self):
+        cache = TokenCache(maxsize=2)
+        cache.add_valid_token('a', 'user_a')
+        cache.add_valid_token('b', 'user_b')
+        self.assertEqual(cache.get_user('a'), 'user_a')
+        cache.add_valid_token('c', 'user_c')
+        self.assertIsNone(cache.get_user('b'))
+        self.assertEqual(cache.get_user('a'), 'user_a')
+        self.assertEqual(cache.get_user('c'), 'user_c')
+        expired = TokenCache(ttl=-1)
+        expired.add_valid_token('a', 'user_a')
+        self.assertIsNone(expired.get_user('a'))
+
+    def test_auth_client_cache(self):
+        auth_client = _KBaseAuth(self.cfg['auth-service-url'])
+        token = self.getContext()['token']
+        self.assertEqual(auth_client.get_user(token), self.getContext()['user_id'])
+        self.assertEqual(auth_client.get_user(token), self.getContext()['user_id'])
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                auth_client.get_user('not_a_valid_token')
+        self.assertEqual(auth_client.stats(), {'hits': 1, 'misses': 2, 'coalesced': 0,
+                                               'rejected_hits': 1})
+        impl = self.getImpl()
+        impl.auth_client = auth_client
+        try:
+            status = impl.status(self.getContext())[0]
+        finally:
+            impl.auth_client = None
+        self.assertEqual(status['token_cache']['rejected_hits'], 1)
+
     def test_save_trees(self):
         params = {'ws_id': self.wsId, 'trees': [{'name': 'test_save_trees',
                                                  'data': self.tree_obj}]}
@@ -110,13 +285,344 @@ class TreeUtilsTest(unittest.TestCase):
         with self.assertRaisesRegexp(ValueError, "invalid newick tree"):
             ret = self.getImpl().save_trees(self.getContext(), params)[0]
 
+        # the lowest index problem is reported, whether structural or in the newick
+        trees = [{'data': {'tree': "(a,b);"}}, {'data': {'tree': "(a,"}}, {'data': {}}]
+        with self.assertRaisesRegexp(ValueError, "Object 1 has an invalid newick tree"):
+            self.getImpl().save_trees(self.getContext(), {'ws_id': self.wsId, 'trees': trees})
+        trees = [{'data': {'tree': "(a,b);"}}, {'data': {}}, {'data': {'tree': "(a,"}}]
+        with self.assertRaisesRegexp(ValueError, "Object 1 missing 'tree' attribute"):
+            self.getImpl().save_trees(self.getContext(), {'ws_id': self.wsId, 'trees': trees})
+
+    def test_save_trees_batched(self):
+        tree_obj = json.load(open('data/tree.json'))
+        utils = self.getImpl().utils
+        max_objects = utils.save_batch_max_objects
+        utils.save_batch_max_objects = 1
+        try:
+            params = {'ws_id': self.wsId, 'trees': [{'name': 'batched_{}'.format(i),
+                                                     'data': tree_obj} for i in range(3)]}
+            ret = self.getImpl().save_trees(self.getContext(), params)[0]
+        finally:
+            utils.save_batch_max_objects = max_objects
+        self.assertEqual([info[1] for info in ret], ['batched_0', 'batched_1', 'batched_2'])
+
+    def test_save_trees_streamed(self):
+        tree = json.load(open('data/tree.json'))
+        body = json.dumps({'method': 'TreeUtils.save_trees', 'version': '1.1', 'id': '1',
+                           'params': [{'ws_id': self.wsId,
+                                       'trees': [{'name': 'streamed_{}'.format(i), 'data': tree}
+                                                 for i in range(3)]}]}).encode('utf-8')
+        compressed = gzip.compress(body)
+        with RequestStream.spool_body(io.BytesIO(compressed), len(compressed), 'gzip',
+                                      self.scratch) as spool:
+            req = RequestStream.load_request(spool)
+            self.assertEqual(req['params'][0]['ws_id'], self.wsId)
+            ret = self.getImpl().save_trees(self.getContext(), req['params'][0])[0]
+        self.assertEqual([info[1] for info in ret], ['streamed_0', 'streamed_1', 'streamed_2'])
+
+        bad = dict(tree, tree='(a,b')
+        objects = iter([{'name': 'streamed_ok', 'data': tree}, {'name': 'bad', 'data': bad}])
+        with self.assertRaisesRegexp(ValueError, "Object 1 has an invalid newick tree"):
+            self.getImpl().save_trees(self.getContext(), {'ws_id': self.wsId, 'trees': objects})
+
+        # every streamed tree is validated before any is saved
+        body = json.dumps({'method': 'TreeUtils.save_trees', 'version': '1.1', 'id': '1',
+                           'params': [{'ws_id': self.wsId,
+                                       'trees': [{'name': 'streamed_valid', 'data': tree},
+                                                 {'name': 'streamed_bad', 'data': bad}]}]})
+        body = body.encode('utf-8')
+        with RequestStream.spool_body(io.BytesIO(body), len(body), None, self.scratch) as spool:
+            req = RequestStream.load_request(spool)
+            with self.assertRaisesRegexp(ValueError, "Object 1 has an invalid newick tree"):
+                self.getImpl().save_trees(self.getContext(), req['params'][0])
+        info = self.getWsClient().get_object_info3(
+            {'objects': [{'wsid': self.wsId, 'name': 'streamed_valid'}], 'ignoreErrors': 1})
+        self.assertIsNone(info['infos'][0])
+
+        bomb = gzip.compress(b'0' * 2 ** 26)
+        with self.assertRaisesRegexp(ValueError, "larger than 1048576 bytes"):
+            RequestStream.spool_body(io.BytesIO(bomb), len(bomb), 'gzip', self.scratch, 2 ** 20)
+
+        # a body of several gzip members is spooled whole, as decode reads it
+        members = gzip.compress(body[:100]) + gzip.compress(body[100:]) + b'\0' * 4
+        self.assertEqual(HttpEncoding.decode(members, 'gzip'), body)
+        with RequestStream.spool_body(io.BytesIO(members), len(members), 'gzip',
+                                      self.scratch) as spool:
+            self.assertEqual(spool.read(), body)
+
+    def test_validate_newick(self):
+        newick = json.load(open('data/tree.json'))['tree']
+        self.assertTrue(Utils.validate_newick(newick))
+        self.assertEqual(check_newick(newick), 21)
+        for bad in ("foo", "(a,b)", "(a,(b,c);", "(a:x,b);", "(a,a);", "(a,b);c"):
+            self.assertFalse(Utils.validate_newick(bad))
+        with self.assertRaisesRegexp(NewickSyntaxError, "Unbalanced"):
+            check_newick("(a,b));")
+        for single in ("a;", "'a b':1.5;", "a[&c];"):
+            self.assertEqual(check_newick(single), 1)
+        for bad in (";", ":1;", "a b;", "a,b;", "a(b);"):
+            self.assertFalse(Utils.validate_newick(bad))
+        with self.assertRaises(NewickSyntaxError) as cm:
+            check_newick("('é',b:x);")
+        self.assertEqual(cm.exception.offset, 9)
+
+    def test_array_tree(self):
+        tree = ArrayTree.from_newick("((a:1,b)x:3,'c d');")
+        self.assertEqual(len(tree), 5)
+        self.assertEqual(tree.parent.tolist(), [-1, 0, 1, 1, 0])
+        self.assertEqual([tree.label_of(n) for n in tree.leaves()], ['a', 'b', 'c d'])
+        self.assertEqual(list(tree.children(0)), [1, 4])
+        self.assertEqual(tree.to_newick(), "((a:1.0,b)x:3.0,'c d');")
+
+        newick = ArrayTree.from_newick(json.load(open('data/tree.json'))['tree']).to_newick()
+        self.assertEqual(ArrayTree.from_newick(newick).to_newick(), newick)
+        self.assertEqual(check_newick(newick), 21)
+
+    def test_lowest_common_ancestors(self):
+        pairs = [['kb|g.207953', 'user1'], ['kb|g.207954', 'kb|g.207953'],
+                 ['kb|g.210451', 'user1'], ['kb|g.207953', 'kb|g.207953']]
+        params = {'tree_ref': self.tree_ref, 'leaf_pairs': pairs}
+        ret = self.getImpl().lowest_common_ancestors(self.getContext(), params)[0]
+        self.assertEqual([a['leaf_count'] for a in ret['ancestors']], [2, 3, 8, 1])
+        self.assertEqual(ret['ancestors'][3]['label'], 'kb|g.207953')
+        with self.assertRaisesRegexp(ValueError, "Leaves not found"):
+            params['leaf_pairs'] = [['kb|g.207953', 'missing']]
+            self.getImpl().lowest_common_ancestors(self.getContext(), params)
+
+        tree = ArrayTree.from_newick("((a,b)x,(c,(d,e)y)z)r;")
+        index = LCAIndex(tree)
+        leaves = tree.leaf_nodes(['a', 'd', 'd', 'c', 'b'])
+        ancestors = index.query(leaves[[0, 1, 2, 4]], leaves[[4, 3, 1, 0]])
+        self.assertEqual([tree.label_of(n) for n in ancestors], ['x', 'z', 'd', 'x'])
+
+    def test_patristic_distances(self):
+        params = {'tree_ref': self.tree_ref, 'leaf_ids': ['kb|g.207953', 'user1', 'kb|g.210451']}
+        ret = self.getImpl().patristic_distances(self.getContext(), params)[0]
+        self.assertEqual(ret['leaf_ids'], params['leaf_ids'])
+        matrix = np.array(ret['distances'])
+        self.assertEqual(matrix.shape, (3, 3))
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0)
+
+        params = {'tree_ref': self.tree_ref, 'to_file': 1}
+        ret = self.getImpl().patristic_distances(self.getContext(), params)[0]
+        self.assertNotIn('distances', ret)
+        matrix = np.load(ret['file_path'])
+        self.assertEqual(matrix.shape, (len(ret['leaf_ids']),) * 2)
+        again = self.getImpl().patristic_distances(self.getContext(), params)[0]
+        self.assertNotEqual(again['file_path'], ret['file_path'])
+
+        tree = ArrayTree.from_newick("((a:1,b:2)x:3,(c:4,(d:5,e:6)y)z:0.5)r;")
+        leaves = tree.leaf_nodes(['a', 'b', 'd', 'e'])
+        distances = LCAIndex(tree).distances(leaves[[0, 0, 2, 3]], leaves[[1, 2, 3, 3]])
+        np.testing.assert_allclose(distances, [3, 9.5, 11, 0])
+
+    def test_prune_tree(self):
+        leaves = ['kb|g.207953', 'user1', 'kb|g.210451']
+        params = {'tree_ref': self.tree_ref, 'leaf_ids': leaves}
+        ret = self.getImpl().prune_tree(self.getContext(), params)[0]
+        self.assertEqual(ret['tree'], "(kb|g.210451:0.4495,(kb|g.207953:0.00055,user1:0.00055)"
+                                      "1.000:0.66912)1.000;")
+
+        params.update({'ws_id': self.wsId, 'output_name': 'pruned_tree'})
+        info = self.getImpl().prune_tree(self.getContext(), params)[0]['info']
+        ref = "{}/{}/{}".format(info[6], info[0], info[4])
+        data = self.getWsClient().get_objects2({'objects': [{'ref': ref}]})['data'][0]['data']
+        self.assertEqual(data['leaf_list'], leaves)
+        self.assertEqual(sorted(data['default_node_labels']), sorted(leaves))
+        with self.assertRaisesRegexp(ValueError, "at least two distinct leaves"):
+            params['leaf_ids'] = ['user1', 'user1']
+            self.getImpl().prune_tree(self.getContext(), params)
+
+        tree = ArrayTree.from_newick("((a:1,b:2)x:3,(c:4,(d:5,e:6)y:1)z:0.5)r;")
+        pruned = tree.prune(tree.leaf_nodes(['a', 'd', 'e']))
+        self.assertEqual(pruned.to_newick(), "(a:4.0,(d:5.0,e:6.0)y:1.5)r;")
+        self.assertEqual(sorted(pruned.labels), ['a', 'd', 'e', 'r', 'y'])
+
+    def test_compare_trees(self):
+        params = {'tree_ref': self.tree_ref, 'ws_id': self.wsId, 'output_name': 'compared_tree',
+                  'leaf_ids': ['kb|g.207953', 'user1', 'kb|g.210451', 'kb|g.26977', 'kb|g.23629']}
+        info = self.getImpl().prune_tree(self.getContext(), params)[0]['info']
+        pruned_ref = "{}/{}/{}".format(info[6], info[0], info[4])
+        params = {'tree_refs': [self.tree_ref, pruned_ref]}
+        ret = self.getImpl().compare_trees(self.getContext(), params)[0]
+        comparison = ret['comparisons'][0]
+        self.assertEqual(comparison['common_leaves'], 5)
+        self.assertEqual(comparison['rf_distance'], 0)
+        self.assertEqual(comparison['shared_splits'], 2)
+        with self.assertRaisesRegexp(ValueError, "At least two distinct trees"):
+            params['reference_ref'] = self.tree_ref
+            params['tree_refs'] = [self.tree_ref]
+            self.getImpl().compare_trees(self.getContext(), params)
+
+        leaf_index = {}
+        first, second, third = (tree_splits(ArrayTree.from_newick(newick), leaf_index) for newick in
+                                ("((a,b),(c,(d,e)));", "(((a,b),c),(d,e));", "((a,c),(b,d));"))
+        self.assertEqual(compare_splits(first, second), (5, 2, 0, 0.0))
+        self.assertEqual(compare_splits(first, third), (4, 0, 2, 1.0))
+
+    def test_consensus_tree(self):
+        params = {'tree_refs': [self.tree_ref, self.tree_ref], 'method': 'strict',
+                  'ws_id': self.wsId, 'output_name': 'consensus_tree'}
+        info = self.getImpl().consensus_tree(self.getContext(), params)[0]['info']
+        consensus_ref = "{}/{}/{}".format(info[6], info[0], info[4])
+        params = {'tree_refs': [self.tree_ref, consensus_ref]}
+        ret = self.getImpl().compare_trees(self.getContext(), params)[0]
+        self.assertEqual(ret['comparisons'][0]['rf_distance'], 0)
+        data = self.getWsClient().get_objects2({'objects': [{'ref': consensus_ref}]})['data'][0]
+        self.assertEqual(sorted(data['data']['leaf_list']), self.tree_obj['leaf_list'])
+        self.assertEqual(data['data']['default_node_labels'], self.tree_obj['default_node_labels'])
+
+        leaf_index = {}
+        trees = (ArrayTree.from_newick(newick) for newick in
+                 ("((a,b),(c,(d,e)));", "(((a,b),c),(d,e));", "((a,c),(b,(d,e)));"))
+        mask, count, counts = count_splits(trees, leaf_index)
+        majority = consensus_tree(mask, count, counts, leaf_index)
+        strict = consensus_tree(mask, count, counts, leaf_index, strict=True)
+        self.assertEqual(sorted(majority.labels), ['0.667', '1.000', 'a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(sorted(strict.labels), ['1.000', 'a', 'b', 'c', 'd', 'e'])
+        with self.assertRaisesRegexp(ValueError, "Tree 1 does not have the same leaves"):
+            count_splits([ArrayTree.from_newick(newick) for newick in ("(a,b,c);", "(a,b);")], {})
 
     def test_make_newick(self):
         params = {'input_ref': self.tree_ref, 'destination_dir': self.scratch}
         ret = self.getImpl().tree_to_newick_file(self.getContext(), params)[0]
         assert ret and ('file_path' in ret)
+        with open(ret['file_path']) as f:
+            newick = f.read()
+
+        params['compression'] = 'gzip'
+        ret = self.getImpl().tree_to_newick_file(self.getContext(), params)[0]
+        self.assertTrue(ret['file_path'].endswith('.newick.gz'))
+        with gzip.open(ret['file_path'], 'rt') as f:
+            self.assertEqual(f.read(), newick)
+        with self.assertRaisesRegexp(ValueError, "compression must be"):
+            params['compression'] = 'rar'
+            self.getImpl().tree_to_newick_file(self.getContext(), params)
+
+    def test_relabel_newick(self):
+        params = {'input_ref': self.tree_ref, 'destination_dir': self.scratch,
+                  'relabel': 'default_node_labels', 'compression': 'gzip'}
+        ret = self.getImpl().tree_to_newick_file(self.getContext(), params)[0]
+        with gzip.open(ret['file_path'], 'rt') as f:
+            newick = f.read()
+        self.assertEqual(check_newick(newick), 21)
+        self.assertIn("'Carsonella ruddii CE isolate Thao2000 (kb|g.207953)':5.5E-4", newick)
+        params['relabel'] = 'kb_refs'
+        ret = self.getImpl().export_tree_newick(self.getContext(), params)[0]
+        assert ret and ('shock_id' in ret)
+        with self.assertRaisesRegexp(ValueError, "relabel must be one of"):
+            params['relabel'] = 'names'
+            self.getImpl().tree_to_newick_file(self.getContext(), params)
+
+        pieces = relabel("((a:1,'b c':2)x[note],d);", {'a': 'A (1)', 'b c': 'B', 'x': "it's"})
+        self.assertEqual(''.join(pieces), "(('A (1)':1,B:2)'it''s'[note],d);")
+        # leaves that would share a label keep their ids, so the tree stays valid
+        newick = "((a,b)x,(c,d));"
+        labels = Utils.unique_leaf_labels(newick, {'a': 'A', 'b': 'A', 'c': 'd', 'x': 'A'})
+        self.assertEqual(labels, {'x': 'A'})
+        check_newick(''.join(relabel(newick, labels)))
+
+    def test_tree_to_file(self):
+        params = {'input_ref': self.tree_ref, 'destination_dir': self.scratch}
+        for file_format in ('phyloxml', 'nexml'):
+            params['format'] = file_format
+            ret = self.getImpl().tree_to_file(self.getContext(), params)[0]
+            root = ElementTree.parse(ret['file_path']).getroot()
+            self.assertIn("Carsonella ruddii CE isolate Thao2000 (kb|g.207953)",
+                          [e.text or e.get('label') for e in root.iter()])
+        params.update({'format': 'json', 'compression': 'gzip'})
+        ret = self.getImpl().tree_to_file(self.getContext(), params)[0]
+        self.assertTrue(ret['file_path'].endswith('.json.gz'))
+        with gzip.open(ret['file_path'], 'rt') as f:
+            self.assertEqual(json.load(f)['name'], 'test_tree')
+        with self.assertRaisesRegexp(ValueError, "format must be one of"):
+            params['format'] = 'svg'
+            self.getImpl().tree_to_file(self.getContext(), params)
+
+        tree = ArrayTree.from_newick("((a:1,b:2),c);")
+        node_maps = {'default_node_labels': {'a': 'A (1)'}, 'kb_refs': {'c': {'g': ['kb|g.1']}}}
+        self.assertEqual(json.loads(''.join(iter_json(tree, node_maps)))['root']['children'][1],
+                         {'id': 'c', 'kb_refs': {'g': ['kb|g.1']}})
+        nexus = ''.join(iter_nexus(tree, node_maps, 'tree'))
+        self.assertIn("1 'A (1)',", nexus)
+        self.assertIn("TREE tree = [&R] ((1:1.0,2:2.0),3);", nexus)
+
+    def test_newick_files_to_trees(self):
+        import_dir = os.path.join(self.scratch, 'tree_import')
+        os.makedirs(import_dir, exist_ok=True)
+        with open(os.path.join(import_dir, 'import_one.nwk'), 'w') as f:
+            f.write("((a:1,b:2):0.5,c:3);")
+        with gzip.open(os.path.join(import_dir, 'import_many.tre.gz'), 'wt') as f:
+            f.write("((a,b),c);\n((a,a),c);\n(a,(b,c));\n")
+        nexus_path = os.path.join(self.scratch, 'import_nexus.nex')
+        with open(nexus_path, 'w') as f:
+            f.write("#NEXUS\nBEGIN TREES;\n\tTRANSLATE 1 a, 2 'b c';\n"
+                    "\tTREE boot = [&R] (1:1,2:2);\nEND;\n")
+        archive_path = os.path.join(self.scratch, 'import_archive.tar.gz')
+        with tarfile.open(archive_path, 'w:gz') as archive:
+            archive.add(os.path.join(import_dir, 'import_one.nwk'), '../import_one.nwk')
+
+        params = {'file_paths': [import_dir, nexus_path, archive_path], 'ws_id': self.wsId}
+        ret = self.getImpl().newick_files_to_trees(self.getContext(), params)[0]
+        self.assertEqual([info[1] for info in ret['infos']],
+                         ['import_many_1', 'import_many_3', 'import_one', 'import_nexus',
+                          'import_one_2'])
+        self.assertEqual(list(ret['errors']), [import_dir + '/import_many.tre.gz#2'])
+        info = ret['infos'][3]
+        data = self.getWsClient().get_objects2(
+            {'objects': [{'ref': "{}/{}/{}".format(info[6], info[0], info[4])}]})['data'][0]
+        self.assertEqual(data['data']['leaf_list'], ['a', 'b c'])
+        self.assertEqual(data['data']['default_node_labels'], {'a': 'a', 'b c': 'b c'})
+
+        self.assertEqual(list(nexus_trees("#NEXUS\nBEGIN TAXA;\nEND;\nBEGIN TREES;\n"
+                                          "TREE t = (a,b);\nEND;")), [('t', '(a,b);')])
+        self.assertEqual(list(nexus_trees("#NEXUS\nBEGIN TREES;\nTRANSLATE 1 alpha, 2 beta, "
+                                          "3 gamma;\nTREE t1 = ((1:0.1,2:0.2)1:0.05,3:0.3);\n"
+                                          "END;")),
+                         [('t1', '((alpha:0.1,beta:0.2)1:0.05,gamma:0.3);')])
+        with self.assertRaisesRegexp(NewickSyntaxError, "Leaf without a label"):
+            tree_data("((a,b),);")
+        with self.assertRaisesRegexp(ValueError, "is not in the scratch directory"):
+            self.getImpl().newick_files_to_trees(
+                self.getContext(), {'file_paths': ['/etc/hosts'], 'ws_id': self.wsId})
+        linked_dir = os.path.join(self.scratch, 'tree_import_linked')
+        os.makedirs(linked_dir, exist_ok=True)
+        if not os.path.lexists(os.path.join(linked_dir, 'hosts.nwk')):
+            os.symlink('/etc/hosts', os.path.join(linked_dir, 'hosts.nwk'))
+        with self.assertRaisesRegexp(ValueError, "hosts.nwk is not in the scratch directory"):
+            self.getImpl().newick_files_to_trees(
+                self.getContext(), {'file_paths': [linked_dir], 'ws_id': self.wsId})
+
+    def test_trees_to_newick_files(self):
+        bad_ref = "{}/999999/1".format(self.wsId)
+        params = {'input_refs': [self.tree_ref, bad_ref], 'destination_dir': self.scratch}
+        ret = self.getImpl().trees_to_newick_files(self.getContext(), params)[0]
+        self.assertEqual(list(ret['file_paths']), [self.tree_ref])
+        assert os.path.exists(ret['file_paths'][self.tree_ref])
+        self.assertEqual(list(ret['errors']), [bad_ref])
+
+        # a malformed ref fails its whole get_objects2 call, but not the other refs in it
+        latest_ref = self.tree_ref.rsplit('/', 1)[0]
+        params['input_refs'] = [latest_ref, 'not a ref']
+        ret = self.getImpl().trees_to_newick_files(self.getContext(), params)[0]
+        self.assertEqual(list(ret['file_paths']), [latest_ref])
+        self.assertEqual(list(ret['errors']), ['not a ref'])
 
     def test_export_newick(self):
         params = {'input_ref': self.tree_ref}
         ret = self.getImpl().export_tree_newick(self.getContext(), params)[0]
         assert ret and ('shock_id' in ret)
+
+    def test_export_trees_newick(self):
+        params = {'input_refs': [self.tree_ref]}
+        ret = self.getImpl().export_trees_newick(self.getContext(), params)[0]
+        assert ret and ('shock_id' in ret)
+        self.assertEqual(ret['errors'], {})
+
+        params['archive'] = 'targz'
+        ret = self.getImpl().export_trees_newick(self.getContext(), params)[0]
+        assert ret and ('shock_id' in ret)
+        with self.assertRaisesRegexp(ValueError, "archive must be"):
+            self.getImpl().export_trees_newick(self.getContext(), {'input_refs': [self.tree_ref],
+                                                                   'archive': 'rar'})